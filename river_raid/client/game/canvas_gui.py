@@ -1,96 +1,234 @@
 # client/game/canvas_gui.py
+import time
+import random
 import tkinter as tk
 import logging
 from shared.config import CANVAS_WIDTH, CANVAS_HEIGHT, SCALE
 
 class GameCanvas(tk.Canvas):
-    def __init__(self, parent, game_logic):
+    """Retained-mode view of the game: one canvas item per entity, moved in place
+
+    Items are keyed by entity id and keep their coordinates, so a frame
+    only calls coords() for entities that moved. An entity that despawns
+    has its item hidden and pooled by shape, and the next entity of that
+    shape reuses it. Tk then creates items only when more entities are on
+    screen than ever before, and frame cost follows what changed rather
+    than how much is drawn.
+    """
+
+    # Stacking order, bottom to top; every item is tagged with its layer
+    LAYERS = ('player', 'fuel', 'missile', 'enemy')
+
+    def __init__(self, parent, game_logic, prediction=None):
         super().__init__(parent, width=1000, height=950, bg="gray")
         self.game_logic = game_logic
+        self.prediction = prediction  # Source of missiles the server has not confirmed yet
         self.scale = SCALE  # Define scaling factor
         self.width = CANVAS_WIDTH
         self.height = CANVAS_HEIGHT
+        self.items = {}  # Entity key -> [item, shape, coords, fill]
+        self.pool = {'rectangle': [], 'oval': [], 'line': []}  # Hidden items ready for reuse
+        self.game_over_item = None
         self.pack()
 
     def update_canvas(self):
         try:
-            self.delete("all")
-            if self.game_logic.game_state == "running":
-                # Draw player
-                self._draw_entity(self.game_logic.player)
+            if self.game_logic.game_state != "running":
+                self.display_game_over()
+                return
+            if self.game_over_item is not None:
+                self.itemconfigure(self.game_over_item, state='hidden')
 
-                # Draw fuel depots
-                for depot in self.game_logic.fuel_depots:
-                    self._draw_entity_circle(depot)
+            seen = set()
+            spawned = self._draw_entity(('player',), 'player', self.game_logic.player, seen)
 
-                # Draw missiles
-                for missile in self.game_logic.missiles:
-                    self._draw_missile(missile)
+            for index, depot in enumerate(self.game_logic.fuel_depots):
+                spawned |= self._draw_entity_circle(self._key('fuel', depot, index), depot, seen)
 
-                # Draw enemies
-                for enemy in self.game_logic.enemies:
-                    self._draw_entity(enemy)
+            for index, missile in enumerate(self.game_logic.missiles):
+                spawned |= self._draw_missile(self._key('missile', missile, index), missile, seen)
+            if self.prediction is not None:
+                for index, missile in enumerate(self.prediction.predicted_missiles()):
+                    spawned |= self._draw_missile(self._key('predicted', missile, index), missile, seen)
 
-            else:
-                self.display_game_over()
+            for index, enemy in enumerate(self.game_logic.enemies):
+                spawned |= self._draw_entity(self._key('enemy', enemy, index), 'enemy', enemy, seen)
+
+            for key in [key for key in self.items if key not in seen]:
+                self._release(key)
+
+            # Pooled items keep their old stacking position
+            if spawned:
+                for layer in self.LAYERS:
+                    self.tag_raise(layer)
         except Exception as e:
             logging.warning(f"Warning in update_canvas: {e}")
 
-    def _draw_entity(self, entity):
-        """Draw a rectangular entity (player, enemies, fuel depots)"""
+    @staticmethod
+    def _key(kind, entity, index):
+        """Item key of an entity: its id, or its list position when it has none"""
+        entity_id = getattr(entity, 'entity_id', None)
+        return (kind, entity_id) if entity_id is not None else (kind, None, index)
+
+    def _place(self, key, layer, shape, coords, fill, seen, **options):
+        """Show key's item at coords, touching Tk only for what changed; True if it was (re)acquired"""
+        seen.add(key)
+        entry = self.items.get(key)
+        if entry is None:
+            self.items[key] = [self._acquire(shape, layer, coords, fill, options), shape, coords, fill]
+            return True
+        if entry[2] != coords:
+            self.coords(entry[0], *coords)
+            entry[2] = coords
+        if entry[3] != fill:
+            self.itemconfigure(entry[0], fill=fill)
+            entry[3] = fill
+        return False
+
+    def _acquire(self, shape, layer, coords, fill, options):
+        """A visible item of shape from the pool, or a new one"""
+        pool = self.pool[shape]
+        if pool:
+            item = pool.pop()
+            self.coords(item, *coords)
+            self.itemconfigure(item, fill=fill, tags=(layer,), state='normal', **options)
+            return item
+        create = {'rectangle': self.create_rectangle, 'oval': self.create_oval, 'line': self.create_line}[shape]
+        return create(*coords, fill=fill, tags=(layer,), **options)
+
+    def _release(self, key):
+        """Hide key's item and pool it"""
+        item, shape, _, _ = self.items.pop(key)
+        self.itemconfigure(item, state='hidden')
+        self.pool[shape].append(item)
+
+    def _draw_entity(self, key, layer, entity, seen):
+        """Draw a rectangular entity (player, enemies)"""
         try:
-            self.create_rectangle(
+            return self._place(key, layer, 'rectangle', (
                 entity.x * self.scale,
                 entity.y * self.scale,
                 entity.x * self.scale + entity.width,
-                entity.y * self.scale + entity.height,
-                fill=entity.color
-            )
+                entity.y * self.scale + entity.height
+            ), entity.color, seen)
         except Exception as e:
             logging.warning(f"Warning in _draw_entity: {e}")
+            return False
 
-    def _draw_entity_circle(self, entity): 
-        """Draw a circular entity""" 
+    def _draw_entity_circle(self, key, entity, seen):
+        """Draw a circular entity (fuel depots)"""
         try:
-            center_x = entity.x * self.scale + entity.width / 2 
-            center_y = entity.y * self.scale + entity.height / 2 
-            radius = entity.width / 2 
-            
-            self.create_oval( 
-                center_x - radius, 
-                center_y - radius, 
-                center_x + radius, 
-                center_y + radius, 
-                fill=entity.color
-            )
+            center_x = entity.x * self.scale + entity.width / 2
+            center_y = entity.y * self.scale + entity.height / 2
+            radius = entity.width / 2
+
+            return self._place(key, 'fuel', 'oval', (
+                center_x - radius,
+                center_y - radius,
+                center_x + radius,
+                center_y + radius
+            ), entity.color, seen)
         except Exception as e:
             logging.warning(f"Warning in _draw_entity_circle: {e}")
-    
-    def _draw_missile(self, missile):
+            return False
+
+    def _draw_missile(self, key, missile, seen):
         """Draw a missile as a vertical line"""
         try:
             center_x = missile.x * self.scale + (missile.width / 2)
-            self.create_line(
+            return self._place(key, 'missile', 'line', (
                 center_x,
                 missile.y * self.scale,
                 center_x,
-                missile.y * self.scale + missile.height,
-                fill=missile.color,
-                width=missile.width
-            )
+                missile.y * self.scale + missile.height
+            ), missile.color, seen, width=missile.width)
         except Exception as e:
             logging.warning(f"Warning in _draw_missile: {e}")
+            return False
 
     def display_game_over(self):
         """Display game over screen"""
         try:
-            self.delete("all")
-            self.create_text(
-                self.width / 2,
-                self.height / 2,
-                text="Game Over",
-                fill="red",
-                font=("Helvetica", 100)
-            )
+            for key in list(self.items):
+                self._release(key)
+            if self.game_over_item is None:
+                self.game_over_item = self.create_text(
+                    self.width / 2,
+                    self.height / 2,
+                    text="Game Over",
+                    fill="red",
+                    font=("Helvetica", 100)
+                )
+            else:
+                self.itemconfigure(self.game_over_item, state='normal')
+                self.tag_raise(self.game_over_item)
         except Exception as e:
-            logging.warning(f"Warning in display_game_over: {e}")
\ No newline at end of file
+            logging.warning(f"Warning in display_game_over: {e}")
+
+def _immediate_frame(canvas):
+    """The delete-and-redraw frame GameCanvas drew before it kept its items"""
+    canvas.delete("all")
+    logic = canvas.game_logic
+    for entity in [logic.player] + logic.enemies:
+        canvas.create_rectangle(entity.x * canvas.scale, entity.y * canvas.scale,
+                                entity.x * canvas.scale + entity.width, entity.y * canvas.scale + entity.height,
+                                fill=entity.color)
+    for depot in logic.fuel_depots:
+        center_x = depot.x * canvas.scale + depot.width / 2
+        center_y = depot.y * canvas.scale + depot.height / 2
+        radius = depot.width / 2
+        canvas.create_oval(center_x - radius, center_y - radius, center_x + radius, center_y + radius,
+                           fill=depot.color)
+    for missile in logic.missiles:
+        center_x = missile.x * canvas.scale + (missile.width / 2)
+        canvas.create_line(center_x, missile.y * canvas.scale, center_x,
+                           missile.y * canvas.scale + missile.height, fill=missile.color, width=missile.width)
+
+def benchmark(counts=(10, 60, 240), moving=(0.0, 0.25, 1.0), frames=200):
+    """Milliseconds per frame, delete-and-redraw against retained items
+
+    Each scene holds count entities split over enemies, missiles and fuel
+    depots; the moving fraction of them changes position every frame.
+    Needs a display.
+    """
+    from client.game.game_logic import GameLogic
+    root = tk.Tk()
+    root.withdraw()
+    rng = random.Random(1)
+    results = []
+    try:
+        for count in counts:
+            for fraction in moving:
+                timings = []
+                for draw in (_immediate_frame, GameCanvas.update_canvas):
+                    logic = GameLogic(None)
+                    third = count // 3
+                    logic.update_entities({
+                        'e': [{'i': i, 'x': rng.uniform(0, 30), 'y': rng.uniform(0, 30), 't': rng.choice('BJH')}
+                              for i in range(third)],
+                        'm': [{'i': i, 'x': rng.uniform(0, 30), 'y': rng.uniform(0, 30), 't': 'straight'}
+                              for i in range(third)],
+                        'f': [{'i': i, 'x': rng.uniform(0, 30), 'y': rng.uniform(0, 30)}
+                              for i in range(count - 2 * third)]
+                    })
+                    canvas = GameCanvas(root, logic)
+                    entities = logic.enemies + logic.missiles + logic.fuel_depots
+                    movers = entities[:int(len(entities) * fraction)]
+                    draw(canvas)
+                    start = time.perf_counter()
+                    for frame in range(frames):
+                        for entity in movers:
+                            entity.y = (entity.y + 0.1) % 30
+                        draw(canvas)
+                        canvas.update_idletasks()
+                    timings.append((time.perf_counter() - start) * 1000 / frames)
+                    canvas.destroy()
+                results.append((count, fraction, timings[0], timings[1]))
+    finally:
+        root.destroy()
+    return results
+
+if __name__ == "__main__":
+    print(f"{'entities':>8} {'moving':>7} {'redraw ms':>10} {'retained ms':>12} {'speedup':>8}")
+    for count, fraction, old_time, new_time in benchmark():
+        print(f"{count:>8} {fraction:>7.0%} {old_time:>10.3f} {new_time:>12.3f} {old_time / new_time:>7.1f}x")
@@ -3,6 +3,9 @@ import logging
 from shared.config import BOARD_WIDTH, BOARD_HEIGHT
 from shared.entities import Player, EnemyB, EnemyJ, EnemyH, FuelDepot, Missile
 
+# Enemy class of each network type code
+ENEMY_CLASSES = {'B': EnemyB, 'J': EnemyJ, 'H': EnemyH}
+
 class GameLogic:
     def __init__(self, game_state):
         self.game_state = game_state
@@ -37,32 +40,47 @@ class GameLogic:
             self.fuel = game_state['u']
             self.game_state = game_state['g']
 
-            # Clear and update entities
-            self.enemies.clear()
-            self.missiles.clear()
-            self.fuel_depots.clear()
-
-            # Recreate enemies
-            for enemy in game_state['e']:
-                if enemy['t'] == 'B':
-                    self.enemies.append(EnemyB(enemy['x'], enemy['y'], self))
-                elif enemy['t'] == 'J':
-                    self.enemies.append(EnemyJ(enemy['x'], enemy['y'], self))
-                elif enemy['t'] == 'H':
-                    self.enemies.append(EnemyH(enemy['x'], enemy['y'], self))
-
-            # Recreate missiles
-            for missile in game_state['m']:
-                self.missiles.append(Missile(missile['x'], missile['y'], missile['t']))
-
-            # Recreate fuel depots
-            for depot in game_state['f']:
-                self.fuel_depots.append(FuelDepot(depot['x'], depot['y']))
+            self.update_entities(game_state)
         except KeyError as e:
             logging.error(f"Key error in update_game_state: {e}")
         except Exception as e:
             logging.warning(f"Warning in update_game_state: {e}")
 
+    def update_entities(self, game_state):
+        """Sync enemies, missiles and fuel depots with a (possibly interpolated) state
+
+        An entity the state still has keeps its object and only moves, so
+        the canvas can keep its item too; entity_id holds the server id.
+        """
+        try:
+            self._sync(self.enemies, game_state['e'], self._create_enemy)
+            self._sync(self.missiles, game_state['m'],
+                       lambda missile: Missile(missile['x'], missile['y'], missile['t']))
+            self._sync(self.fuel_depots, game_state['f'], lambda depot: FuelDepot(depot['x'], depot['y']))
+        except KeyError as e:
+            logging.error(f"Key error in update_entities: {e}")
+        except Exception as e:
+            logging.warning(f"Warning in update_entities: {e}")
+
+    def _create_enemy(self, enemy):
+        return ENEMY_CLASSES[enemy['t']](enemy['x'], enemy['y'], self)
+
+    @staticmethod
+    def _sync(entities, records, create):
+        """Rebuild entities in record order, reusing the object already held for each id"""
+        previous = {entity.entity_id: entity for entity in entities if getattr(entity, 'entity_id', None) is not None}
+        entities.clear()
+        for record in records:
+            entity_id = record.get('i')
+            entity = previous.get(entity_id)
+            if entity is None:
+                entity = create(record)
+                entity.entity_id = entity_id
+            else:
+                entity.x = record['x']
+                entity.y = record['y']
+            entities.append(entity)
+
     def get_entity_at(self, x, y):
         """Get entity at specific coordinates"""
         try:
@@ -7,6 +7,9 @@ import queue
 from client.game.game_logic import GameLogic
 from client.game.canvas_gui import GameCanvas
 from client.game.game_state import GameState
+from client.game.input_stream import InputStream
+from client.game.prediction import Prediction
+from shared.input_commands import INPUT_LEFT, INPUT_RIGHT, INPUT_FIRE
 from shared.config import WINDOW_HEIGHT, WINDOW_WIDTH
 
 class GameManager(tk.Tk):
@@ -18,9 +21,13 @@ class GameManager(tk.Tk):
         # Initialize game state and logic
         self.game_state = GameState(client)
         self.game_logic = GameLogic(self.game_state)
+        # Player input goes out as sequenced per-tick bitmasks
+        self.input_stream = InputStream(self.game_state.send_action)
+        # Own input shows at once and is reconciled with each server state
+        self.prediction = Prediction(self.game_logic, self.input_stream)
 
         # Create canvas and GUI elements
-        self.canvas = GameCanvas(self, self.game_logic)
+        self.canvas = GameCanvas(self, self.game_logic, self.prediction)
         self.info_label = tk.Label(
             self, 
             text="Score: 0 | Lives: 3 | Fuel: 100",
@@ -31,6 +38,7 @@ class GameManager(tk.Tk):
         # State tracking
         self._reset_in_progress = False
         self._last_state_update = time.time()
+        self._disconnect_shown = False
 
         # Bind keyboard controls
         self.bind("<KeyPress-Left>", self.on_key_press)
@@ -71,6 +79,7 @@ class GameManager(tk.Tk):
         """Main game loop"""
         try:
             current_time = time.time()
+            redraw = False
             
             # Process state updates if not resetting
             if not self._reset_in_progress:
@@ -78,7 +87,8 @@ class GameManager(tk.Tk):
                 if updates:
                     latest_state = updates[-1]
                     self.game_logic.update_game_state(latest_state)
-                    self.canvas.update_canvas()
+                    self.prediction.reconcile(latest_state)
+                    redraw = True
                     self._last_state_update = current_time
 
                     # Update game info display
@@ -87,17 +97,39 @@ class GameManager(tk.Tk):
                         font=("Helvetica", 25)
                     )
 
+                # Other entities are drawn a little in the past, between two received states
+                if self.game_logic.game_state == "running":
+                    view = self.game_state.snapshots.sample()
+                    if view is not None:
+                        self.game_logic.update_entities(view)
+                        redraw = True
+
+            # The dispatcher stopped after losing the connection
+            if self.game_state.dispatcher.disconnected.is_set() and not self._disconnect_shown:
+                self._disconnect_shown = True
+                self.info_label.config(text="Disconnected from the server", font=("Helvetica", 25))
+
             # Handle key states for movement and shooting
             if "Left" in self.keys_pressed and current_time - self.last_move_time >= self.move_cooldown:
                 self.last_move_time = current_time
                 self.player_move("left")
+                redraw = True
             elif "Right" in self.keys_pressed and current_time - self.last_move_time >= self.move_cooldown:
                 self.last_move_time = current_time
                 self.player_move("right")
+                redraw = True
 
             if "space" in self.keys_pressed and current_time - self.last_shoot_time >= self.shoot_cooldown:
                 self.last_shoot_time = current_time
                 self.player_shoot()
+                redraw = True
+
+            # Close finished input ticks and send them once a batch is due
+            self.input_stream.update()
+
+            # Predicted input is drawn right away, and predicted missiles keep flying between states
+            if redraw or self.prediction.missiles:
+                self.canvas.update_canvas()
 
         except Exception as e:
             logging.warning(f"Warning in game_loop: {e}")
@@ -110,10 +142,7 @@ class GameManager(tk.Tk):
         """Handle player movement input"""
         try:
             if not self._reset_in_progress:
-                self.game_state.send_action({
-                    "action": "move",
-                    "direction": direction
-                })
+                self.prediction.press(INPUT_LEFT if direction == "left" else INPUT_RIGHT)
         except Exception as e:
             logging.warning(f"Warning in player_move: {e}")
 
@@ -121,9 +150,7 @@ class GameManager(tk.Tk):
         """Handle player shoot input"""
         try:
             if not self._reset_in_progress:
-                self.game_state.send_action({
-                    "action": "shoot"
-                })
+                self.prediction.press(INPUT_FIRE)
         except Exception as e:
             logging.warning(f"Warning in player_shoot: {e}")
 
@@ -161,6 +188,8 @@ class GameManager(tk.Tk):
             
             # Reset local game state
             self.game_logic.reset_game()
+            self.prediction.clear()
+            self.game_state.snapshots.clear()
             self._reset_completed = True
             
         except Exception as e:
@@ -199,21 +228,9 @@ class GameManager(tk.Tk):
         try:
             logging.info("Shutting down game...")
             if hasattr(self, 'game_state'):
-                # Stop the game state threads
-                self.game_state.stop()
-                
-                # Wait for message thread to complete
-                if hasattr(self.game_state, 'message_thread'):
-                    self.game_state.message_thread.join(timeout=2.0)
-                    if self.game_state.message_thread.is_alive():
-                        logging.warning("Message thread did not terminate cleanly")
-                
-                # Wait for update thread to complete
-                if hasattr(self.game_state, 'update_thread'):
-                    self.game_state.update_thread.join(timeout=2.0)
-                    if self.game_state.update_thread.is_alive():
-                        logging.warning("Update thread did not terminate cleanly")
-                
+                # Stop and join the dispatcher's reader and writer threads
+                self.game_state.stop(timeout=2.0)
+
                 # Clear queues
                 while not self.game_state.message_queue.empty():
                     try:
@@ -1,8 +1,10 @@
 # client/game/game_state.py
-import threading
+import os
 import queue
 import time
 import logging
+from client.network.dispatcher import ClientDispatcher
+from client.game.interpolation import SnapshotBuffer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -10,78 +12,45 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 class GameState:
     def __init__(self, client):
         self.client = client
-        self.update_queue = queue.Queue(maxsize=1)  # Limit queue size
+        self.update_queue = queue.Queue(maxsize=1)  # Newest state only; every state goes to snapshots
         self.message_queue = queue.Queue(maxsize=20)  # Queue for player actions
         self.running = True
         self.last_update = time.time()  # Initialize last_update time
-        self.update_interval = 0.15  # 50ms between updates
+        self.update_interval = 0.15  # Seconds between polls when the server does not stream
+
+        # One reader and one writer thread own the connection
+        self.streaming = bool(self.client.stream_rate)
+        self.dispatcher = ClientDispatcher(
+            client,
+            self.message_queue,
+            poll_interval=None if self.streaming else self.update_interval
+        )
+        self.dispatcher.on('state', self._on_state)
+
+        # CLIENT_INTERPOLATION_DELAY: seconds entities are drawn behind the newest state,
+        # two snapshot intervals by default
+        snapshot_interval = 1.0 / self.client.stream_rate if self.streaming else self.update_interval
+        self.interpolation_delay = float(os.getenv("CLIENT_INTERPOLATION_DELAY", 2 * snapshot_interval))
+        self.snapshots = SnapshotBuffer(self.interpolation_delay)
+        self.dispatcher.on('error', lambda message: logging.warning(f"Server error: {message}"))
+        self.dispatcher.on('disconnected', self._on_disconnected)
 
         #Send initial reset action to the server 
         self.send_action({"action": "reset_game"})
-        time.sleep(0.1)
 
-        # Start threads
-        self._start_threads()
+        self.dispatcher.start()
 
-    def _start_threads(self):
-        """Initialize and start the handler threads"""
-        # Message handling thread
-        self.message_thread = threading.Thread(target=self._message_handler)
-        self.message_thread.daemon = True
-        self.message_thread.start()
-        
-        # State update thread
-        self.update_thread = threading.Thread(target=self._state_updater)
-        self.update_thread.daemon = True
-        self.update_thread.start()
-
-    def _message_handler(self):
-        """Handle all outgoing messages and their responses"""
-        while self.running:
-            try:
-                # Process any pending messages
-                try:
-                    message = self.message_queue.get_nowait()
-                    self.client.send_message(message)
-                    response = self.client.receive_message()
-                    
-                    if response.get('status') == 'ok' and 'game_state' in response:
-                        self._update_queue_put(response['game_state'])
-                except queue.Empty:
-                    time.sleep(0.01)
-                    
-            except Exception as e:
-                logging.error(f"Message handling error: {e}")
-                time.sleep(0.1)
+    def _on_state(self, response):
+        """Reader thread: keep the newest state for the game loop and buffer it for interpolation"""
+        if response.get('seq') is not None:
+            self.snapshots.add(response['game_state'], response['seq'])
+        self._update_queue_put(response['game_state'])
+        self.last_update = time.time()
 
-    def _state_updater(self):
-        """Periodically request game state updates"""
-        while self.running:
-            try:
-                current_time = time.time()
-                if current_time - self.last_update >= self.update_interval:
-                    self.client.send_message({"action": "get_game_state"})
-                    
-                    response = self.client.receive_message()
-                    
-                    if response.get('status') == 'ok' and 'game_state' in response:
-                        self._update_queue_put(response['game_state'])
-                        self.last_update = current_time
-                    else:
-                        logging.warning(f"Unexpected response or missing 'game_state': {response}")
-                
-            except KeyError as e:
-                logging.error(f"State update error: Missing key {e}")
-                logging.error(f"Message causing KeyError: {response}")
-            except TypeError as e:
-                logging.error(f"State update error: Type error {e}")
-                logging.error(f"Message causing TypeError: {response}")
-            except Exception as e:
-                logging.error(f"State update error: Unexpected error {e}")
-                logging.error(f"Message causing Unexpected error: {response}")
-                time.sleep(0.1)
-                
-            time.sleep(0.01)
+    def _on_disconnected(self, error):
+        """Reader or writer thread: the connection is gone and no more states will come"""
+        self.running = False
+        logging.error(f"Disconnected from the server: {error}")
 
     def _update_queue_put(self, state):
         """Safely put a state update in the queue"""
@@ -119,11 +88,13 @@ class GameState:
             pass
         return updates
 
-    def stop(self):
-        """Stop all threads and cleanup"""
+    def stop(self, timeout=2.0):
+        """Send the quit and join the dispatcher's reader and writer threads; False if one did not stop"""
         self.running = False
         try:
-            self.send_action({"action": "quit_game"})
-            time.sleep(0.1)  # Give threads time to clean up
+            if not self.dispatcher.disconnected.is_set():
+                self.send_action({"action": "quit_game"})
+            return self.dispatcher.stop(timeout)  # Sends the quit before the threads exit
         except Exception as e:
             logging.error(f"Error during shutdown: {e}")
+            return False
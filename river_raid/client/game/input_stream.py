@@ -0,0 +1,43 @@
+# client/game/input_stream.py
+import os
+import time
+from shared.config import SERVER_TICK_INTERVAL
+
+class InputStream:
+    """Records the player's input as one bitmask per input tick and sends them in batches
+
+    Input ticks run at the server tick rate and are numbered from when
+    the stream started. That number is the command's sequence, which the
+    server uses to apply it on the matching tick. Ticks without input are
+    not sent.
+    """
+    def __init__(self, send, tick_interval=SERVER_TICK_INTERVAL, batch_ticks=None):
+        self.send = send  # Callable taking the message to queue
+        self.tick_interval = tick_interval
+        # CLIENT_INPUT_BATCH_TICKS: input ticks collected per message
+        self.BATCH_TICKS = batch_ticks if batch_ticks is not None else int(os.getenv("CLIENT_INPUT_BATCH_TICKS", 2))
+        self.start_time = time.monotonic()
+        self.sequence = 0  # Input tick being recorded
+        self.mask = 0
+        self.pending = []  # [sequence, mask] of finished ticks not sent yet
+
+    def press(self, bits):
+        """Add input bits to the current input tick"""
+        self.update()
+        self.mask |= bits
+
+    def update(self):
+        """Close finished input ticks and send a batch once it is due; call every frame"""
+        tick = int((time.monotonic() - self.start_time) / self.tick_interval)
+        if tick != self.sequence:
+            if self.mask:
+                self.pending.append([self.sequence, self.mask])
+            self.sequence, self.mask = tick, 0
+        if self.pending and tick - self.pending[0][0] >= self.BATCH_TICKS:
+            self.flush()
+
+    def flush(self):
+        """Send every finished input tick now"""
+        if self.pending:
+            self.send({"action": "input", "inputs": self.pending})
+            self.pending = []
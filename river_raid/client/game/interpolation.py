@@ -0,0 +1,100 @@
+# client/game/interpolation.py
+import threading
+import time
+from collections import deque
+from shared.config import SERVER_TICK_INTERVAL
+
+def interpolate_entities(older, newer, alpha, keys):
+    """Entity lists of older moved alpha of the way towards their position in newer
+
+    Entities are matched by id. One that newer no longer has stays where
+    older had it; one that only newer has appears once newer is reached.
+    """
+    lists = {}
+    for key in keys:
+        later = {entity["i"]: entity for entity in newer[key]}
+        entities = []
+        for entity in older[key]:
+            other = later.get(entity["i"])
+            if other is not None:
+                entity = dict(entity,
+                              x=entity["x"] + (other["x"] - entity["x"]) * alpha,
+                              y=entity["y"] + (other["y"] - entity["y"]) * alpha)
+            entities.append(entity)
+        lists[key] = entities
+    return lists
+
+class SnapshotBuffer:
+    """Ring buffer of received states, sampled a fixed delay in the past
+
+    Snapshot sequences advance once per server tick, so sequence times
+    the tick interval places each state on the server's timeline. The
+    smallest gap between that time and the arrival time over the buffer
+    is the least delayed delivery seen. sample() renders the server
+    timeline that long plus the interpolation delay ago, and blends the
+    two states around that instant. As long as the delay covers the
+    interval between snapshots and their jitter, there is always a newer
+    state to move towards, and motion stays smooth at any send rate.
+
+    Only the lists in keys are drawn in the past. The rest of a sample is
+    the newest state, so the player's own missiles stay on the same
+    timeline as the predicted player.
+    """
+
+    CAPACITY = 32
+    INTERPOLATED = ('e', 'f')  # Enemies and fuel depots
+
+    def __init__(self, delay, tick_interval=SERVER_TICK_INTERVAL, capacity=CAPACITY, keys=INTERPOLATED):
+        self.delay = delay  # Seconds rendered behind the newest state
+        self.keys = keys
+        self.tick_interval = tick_interval
+        self.lock = threading.Lock()
+        self.snapshots = deque(maxlen=capacity)  # (server time, state), oldest first
+        self.offsets = deque(maxlen=capacity)    # Arrival time minus server time of each
+
+    def add(self, state, sequence, arrival=None):
+        """Store a state published as sequence; older or repeated sequences are ignored"""
+        if arrival is None:
+            arrival = time.monotonic()
+        server_time = sequence * self.tick_interval
+        with self.lock:
+            if self.snapshots and server_time <= self.snapshots[-1][0]:
+                return
+            self.snapshots.append((server_time, state))
+            self.offsets.append(arrival - server_time)
+
+    def clear(self):
+        """Drop every state, e.g. after a reset"""
+        with self.lock:
+            self.snapshots.clear()
+            self.offsets.clear()
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def sample(self, now=None):
+        """The newest state with the interpolated lists as of now, or None while the buffer is empty"""
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            if not self.snapshots:
+                return None
+            render_time = now - min(self.offsets) - self.delay
+            snapshots = self.snapshots
+            view = dict(snapshots[-1][1])
+
+            # Before the oldest or after the newest state, hold rather than extrapolate
+            if render_time <= snapshots[0][0]:
+                view.update((key, snapshots[0][1][key]) for key in self.keys)
+                return view
+            if render_time >= snapshots[-1][0]:
+                return view
+
+            for index in range(len(snapshots) - 1, 0, -1):
+                older_time, older = snapshots[index - 1]
+                if older_time <= render_time:
+                    newer_time, newer = snapshots[index]
+                    break
+        alpha = (render_time - older_time) / (newer_time - older_time)
+        view.update(interpolate_entities(older, newer, alpha, self.keys))
+        return view
@@ -0,0 +1,72 @@
+# client/game/prediction.py
+from shared.config import SERVER_TICK_INTERVAL, MISSILE_STEP_INTERVAL
+from shared.entities import Missile
+from shared.input_commands import mask_actions
+
+class Prediction:
+    """Applies the player's own input at once and reconciles it with server states
+
+    Every press moves the local player, or spawns a predicted missile,
+    right away and is kept as an unconfirmed [sequence, mask] input. A
+    server state names the newest input sequence the server has applied
+    (key "n"). reconcile() drops the inputs that sequence confirms, puts
+    the player at the server's position and replays the rest on top, in
+    the order the server will apply them. So the screen follows the keys
+    whatever the round trip, and the server stays the authority.
+    """
+
+    MAX_PENDING_TICKS = 40  # Unconfirmed inputs older than this are given up on
+
+    def __init__(self, game_logic, input_stream, tick_interval=SERVER_TICK_INTERVAL):
+        self.game_logic = game_logic
+        self.input_stream = input_stream
+        self.tick_interval = tick_interval
+        self.pending = []  # [sequence, mask] not yet applied by the server, oldest first
+        self.missiles = []  # (sequence, Missile) spawned by pending fire inputs
+
+    def press(self, bits):
+        """Send input bits and apply them locally without waiting for the server"""
+        self.input_stream.press(bits)
+        sequence = self.input_stream.sequence
+        if self.pending and self.pending[-1][0] == sequence:
+            self.pending[-1][1] |= bits
+        else:
+            self.pending.append([sequence, bits])
+        self._apply(sequence, bits)
+
+    def _apply(self, sequence, mask):
+        player = self.game_logic.player
+        for action in mask_actions(mask):
+            if action["action"] == "move":
+                player.move(action["direction"])
+            else:
+                self.missiles.append((sequence, player.shoot()))
+
+    def reconcile(self, state):
+        """Rebase the pending inputs on an authoritative state; call after GameLogic took it"""
+        applied = state.get('n')
+        oldest = self.input_stream.sequence - self.MAX_PENDING_TICKS
+        self.pending = [entry for entry in self.pending
+                        if entry[0] > oldest and (applied is None or entry[0] > applied)]
+
+        # The player is already at the server's position; replay what it has not seen yet
+        self.missiles = []
+        for sequence, mask in self.pending:
+            self._apply(sequence, mask)
+
+    def clear(self):
+        """Forget every pending input, e.g. after a reset"""
+        self.pending = []
+        self.missiles = []
+
+    def predicted_missiles(self):
+        """Missiles of pending fire inputs, advanced to the current input tick; entity_id is the input sequence"""
+        now = self.input_stream.sequence
+        missiles = []
+        for sequence, missile in self.missiles:
+            steps = int((now - sequence) * self.tick_interval / MISSILE_STEP_INTERVAL)
+            if missile.y - steps >= -3:  # The server retires missiles past this line
+                predicted = Missile(missile.x, missile.y - steps, missile.missile_type)
+                predicted.entity_id = sequence  # Keeps its canvas item from frame to frame
+                missiles.append(predicted)
+        return missiles
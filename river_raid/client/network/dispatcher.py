@@ -0,0 +1,170 @@
+# client/network/dispatcher.py
+import queue
+import select
+import time
+import threading
+import logging
+
+class ClientDispatcher:
+    """Runs the client connection on one reader thread and one writer thread
+
+    The reader blocks in select() on the connection and routes every
+    message it reads to the handler registered for its type: "state",
+    "ack" or "error". No other thread reads, so no reply can be taken by
+    the wrong consumer. The writer blocks on the outgoing queue and sends
+    everything queued since its last wake-up as one "actions" batch, with
+    all input stream commands merged into one "input" message. It also
+    sends the periodic get_game_state poll when the server does not stream,
+    and the snapshot acks when it does.
+
+    A read or send error ends the connection: both threads stop, the
+    disconnected event is set and the "disconnected" handler is called
+    with the error.
+    """
+
+    SELECT_TIMEOUT = 0.5  # Seconds between checks of the running flag while idle
+
+    def __init__(self, client, outgoing, poll_interval=None):
+        self.client = client
+        self.outgoing = outgoing  # Queue of action dicts to send
+        self.poll_interval = poll_interval  # Seconds between get_game_state polls, None when streaming
+        self.handlers = {}  # Message type -> callback(message)
+        self.running = False
+        self.threads = []
+        self.last_sent = 0.0
+        self.disconnected = threading.Event()  # Set once the connection is lost
+        self.error = None  # The error that lost it
+        self.lock = threading.Lock()
+
+    def on(self, message_type, handler):
+        """Register the callback for "state", "ack" or "error" messages, or "disconnected" with the error"""
+        self.handlers[message_type] = handler
+
+    def start(self):
+        """Start the reader and writer threads"""
+        if self.running:
+            return
+        self.running = True
+        for name, target in (('client-reader', self._read_loop), ('client-writer', self._write_loop)):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=1.0):
+        """Flush anything still queued and join both threads; returns False if one is still running"""
+        self.running = False
+        try:
+            self.outgoing.put_nowait(None)  # Wakes the writer for its final flush
+        except queue.Full:
+            pass
+        stopped = True
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                logging.warning(f"Thread {thread.name} did not terminate cleanly")
+                stopped = False
+        self.threads = []
+        return stopped
+
+    @staticmethod
+    def message_type(message):
+        """Routing key of a message returned by ClientNetwork.read_messages()"""
+        if message.get('status') != 'ok':
+            return 'error'
+        if 'game_state' in message:
+            return 'state'
+        if 'accepted' in message:
+            return 'ack'
+        return None
+
+    def _read_loop(self):
+        """Wait for the connection to become readable and route what arrives"""
+        channel = self.client.channel
+        try:
+            while self.running:
+                readable, _, _ = select.select([channel], [], [], self.SELECT_TIMEOUT)
+                if not readable:
+                    continue
+                for message in self.client.read_messages():
+                    self._route(message)
+        except Exception as e:
+            if self.running:
+                self._disconnect(e)
+
+    def _route(self, message):
+        """Hand a message to its handler; a failing handler does not stop the reader"""
+        message_type = self.message_type(message)
+        handler = self.handlers.get(message_type)
+        if handler is None:
+            if message_type != 'ack':
+                logging.warning(f"Unrouted message from server: {message}")
+            return
+        try:
+            handler(message)
+        except Exception as e:
+            logging.error(f"Error in the {message_type} handler: {e}")
+
+    def _disconnect(self, error):
+        """Stop both threads after the connection failed and notify whoever waits on it"""
+        with self.lock:
+            if self.disconnected.is_set():
+                return
+            self.error = error
+            self.running = False
+            self.disconnected.set()
+        logging.error(f"Connection lost: {error}")
+        self.client.close()
+        try:
+            self.outgoing.put_nowait(None)  # Wakes the writer so it sees the loss
+        except queue.Full:
+            pass
+        handler = self.handlers.get('disconnected')
+        if handler is not None:
+            handler(error)
+
+    def _next_wait(self):
+        """How long the writer may block before a poll or an ack is due"""
+        if self.poll_interval is not None:
+            return max(0.0, self.last_sent + self.poll_interval - time.time())
+        if self.client.stream_rate:
+            return self.client.ACK_INTERVAL
+        return self.SELECT_TIMEOUT
+
+    def _write_loop(self):
+        """Send queued actions as one batch per wake-up, plus polls and acks when due"""
+        while (self.running or not self.outgoing.empty()) and not self.disconnected.is_set():
+            try:
+                try:
+                    actions = [self.outgoing.get(timeout=self._next_wait())]
+                except queue.Empty:
+                    actions = []
+                # Everything queued meanwhile goes out in the same message
+                while True:
+                    try:
+                        actions.append(self.outgoing.get_nowait())
+                    except queue.Empty:
+                        break
+                actions = [action for action in actions if action is not None]
+                # Input stream commands travel in their own message
+                commands = [command for action in actions if action.get("action") == "input"
+                            for command in action["inputs"]]
+                actions = [action for action in actions if action.get("action") != "input"]
+
+                if actions:
+                    self.client.send_message(actions[0] if len(actions) == 1 else {"actions": actions})
+                    self.last_sent = time.time()
+                if commands:
+                    self.client.send_message({"action": "input", "inputs": commands})
+                    self.last_sent = time.time()
+                polling = self.poll_interval is not None and not (actions or commands)
+                if polling and time.time() - self.last_sent >= self.poll_interval:
+                    self.client.send_message({"action": "get_game_state"})
+                    self.last_sent = time.time()
+                if self.client.stream_rate:
+                    self.client.acknowledge()
+            except OSError as e:
+                self._disconnect(e)
+            except Exception as e:
+                # Only the batch that failed to encode is lost
+                logging.error(f"Writer error: {e}")
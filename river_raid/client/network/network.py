@@ -2,88 +2,231 @@
 import paramiko
 import os
 import time
-import json
 import logging
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 from shared.network_utils import serialize_message, deserialize_message
+from shared.transport import create_transport
+from shared import binary_protocol
+from shared.binary_protocol import PROTOCOL_JSON, PROTOCOL_BINARY, BINARY_VERSION, encode_input
+from shared.framing import FrameBuffer
+from shared.delta import apply_delta
 
 load_dotenv()
 
 class ClientNetwork:
     def __init__(self):
-        self.host = os.getenv("CLIENT_HOST")
-        self.port = int(os.getenv("CLIENT_PORT", 2200))
-        self.username = os.getenv("CLIENT_USERNAME")
-        self.key_filename = os.getenv("CLIENT_KEY_FILENAME")
-        self.key_passphrase = os.getenv("CLIENT_KEY_PASSPHRASE")
-        self.ssh_client = paramiko.SSHClient()
+        # CLIENT_TRANSPORT picks ssh (default), tcp or unix
+        self.transport = create_transport("CLIENT")
+        self.host = getattr(self.transport, 'host', None)
+        self.port = getattr(self.transport, 'port', None)
+
+        # CLIENT_PROTOCOL=binary asks the server for the compact protocol; JSON until it agrees
+        self.requested_protocol = os.getenv("CLIENT_PROTOCOL", PROTOCOL_BINARY)
+        self.protocol = PROTOCOL_JSON
+
+        # Delta snapshots: requests acknowledge the newest snapshot held, replies may be diffs against it
+        self.delta_enabled = os.getenv("CLIENT_DELTA", "1") != "0"
+        self.STATE_HISTORY = 16  # Received states kept as possible baselines
+        self.states = OrderedDict()  # Snapshot sequence -> state
+        self.last_sequence = None
+        self.acked_sequence = None  # Newest sequence the server has been told about
+
+        # CLIENT_STREAM_RATE asks the server to push snapshots at that many per second; 0 polls instead
+        # Entities are interpolated between snapshots, so half the tick rate looks as smooth
+        self.requested_stream_rate = float(os.getenv("CLIENT_STREAM_RATE", 10))
+        self.stream_rate = None  # Granted by the server, None while polling
+        self.ACK_INTERVAL = 0.25  # Seconds between snapshot acks when no inputs carry one
+        self.last_ack_time = 0.0
+        self.resync = False  # Baseline lost; the next ack must go out without a sequence
+        self.send_lock = threading.Lock()  # Callers of the blocking API may share the connection
+        self.receive_lock = threading.Lock()
+        self.closed = False
 
     def connect(self):
-        logging.info("Establishing SSH connection to server...")
+        logging.info(f"Establishing {self.transport.name} connection to server...")
         try:
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.ssh_client.connect(
-                self.host, 
-                port=self.port, 
-                username=self.username, 
-                key_filename=self.key_filename,
-                passphrase=self.key_passphrase
-            )
-            self.channel = self.ssh_client.get_transport().open_session()
-            self.buffer = ""
-            logging.info("SSH connection established.")
+            # A socket or an SSH channel; both expose sendall/recv/close
+            self.channel = self.transport.connect()
+            self.reader = FrameBuffer()  # Replies are decoded straight out of its buffer
+            logging.info(f"{self.transport.name} connection established.")
+            if self.requested_protocol == PROTOCOL_BINARY or self.requested_stream_rate > 0:
+                self._negotiate()
         except paramiko.ssh_exception.NoValidConnectionsError as e:
             logging.error(f"Connection Error - Details: {str(e)}")
             logging.error(f"Host: {self.host}, Port: {self.port}")
             raise
         except Exception as e:
-            logging.error(f"Failed to establish SSH connection: {str(e)}")
+            logging.error(f"Failed to establish {self.transport.name} connection: {str(e)}")
             raise
 
+    def _negotiate(self):
+        """Ask for the protocol and snapshot stream; older servers answer without those fields"""
+        hello = {"action": "hello", "protocol": self.requested_protocol, "version": BINARY_VERSION}
+        if self.requested_stream_rate > 0:
+            hello["stream"] = self.requested_stream_rate
+        self.send_message(hello)
+        line = self.reader.next_line()
+        while line is None:
+            if not self.reader.receive(self.channel):
+                raise ConnectionError("Server closed the connection during protocol negotiation")
+            line = self.reader.next_line()
+        reply = deserialize_message(str(line, 'utf-8')) or {}
+        self.protocol = reply.get("protocol", PROTOCOL_JSON)
+        self.stream_rate = reply.get("stream")
+        logging.info(f"Using the {self.protocol} protocol"
+                     + (f", snapshots pushed at {self.stream_rate:g} Hz." if self.stream_rate else "."))
+
     def send_message(self, message):
-        message_json = serialize_message(message) + '\n'
-        #logging.info(f"Sending message: {message_json.strip()}")  # Remove '\n' from log
-        self.channel.send(message_json.encode('utf-8'))
+        if self.delta_enabled and self.last_sequence is not None and message.get("action") != "hello":
+            message = dict(message, ack=self.last_sequence)
+            self.acked_sequence = self.last_sequence
+        if self.protocol == PROTOCOL_BINARY:
+            data = encode_input(message)
+        else:
+            #logging.info(f"Sending message: {message}")
+            data = (serialize_message(message) + '\n').encode('utf-8')
+        with self.send_lock:
+            self.channel.sendall(data)
+            self.last_ack_time = time.time()
 
-    def receive_message(self):
+    def acknowledge(self):
+        """While streaming, tell the server which snapshot to diff against when no input carried an ack lately
+
+        Sent as an empty "actions" batch, which the server does not answer.
+        """
+        if not self.stream_rate or not self.delta_enabled:
+            return
+        if not self.resync and (self.last_sequence in (None, self.acked_sequence)
+                                or time.time() - self.last_ack_time < self.ACK_INTERVAL):
+            return
+        self.resync = False
+        self.send_message({"actions": []})
+
+    def _receive(self):
+        """Read more from the server into the frame buffer"""
+        if not self.reader.receive(self.channel):
+            raise ConnectionError("Server closed the connection")
+
+    def _next_message(self):
+        """Next complete message already in the frame buffer, decoded, or None"""
         while True:
+            if self.protocol == PROTOCOL_BINARY:
+                payload = self.reader.next_frame()
+                return binary_protocol.decode(payload) if payload is not None else None
+
+            line = self.reader.next_line()
+            if line is None:
+                return None
+            message = str(line, 'utf-8')
+            if not message.strip():
+                logging.warning("Received an empty line")
+                continue
+            deserialized_message = deserialize_message(message)
+            if deserialized_message is not None:
+                return deserialized_message
+
+    def _unwrap(self, message):
+        """Resolve a direct, delta or batched state reply to {"status": "ok", "game_state": ...}"""
+        if message.get('status') != 'ok':
+            return message
+        if message.get('responses'):
+            # Every response of a batch carries the same snapshot
+            message = message['responses'][0]
+        if 'game_state' in message or 'delta' in message:
+            return self._resolve(message)
+        return message
+
+    def receive_message(self):
+        """Next state reply; one thread at a time reads from the shared frame buffer
+
+        Raises ConnectionError, with the connection closed, once the server
+        is gone or sends something that cannot be framed.
+        """
+        with self.receive_lock:
+            while True:
+                try:
+                    message = self._next_message()
+                    if message is None:
+                        self._receive()
+                        continue
+                    message = self._unwrap(message)
+                except (OSError, ValueError) as e:
+                    self._fail(e)
+                except Exception as e:
+                    # The message was already taken off the buffer; skip it
+                    logging.error(f"Error receiving message: {e}")
+                    continue
+                if 'game_state' in message:
+                    return message
+                if 'accepted' in message:
+                    continue  # Input ack while streaming; nothing to return
+                logging.warning(f"Unexpected message without 'game_state': {message}")
+
+    def read_messages(self):
+        """Read once from the connection and return every message completed by it
+
+        State replies come back resolved like receive_message() returns
+        them, anything else (input acks, errors) as decoded. Blocks until
+        the connection is readable, and raises ConnectionError like
+        receive_message().
+        """
+        with self.receive_lock:
             try:
-                part = self.channel.recv(2048).decode('utf-8')
-                self.buffer += part
-                
-                while '\n' in self.buffer:
-                    message, self.buffer = self.buffer.split('\n', 1)
-                    if message.strip():
-                        try:
-                            deserialized_message = json.loads(message)
-                            if deserialized_message.get('status') == 'ok':
-                                if 'game_state' in deserialized_message:
-                                    # Handle direct game_state
-                                    game_state = deserialized_message['game_state']
-                                    return deserialized_message
-                                elif 'responses' in deserialized_message and len(deserialized_message['responses']) > 0:
-                                    # Handle nested game_state
-                                    nested_response = deserialized_message['responses'][0]
-                                    if 'game_state' in nested_response:
-                                        return nested_response
-                                else:
-                                    logging.warning(f"Received 'ok' status but no 'game_state' key found. Full message: {deserialized_message}")
-                            else:
-                                logging.warning(f"Unexpected status in message: {deserialized_message.get('status')}. Full message: {deserialized_message}")
-                        except json.JSONDecodeError as e:
-                            logging.warning(f"Failed to decode message: {message[:25]}, Error: {e}")
-                            continue
-                        except ValueError as e:
-                            logging.warning(f"Malformed message: {message[:25]}, Error: {e}")
-                            continue
-                    else:
-                        logging.warning(f"Received invalid JSON message: {message[:25]}")
-            except Exception as e:
-                logging.error(f"Error receiving message: {e}")
-                time.sleep(0.1)
-        return None
+                self._receive()
+                if self.protocol == PROTOCOL_BINARY:
+                    return [self._unwrap(binary_protocol.decode(payload)) for payload in self.reader.next_frames()]
+                messages = []
+                while True:
+                    message = self._next_message()
+                    if message is None:
+                        return messages
+                    messages.append(self._unwrap(message))
+            except (OSError, ValueError) as e:
+                self._fail(e)
+
+    def _fail(self, error):
+        """Close the connection after a read error and raise it as ConnectionError
+
+        A frame that cannot be parsed stays at the head of the buffer, and
+        a lost connection fails every read, so retrying would never end.
+        """
+        logging.error(f"Closing the connection after a read error: {error}")
+        self.close()
+        if isinstance(error, ConnectionError):
+            raise error
+        raise ConnectionError(f"Unreadable server stream: {error}") from error
+
+    def _resolve(self, response):
+        """Turn a full or delta response into {"status": "ok", "seq": ..., "game_state": ...} and remember it"""
+        if 'delta' in response:
+            base = self.states.get(response['base'])
+            if base is None:
+                # Baseline already discarded: stop acking so the next reply is a full snapshot
+                logging.warning(f"Delta against unknown snapshot {response['base']}, requesting a full one")
+                self.last_sequence = None
+                self.resync = True
+                latest = next(reversed(self.states.values()), None)
+                return {'status': 'ok', 'game_state': latest} if latest is not None else response
+            game_state = apply_delta(base, response['delta'])
+        else:
+            game_state = response['game_state']
+
+        sequence = response.get('seq')
+        if sequence is None:
+            return {'status': 'ok', 'game_state': game_state}
+        self.states[sequence] = game_state
+        while len(self.states) > self.STATE_HISTORY:
+            self.states.popitem(last=False)
+        if self.last_sequence is None or sequence > self.last_sequence:
+            self.last_sequence = sequence
+        return {'status': 'ok', 'seq': sequence, 'game_state': game_state}
 
     def close(self):
-        logging.info("Closing SSH connection.")
+        if self.closed:
+            return
+        self.closed = True
+        logging.info(f"Closing {self.transport.name} connection.")
         self.channel.close()
-        self.ssh_client.close()
+        self.transport.close()
@@ -0,0 +1,98 @@
+# client/test/test_framing.py
+import socket
+import pytest
+from shared.framing import FrameBuffer
+from shared.binary_protocol import frame, FRAME_HEADER
+
+class Chunked:
+    """Connection with only recv(), like a paramiko Channel, handing out data in fixed pieces"""
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+    def recv(self, limit):
+        piece, self.data = self.data[:min(self.size, limit)], self.data[min(self.size, limit):]
+        return piece
+
+def test_frames_split_across_reads_come_out_whole():
+    """A frame is held back until all of it, header included, has arrived"""
+    payloads = [b'a' * 10, b'', b'b' * 300, b'c']
+    data = b''.join(frame(payload) for payload in payloads)
+    framer = FrameBuffer(initial_size=64)
+    received = []
+    for offset in range(len(data)):
+        framer.feed(data[offset:offset + 1])
+        payload = framer.next_frame()
+        if payload is not None:
+            received.append(bytes(payload))
+    assert received == payloads and len(framer) == 0
+
+def test_next_frames_returns_complete_frames_and_keeps_the_partial_one():
+    framer = FrameBuffer(initial_size=64)
+    second = frame(b'second' * 20)
+    framer.feed(frame(b'first') + frame(b'') + second[:3])
+    assert [bytes(payload) for payload in framer.next_frames()] == [b'first', b'']
+    assert framer.next_frames() == []
+    framer.feed(second[3:50])
+    assert framer.next_frames() == []
+    framer.feed(second[50:])
+    assert [bytes(payload) for payload in framer.next_frames()] == [b'second' * 20]
+
+def test_receive_reassembles_frames_from_small_reads():
+    """Both read paths, recv_into on sockets and recv on channels, end up with the same frames"""
+    payloads = [bytes([n]) * n for n in range(1, 200, 7)]
+    data = b''.join(frame(payload) for payload in payloads)
+
+    framer = FrameBuffer(initial_size=64)
+    received = []
+    connection = Chunked(data, 13)
+    while framer.receive(connection):
+        received.extend(bytes(payload) for payload in framer.next_frames())
+    assert received == payloads
+
+    receiver, sender = socket.socketpair()
+    try:
+        sender.sendall(data)
+        sender.shutdown(socket.SHUT_WR)
+        framer = FrameBuffer(initial_size=64)
+        received = []
+        while framer.receive(receiver):
+            received.extend(bytes(payload) for payload in framer.next_frames())
+        assert received == payloads
+    finally:
+        receiver.close()
+        sender.close()
+
+def test_oversized_frame_is_refused_without_being_consumed():
+    """A length over the limit raises, and keeps raising, since its bytes never leave the buffer"""
+    framer = FrameBuffer(max_frame_size=100)
+    framer.feed(frame(b'x' * 100) + FRAME_HEADER.pack(101) + b'y' * 101)
+    assert bytes(framer.next_frame()) == b'x' * 100
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            framer.next_frame()
+
+    # next_frames() hands out the good frames first, then refuses the oversized one
+    framer = FrameBuffer(max_frame_size=100)
+    framer.feed(frame(b'ok') + FRAME_HEADER.pack(10 ** 6))
+    assert [bytes(payload) for payload in framer.next_frames()] == [b'ok']
+    with pytest.raises(ValueError):
+        framer.next_frames()
+
+def test_lines_split_across_reads_and_overlong_lines():
+    framer = FrameBuffer(max_frame_size=50)
+    framer.feed(b'{"a": ')
+    assert framer.next_line() is None
+    framer.feed(b'1}\n{"b"')
+    assert bytes(framer.next_line()) == b'{"a": 1}'
+    assert framer.next_line() is None
+    framer.feed(b': 2}\n\n')
+    assert bytes(framer.next_line()) == b'{"b": 2}'
+    assert bytes(framer.next_line()) == b''
+
+    # A line may reach the limit while its newline is still to come, but not pass it
+    framer.feed(b'z' * 50)
+    assert framer.next_line() is None
+    framer.feed(b'z')
+    with pytest.raises(ValueError):
+        framer.next_line()
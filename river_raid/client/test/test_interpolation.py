@@ -0,0 +1,71 @@
+# client/test/test_interpolation.py
+import pytest
+from client.game.interpolation import SnapshotBuffer, interpolate_entities
+
+TICK = 0.1
+
+def _state(enemies, depots=(), missiles=(), score=0):
+    return {"e": list(enemies), "f": list(depots), "m": list(missiles), "s": score}
+
+def _enemy(entity_id, x, y):
+    return {"i": entity_id, "x": x, "y": y, "t": "B"}
+
+def _buffer(*states, delay=TICK):
+    """A buffer holding states published on consecutive ticks from sequence 10, each arriving on time"""
+    buffer = SnapshotBuffer(delay, tick_interval=TICK)
+    for offset, state in enumerate(states):
+        sequence = 10 + offset
+        buffer.add(state, sequence, arrival=sequence * TICK)
+    return buffer
+
+def test_sample_blends_the_two_states_around_the_render_time():
+    """Rendering delay behind the newest arrival lands between snapshots and moves entities linearly"""
+    buffer = _buffer(_state([_enemy(1, 0.0, 10.0)], depots=[_enemy(5, 4.0, 0.0)], missiles=["old"], score=1),
+                     _state([_enemy(1, 2.0, 14.0)], depots=[_enemy(5, 4.0, 1.0)], missiles=["new"], score=2))
+    view = buffer.sample(now=1.1 + 0.25 * TICK)  # Render time a quarter of the way from sequence 10 to 11
+    enemy, = view["e"]
+    assert (enemy["x"], enemy["y"]) == (pytest.approx(0.5), pytest.approx(11.0))
+    assert view["f"][0]["y"] == pytest.approx(0.25)
+    # Lists that are not interpolated come from the newest state
+    assert view["m"] == ["new"] and view["s"] == 2
+
+def test_sample_clamps_outside_the_buffer():
+    """Before the oldest state its lists are held, after the newest that state is held, with no extrapolation"""
+    oldest = _state([_enemy(1, 0.0, 0.0)], score=1)
+    newest = _state([_enemy(1, 5.0, 5.0)], score=2)
+    buffer = _buffer(oldest, newest)
+    assert SnapshotBuffer(TICK).sample(now=1.0) is None
+
+    early = buffer.sample(now=0.5)
+    assert early["e"] == oldest["e"] and early["s"] == 2
+    late = buffer.sample(now=5.0)
+    assert late["e"] == newest["e"] and late["s"] == 2
+
+def test_entities_appear_and_disappear_at_snapshot_boundaries():
+    """A removed entity stays where it was until the next snapshot; a new one appears once reached"""
+    buffer = _buffer(_state([_enemy(1, 0.0, 0.0), _enemy(2, 3.0, 3.0)]),
+                     _state([_enemy(1, 1.0, 0.0), _enemy(3, 7.0, 7.0)]),
+                     _state([_enemy(1, 2.0, 0.0), _enemy(3, 8.0, 7.0)]))
+    between = buffer.sample(now=1.15)
+    assert [entity["i"] for entity in between["e"]] == [1, 2]
+    assert between["e"][0]["x"] == pytest.approx(0.5)
+    assert between["e"][1] == _enemy(2, 3.0, 3.0)  # Gone from the newer state, held in place
+
+    after = buffer.sample(now=1.25)
+    assert [entity["i"] for entity in after["e"]] == [1, 3]
+    assert after["e"][1]["x"] == pytest.approx(7.5)
+
+    assert interpolate_entities(_state([]), _state([_enemy(4, 1.0, 1.0)]), 0.99, ("e",)) == {"e": []}
+
+def test_render_time_follows_the_least_delayed_arrival():
+    """Late arrivals do not push rendering back; stale or repeated sequences are ignored"""
+    buffer = SnapshotBuffer(TICK, tick_interval=TICK)
+    buffer.add(_state([_enemy(1, 0.0, 0.0)]), 10, arrival=1.0)
+    buffer.add(_state([_enemy(1, 10.0, 0.0)]), 11, arrival=1.3)  # 0.2 late
+    buffer.add(_state([_enemy(1, 99.0, 0.0)]), 11, arrival=1.1)
+    buffer.add(_state([_enemy(1, 99.0, 0.0)]), 9, arrival=1.1)
+    assert len(buffer) == 2
+    assert buffer.sample(now=1.16)["e"][0]["x"] == pytest.approx(6.0)
+
+    buffer.clear()
+    assert buffer.sample(now=1.16) is None
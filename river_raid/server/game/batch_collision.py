@@ -0,0 +1,124 @@
+# server/game/batch_collision.py
+import random
+import logging
+import numpy as np
+from shared.config import SCALE, BOARD_WIDTH, BOARD_HEIGHT
+
+def entity_boxes(entities, store=None):
+    """(x, y, width, height) arrays in board units for a list of entities"""
+    count = len(entities)
+    if store is not None and count:
+        slots = store.slots_of(entities)
+        return (store.x[slots], store.y[slots],
+                store.width[slots] / SCALE, store.height[slots] / SCALE)
+
+    x = np.fromiter((entity.x for entity in entities), dtype=np.float64, count=count)
+    y = np.fromiter((entity.y for entity in entities), dtype=np.float64, count=count)
+    width = np.fromiter((getattr(entity, 'width', SCALE) for entity in entities),
+                        dtype=np.float64, count=count) / SCALE
+    height = np.fromiter((getattr(entity, 'height', SCALE) for entity in entities),
+                         dtype=np.float64, count=count) / SCALE
+    return x, y, width, height
+
+def overlap_matrix(boxes_a, boxes_b):
+    """Pairwise AABB overlap test: boolean matrix of shape (len a, len b)"""
+    ax, ay, aw, ah = (column[:, None] for column in boxes_a)
+    bx, by, bw, bh = (column[None, :] for column in boxes_b)
+    return (ax < bx + bw) & (ax + aw > bx) & (ay < by + bh) & (ay + ah > by)
+
+def overlaps_box(box, boxes):
+    """Indices of boxes overlapping a single (x, y, width, height) box"""
+    x, y, width, height = box
+    bx, by, bw, bh = boxes
+    hits = (x < bx + bw) & (x + width > bx) & (y < by + bh) & (y + height > by)
+    return np.flatnonzero(hits)
+
+def alive_mask(entities, live_entities):
+    """Boolean mask of which entities are still present in live_entities (O(1) membership)"""
+    return np.fromiter((entity in live_entities for entity in entities), dtype=np.bool_, count=len(entities))
+
+def first_hits(overlaps, target_alive):
+    """Pair each row, in order, with its first still-alive overlapping column
+
+    Mirrors the scalar rule: a missile is spent on its first hit and an
+    enemy can only be destroyed once. target_alive is updated in place.
+    """
+    pairs = []
+    for row in np.flatnonzero(overlaps.any(axis=1)).tolist():
+        candidates = np.flatnonzero(overlaps[row] & target_alive)
+        if candidates.size:
+            column = int(candidates[0])
+            target_alive[column] = False
+            pairs.append((row, column))
+    return pairs
+
+def cross_check(trials=200, seed=0, storages=None):
+    """Differential test: run the hash and vector backends on identical random scenes
+
+    Every backend runs once per entity storage (the list store and the
+    array store by default). Each run must end like the hash backend on
+    the list store. The vector backend reads its boxes from the array
+    store when there is one.
+    """
+    from server.game.game_state import GameState
+    from server.game.collision_handler import CollisionHandler
+    from shared.entities import EnemyB, EnemyJ, EnemyH, FuelDepot, Missile
+
+    if storages is None:
+        storages = (GameState.STORAGE_LIST, GameState.STORAGE_ARRAY)
+    runs = [(backend, storage) for storage in storages
+            for backend in (CollisionHandler.BACKEND_HASH, CollisionHandler.BACKEND_VECTOR)]
+    reference = (CollisionHandler.BACKEND_HASH, GameState.STORAGE_LIST)
+    if reference not in runs:
+        runs.insert(0, reference)
+
+    rng = random.Random(seed)
+    enemy_types = [EnemyB, EnemyJ, EnemyH]
+    mismatches = []
+
+    for trial in range(trials):
+        # Crowd everything near the player so most trials have several hits
+        scene = {
+            'enemies': [(rng.randrange(3), rng.uniform(0, BOARD_WIDTH - 3), rng.uniform(BOARD_HEIGHT - 12, BOARD_HEIGHT))
+                        for _ in range(rng.randint(0, GameState.MAX_ENEMIES))],
+            'missiles': [(rng.uniform(0, BOARD_WIDTH), rng.uniform(BOARD_HEIGHT - 12, BOARD_HEIGHT))
+                         for _ in range(rng.randint(0, GameState.MAX_MISSILES))],
+            'depots': [(rng.uniform(0, BOARD_WIDTH - 1), rng.uniform(BOARD_HEIGHT - 4, BOARD_HEIGHT))
+                       for _ in range(rng.randint(0, GameState.MAX_FUEL_DEPOTS))],
+            'player_x': rng.randint(0, int(BOARD_WIDTH) - 1)
+        }
+
+        outcomes = {}
+        for backend, storage in runs:
+            game_state = GameState(storage=storage)
+            game_state.player.x = scene['player_x']
+            for type_index, x, y in scene['enemies']:
+                game_state.add_enemy(enemy_types[type_index](x, y, game_state))
+            for x, y in scene['missiles']:
+                game_state.add_missile(Missile(x, y, "straight"))
+            for x, y in scene['depots']:
+                game_state.add_fuel_depot(FuelDepot(x, y))
+
+            enemies = list(game_state.enemies)
+            missiles = list(game_state.missiles)
+            depots = list(game_state.fuel_depots)
+            CollisionHandler(game_state, backend=backend).check_all_collisions()
+
+            outcomes[(backend, storage)] = (
+                [enemies.index(enemy) for enemy in game_state.enemies],
+                [missiles.index(missile) for missile in game_state.missiles],
+                [depots.index(depot) for depot in game_state.fuel_depots],
+                game_state.score, game_state.lives, game_state.fuel
+            )
+
+        if any(outcome != outcomes[reference] for outcome in outcomes.values()):
+            mismatches.append({'trial': trial, 'outcomes': outcomes})
+
+    if mismatches:
+        logging.warning(f"batch_collision: {len(mismatches)} of {trials} scenes disagree with the hash backend on the list store")
+    return mismatches
+
+if __name__ == "__main__":
+    trials = 500
+    failed = cross_check(trials)
+    print(f"{trials - len(failed)}/{trials} scenes match between the hash and vector backends on both stores")
@@ -0,0 +1,198 @@
+# server/game/batch_movement.py
+import time
+import random
+import logging
+import numpy as np
+from shared.config import BOARD_WIDTH, BOARD_HEIGHT
+from shared.entities import EnemyB, EnemyJ, EnemyH, FuelDepot, Missile
+from server.game.entity_store import EntityStore, TYPE_CODES
+
+class BatchMovement:
+    """Advances every stored entity of one type in a single NumPy pass"""
+
+    # Same rules as the scalar move() methods in shared/entities.py
+    DIRECTION_CHANGE_CHANCE = 0.2  # random.randrange(0, 10) > 7
+    BOUNCE_WIDTH = {'B': 3, 'H': 2}
+    DESPAWN_MARGIN = 3
+
+    def __init__(self, store, rng=None, seed=None):
+        self.store = store
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+    def move(self, type_name, helicopter_draws=None):
+        """Move every live entity of a type; returns the slots that left the board"""
+        store = self.store
+        slots = store.live_slots(TYPE_CODES[type_name])
+        if slots.size == 0:
+            return slots
+
+        if type_name == 'H':
+            self._reroll_helicopters(slots, helicopter_draws)
+
+        x = store.x[slots] + store.vx[slots]
+        y = store.y[slots] + store.vy[slots]
+        store.x[slots] = x
+        store.y[slots] = y
+
+        # Boundary bounce flips the heading but keeps the speed
+        if type_name in self.BOUNCE_WIDTH:
+            speed_x = store.speed_x[slots]
+            left = x < 0
+            right = ~left & (x + self.BOUNCE_WIDTH[type_name] > BOARD_WIDTH)
+            store.vx[slots[left]] = speed_x[left]
+            store.vx[slots[right]] = -speed_x[right]
+            if type_name == 'H':
+                top = y < 0
+                store.vy[slots[top]] = store.speed_y[slots[top]]
+
+        if type_name == 'missile':
+            out_of_bounds = y < -self.DESPAWN_MARGIN
+        elif type_name == 'fuel':
+            out_of_bounds = y >= BOARD_HEIGHT + self.DESPAWN_MARGIN
+        else:
+            out_of_bounds = y > BOARD_HEIGHT + self.DESPAWN_MARGIN
+
+        gone = slots[out_of_bounds]
+        store.alive[gone] = False
+        return gone
+
+    def _reroll_helicopters(self, slots, draws=None):
+        """Batched random heading changes for helicopters"""
+        store = self.store
+        if draws is None:
+            count = slots.size
+            draws = {
+                'change': self.rng.random(count) < self.DIRECTION_CHANGE_CHANCE,
+                'vertical_direction': self.rng.integers(-1, 2, count),
+                'horizontal_direction': self.rng.integers(-1, 2, count),
+                'vertical_speed': self.rng.uniform(0.2, 0.8, count),
+                'horizontal_speed': self.rng.uniform(0.2, 0.8, count)
+            }
+
+        change = draws['change']
+        changed = slots[change]
+        store.speed_x[changed] = draws['horizontal_speed'][change]
+        store.speed_y[changed] = draws['vertical_speed'][change]
+        store.vx[changed] = draws['horizontal_direction'][change] * store.speed_x[changed]
+        store.vy[changed] = draws['vertical_direction'][change] * store.speed_y[changed]
+
+def _scalar_clone(store, slot, type_name):
+    """Build a plain entity object from one row of the store"""
+    x, y = float(store.x[slot]), float(store.y[slot])
+    vx, vy = float(store.vx[slot]), float(store.vy[slot])
+    if type_name in ('B', 'H'):
+        entity = EnemyB(x, y, None) if type_name == 'B' else EnemyH(x, y, None)
+        entity.horizontal_speed = float(store.speed_x[slot])
+        entity.vertical_speed = float(store.speed_y[slot])
+        entity.horizontal_direction = int(np.sign(vx))
+        entity.vertical_direction = int(np.sign(vy))
+    elif type_name == 'J':
+        entity = EnemyJ(x, y, None)
+        entity.direction = vy
+    elif type_name == 'fuel':
+        entity = FuelDepot(x, y)
+    else:
+        entity = Missile(x, y, "straight")
+    entity.running = True
+    return entity
+
+def cross_check(store, seed=0, tolerance=1e-9):
+    """Move a copy of the store with both paths and list every disagreement"""
+    batch_store = store.copy()
+    batch = BatchMovement(batch_store)
+    mismatches = []
+
+    for type_name in ('B', 'J', 'H', 'missile', 'fuel'):
+        slots = store.live_slots(TYPE_CODES[type_name])
+        clones = [_scalar_clone(store, slot, type_name) for slot in slots.tolist()]
+
+        # Replay the exact draws EnemyH.move will make from the match RNG
+        draws = None
+        if type_name == 'H':
+            draw_rng = random.Random(seed)
+            draws = {key: [] for key in ('change', 'vertical_direction', 'horizontal_direction',
+                                         'vertical_speed', 'horizontal_speed')}
+            for _ in clones:
+                change = draw_rng.randrange(0, 10) > 7
+                draws['change'].append(change)
+                if change:
+                    draws['vertical_direction'].append(draw_rng.choice([-1, 0, 1]))
+                    draws['horizontal_direction'].append(draw_rng.choice([-1, 0, 1]))
+                    draws['vertical_speed'].append(draw_rng.uniform(0.2, 0.8))
+                    draws['horizontal_speed'].append(draw_rng.uniform(0.2, 0.8))
+                else:
+                    for key in ('vertical_direction', 'horizontal_direction',
+                                'vertical_speed', 'horizontal_speed'):
+                        draws[key].append(0)
+            draws = {key: np.array(values) for key, values in draws.items()}
+
+            # The clones share one match RNG seeded the same way, like entities sharing GameState.rng
+            match_rng = random.Random(seed)
+            for clone in clones:
+                clone.rng = match_rng
+
+        for clone in clones:
+            clone.move()
+        gone = set(batch.move(type_name, helicopter_draws=draws).tolist())
+
+        for slot, clone in zip(slots.tolist(), clones):
+            batch_x, batch_y = float(batch_store.x[slot]), float(batch_store.y[slot])
+            scalar_gone = clone.y >= BOARD_HEIGHT + 3 if type_name == 'fuel' else not clone.running
+            if (abs(batch_x - clone.x) > tolerance or abs(batch_y - clone.y) > tolerance or
+                    (slot in gone) != scalar_gone):
+                mismatches.append({
+                    'slot': slot,
+                    'type': type_name,
+                    'scalar': (clone.x, clone.y, scalar_gone),
+                    'batch': (batch_x, batch_y, slot in gone)
+                })
+
+    if mismatches:
+        logging.warning(f"batch_movement: {len(mismatches)} mismatches against the scalar path")
+    return mismatches
+
+def _fill_store(count, rng):
+    """Store and matching scalar objects with count entities spread over all types"""
+    store = EntityStore(capacity=count)
+    entities = []
+    factories = [
+        lambda x, y: EnemyB(x, y, None),
+        lambda x, y: EnemyJ(x, y, None),
+        lambda x, y: EnemyH(x, y, None),
+        lambda x, y: FuelDepot(x, y),
+        lambda x, y: Missile(x, y, "straight")
+    ]
+    for i in range(count):
+        entity = factories[i % len(factories)](rng.uniform(0, BOARD_WIDTH - 3), rng.uniform(0, BOARD_HEIGHT))
+        store.add(entity)
+        entities.append(entity)
+    return store, entities
+
+def benchmark(counts=(10, 100, 1000, 5000, 20000), ticks=50):
+    """Per-tick movement cost of the scalar and batch paths against entity count"""
+    rng = random.Random(1)
+    results = []
+    for count in counts:
+        store, entities = _fill_store(count, rng)
+        batch = BatchMovement(store, np.random.default_rng(1))
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for entity in entities:
+                entity.move()
+        scalar_time = (time.perf_counter() - start) / ticks
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for type_name in ('B', 'J', 'H', 'missile', 'fuel'):
+                batch.move(type_name)
+            store.alive[:count] = True  # Keep the population constant
+        batch_time = (time.perf_counter() - start) / ticks
+
+        results.append((count, scalar_time, batch_time))
+    return results
+
+if __name__ == "__main__":
+    print(f"{'entities':>10} {'scalar ms/tick':>15} {'batch ms/tick':>15} {'speedup':>8}")
+    for count, scalar_time, batch_time in benchmark():
+        print(f"{count:>10} {scalar_time * 1000:>15.3f} {batch_time * 1000:>15.3f} {scalar_time / batch_time:>7.1f}x")
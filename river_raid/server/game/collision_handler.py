@@ -1,23 +1,45 @@
 import logging
-from shared.config import SCALE, BOARD_WIDTH, BOARD_HEIGHT
+from shared.config import SCALE
+from server.game.spatial_hash import SpatialHash
 
 class CollisionHandler:
     """Handles all collision detection and resolution in the game"""
-    def __init__(self, game_state):
+
+    # Collision backends
+    BACKEND_HASH = "hash"
+    BACKEND_VECTOR = "vector"
+    BACKEND_SWEPT = "swept"
+
+    def __init__(self, game_state, backend=BACKEND_HASH):
         self.game_state = game_state
-        self.grid_size = 4  # Number of cells in each dimension
-        self.grid_width = BOARD_WIDTH / self.grid_size
-        self.grid_height = BOARD_HEIGHT / self.grid_size
-        self.collision_grid = None
+        self.backend = backend
+        if backend == self.BACKEND_VECTOR:
+            from server.game import batch_collision
+            self.batch_collision = batch_collision
+        elif backend not in (self.BACKEND_HASH, self.BACKEND_SWEPT):
+            raise ValueError(f"Unknown collision backend: {backend}")
+        
+        # Enemy index kept up to date as enemies move; other systems may query it
+        self.spatial_hash = SpatialHash()
+        self._enemy_order = {}
+        
+        # Positions at the end of the previous check, the start of each movement segment
+        self._previous_positions = {}
         
         # Performance tracking
         self.last_check_time = 0
         self.collision_count = 0
 
     def check_all_collisions(self):
-        """Main collision detection method using two-phase spatial partitioning"""
+        """Main collision detection method using an incrementally updated spatial hash"""
+        if self.backend == self.BACKEND_VECTOR:
+            self._check_all_collisions_vectorized()
+            return
+        if self.backend == self.BACKEND_SWEPT:
+            self._check_all_collisions_swept()
+            return
+
         try:
-            # Phase 1: Quick check if we need to proceed
             with self.game_state.state_lock:
                 if self.game_state.game_state == self.game_state.STATE_GAME_OVER:
                     return
@@ -26,27 +48,13 @@ class CollisionHandler:
                 enemies = list(self.game_state.enemies)  # Copy list
                 missiles = list(self.game_state.missiles)
                 fuel_depots = list(self.game_state.fuel_depots)
-                player_x = self.game_state.player.x
-                player_y = self.game_state.player.y
                 
-            # Phase 2: Build spatial partition grid (without lock)
-            self.collision_grid = [[[] for _ in range(self.grid_size)] 
-                                 for _ in range(self.grid_size)]
-            
-            # Populate grid with enemies
-            for enemy in enemies:
-                cell_x, cell_y = self._get_grid_cell(enemy.x, enemy.y)
-                if 0 <= cell_x < self.grid_size and 0 <= cell_y < self.grid_size:
-                    self.collision_grid[cell_y][cell_x].append(enemy)
-            
-            # Phase 3: Process different types of collisions
-            # Get player's cell for vicinity checks
-            player_cell = self._get_grid_cell(player_x, player_y)
-            
-            # Process collisions with appropriate locking
-            with self.game_state.state_lock:
+                # Enemy list order decides which enemy a missile hits first
+                self._enemy_order = {enemy: index for index, enemy in enumerate(enemies)}
+                self._sync_spatial_hash(enemies)
+                
                 # Check player-enemy collisions
-                self._check_vicinity_collisions(player_cell)
+                self._check_player_collisions()
                 
                 # Check missile-enemy collisions
                 self._check_missile_collisions(missiles)
@@ -57,36 +65,178 @@ class CollisionHandler:
         except Exception as e:
             logging.error(f"collision_handler: Error in check_all_collisions: {e}")
 
-    def _get_grid_cell(self, x, y):
-        """Convert world coordinates to grid cell coordinates"""
-        cell_x = int(x / self.grid_width)
-        cell_y = int(y / self.grid_height)
-        return (
-            min(max(cell_x, 0), self.grid_size - 1),
-            min(max(cell_y, 0), self.grid_size - 1)
-        )
-
-    def _check_vicinity_collisions(self, player_cell):
-        """Check collisions in cells around the player"""
+    def _sync_spatial_hash(self, enemies):
+        """Move indexed enemies to their current boxes and drop the ones that are gone"""
+        for enemy in enemies:
+            self.spatial_hash.update(enemy, *self._get_box(enemy))
+        
+        if len(self.spatial_hash) != len(enemies):
+            for enemy in [key for key in self.spatial_hash.keys() if key not in self._enemy_order]:
+                self.spatial_hash.remove(enemy)
+
+    def _check_all_collisions_vectorized(self):
+        """Whole-array AABB tests for player x enemy, missile x enemy and player x fuel"""
         try:
-            cell_x, cell_y = player_cell
-            
-            # Check surrounding cells (including diagonal)
-            for dy in [-1, 0, 1]:
-                for dx in [-1, 0, 1]:
-                    check_x = cell_x + dx
-                    check_y = cell_y + dy
+            with self.game_state.state_lock:
+                if self.game_state.game_state == self.game_state.STATE_GAME_OVER:
+                    return
+                
+                batch = self.batch_collision
+                store = self.game_state.entity_store
+                enemies = list(self.game_state.enemies)
+                missiles = list(self.game_state.missiles)
+                fuel_depots = list(self.game_state.fuel_depots)
+                player = self.game_state.player
+                player_box = (player.x, player.y, player.width / SCALE, player.height / SCALE)
+                enemy_boxes = batch.entity_boxes(enemies, store)
+                
+                # Check player-enemy collisions
+                for index in batch.overlaps_box(player_box, enemy_boxes).tolist():
+                    self._handle_player_enemy_collision(enemies[index])
+                
+                # Check missile-enemy collisions against the enemies that survived
+                if missiles and enemies:
+                    enemy_alive = batch.alive_mask(enemies, self.game_state.enemies)
+                    overlaps = batch.overlap_matrix(batch.entity_boxes(missiles, store), enemy_boxes)
+                    for missile_index, enemy_index in batch.first_hits(overlaps, enemy_alive):
+                        self._handle_missile_enemy_collision(missiles[missile_index], enemies[enemy_index])
+                
+                # Check fuel depot collisions
+                depot_boxes = batch.entity_boxes(fuel_depots, store)
+                for index in batch.overlaps_box(player_box, depot_boxes).tolist():
+                    self._handle_fuel_collision(fuel_depots[index])
+                
+        except Exception as e:
+            logging.error(f"collision_handler: Error in _check_all_collisions_vectorized: {e}")
+
+    def _check_all_collisions_swept(self):
+        """Continuous collision: test each entity's movement segment since the last check"""
+        try:
+            with self.game_state.state_lock:
+                if self.game_state.game_state == self.game_state.STATE_GAME_OVER:
+                    return
+                
+                enemies = list(self.game_state.enemies)
+                missiles = list(self.game_state.missiles)
+                fuel_depots = list(self.game_state.fuel_depots)
+                player = self.game_state.player
+                self._enemy_order = {enemy: index for index, enemy in enumerate(enemies)}
+                
+                # Broad phase: sweep and prune the swept boxes along y
+                candidates = self._sweep_and_prune(
+                    [(enemy, True) for enemy in enemies] +
+                    [(missile, False) for missile in missiles] +
+                    [(player, False)]
+                )
+                
+                # Check player-enemy collisions
+                for enemy in sorted(candidates.get(player, []), key=self._enemy_order.__getitem__):
+                    if self._time_of_impact(player, enemy) is not None:
+                        self._handle_player_enemy_collision(enemy)
+                
+                # Check missile-enemy collisions: the earliest impact wins, ties go to list order
+                for missile in missiles:
+                    if missile not in self.game_state.missiles or missile not in candidates:
+                        continue
+                    
+                    first_hit = None
+                    for enemy in candidates[missile]:
+                        if enemy not in self.game_state.enemies:
+                            continue
+                        impact_time = self._time_of_impact(missile, enemy)
+                        if impact_time is not None:
+                            hit = (impact_time, self._enemy_order[enemy], enemy)
+                            if first_hit is None or hit[:2] < first_hit[:2]:
+                                first_hit = hit
                     
-                    if (0 <= check_x < self.grid_size and 
-                        0 <= check_y < self.grid_size):
-                        
-                        # Check each enemy in this cell
-                        for enemy in self.collision_grid[check_y][check_x]:
-                            if self._is_colliding(self.game_state.player, enemy):
-                                self._handle_player_enemy_collision(enemy)
+                    if first_hit is not None:
+                        self._handle_missile_enemy_collision(missile, first_hit[2])
+                
+                # Check fuel depot collisions
+                self._check_fuel_collisions(fuel_depots)
+                
+                # Survivors start their next segment here
+                self._previous_positions = {
+                    entity: (entity.x, entity.y)
+                    for entity in [*self.game_state.enemies, *self.game_state.missiles, self.game_state.player]
+                }
+                
+        except Exception as e:
+            logging.error(f"collision_handler: Error in _check_all_collisions_swept: {e}")
+
+    def _get_segment(self, entity):
+        """(start x, start y, end x, end y, width, height) of an entity's movement this tick"""
+        x, y, width, height = self._get_box(entity)
+        start_x, start_y = self._previous_positions.get(entity, (x, y))
+        return start_x, start_y, x, y, width, height
+
+    def _sweep_and_prune(self, movers):
+        """Pair enemies with missiles/player whose swept boxes overlap, sorted on y"""
+        swept = []
+        for entity, is_enemy in movers:
+            start_x, start_y, x, y, width, height = self._get_segment(entity)
+            swept.append((min(start_y, y), max(start_y, y) + height,
+                          min(start_x, x), max(start_x, x) + width,
+                          entity, is_enemy))
+        swept.sort(key=lambda box: box[0])
+        
+        candidates = {}
+        active = []
+        for box in swept:
+            top, bottom, left, right, entity, is_enemy = box
+            active = [other for other in active if other[1] > top]
+            for other in active:
+                if other[5] != is_enemy and left < other[3] and right > other[2]:
+                    enemy, mover = (entity, other[4]) if is_enemy else (other[4], entity)
+                    candidates.setdefault(mover, []).append(enemy)
+            active.append(box)
+        return candidates
+
+    def _time_of_impact(self, entity1, entity2):
+        """Earliest fraction of the tick at which two moving AABBs overlap, or None"""
+        start_x1, start_y1, end_x1, end_y1, width1, height1 = self._get_segment(entity1)
+        start_x2, start_y2, end_x2, end_y2, width2, height2 = self._get_segment(entity2)
+        
+        enter, leave = 0.0, 1.0
+        for offset, velocity, size1, size2 in (
+            (start_x1 - start_x2, (end_x1 - start_x1) - (end_x2 - start_x2), width1, width2),
+            (start_y1 - start_y2, (end_y1 - start_y1) - (end_y2 - start_y2), height1, height2)
+        ):
+            # Overlap on this axis while -size1 < offset + velocity * t < size2
+            if velocity == 0:
+                if not -size1 < offset < size2:
+                    return None
+                continue
+            axis_enter = (-size1 - offset) / velocity
+            axis_leave = (size2 - offset) / velocity
+            if axis_enter > axis_leave:
+                axis_enter, axis_leave = axis_leave, axis_enter
+            enter = max(enter, axis_enter)
+            leave = min(leave, axis_leave)
+            if enter >= leave:
+                return None
+        return enter
+
+    def _get_box(self, entity):
+        """Entity AABB as (x, y, width, height) in board units"""
+        return (entity.x, entity.y,
+                getattr(entity, 'width', SCALE) / SCALE,
+                getattr(entity, 'height', SCALE) / SCALE)
+
+    def _nearby_enemies(self, entity):
+        """Live enemies overlapping an entity, in enemy-list order"""
+        hits = self.spatial_hash.query_aabb(*self._get_box(entity))
+        hits.sort(key=self._enemy_order.__getitem__)
+        return hits
+
+    def _check_player_collisions(self):
+        """Check collisions between the player and nearby enemies"""
+        try:
+            for enemy in self._nearby_enemies(self.game_state.player):
+                self._handle_player_enemy_collision(enemy)
                                 
         except Exception as e:
-            logging.error(f"collision_handler: Error in _check_vicinity_collisions: {e}")
+            logging.error(f"collision_handler: Error in _check_player_collisions: {e}")
 
     def _check_missile_collisions(self, missiles):
         """Check collisions between missiles and enemies"""
@@ -94,24 +244,12 @@ class CollisionHandler:
             for missile in missiles:
                 if missile not in self.game_state.missiles:  # Skip if missile was already removed
                     continue
-                    
-                missile_cell = self._get_grid_cell(missile.x, missile.y)
-                cell_x, cell_y = missile_cell
-                
-                # Check surrounding cells
-                for dy in [-1, 0, 1]:
-                    for dx in [-1, 0, 1]:
-                        check_x = cell_x + dx
-                        check_y = cell_y + dy
-                        
-                        if (0 <= check_x < self.grid_size and 
-                            0 <= check_y < self.grid_size):
-                            
-                            for enemy in self.collision_grid[check_y][check_x]:
-                                if enemy in self.game_state.enemies:  # Verify enemy still exists
-                                    if self._is_colliding(missile, enemy):
-                                        self._handle_missile_enemy_collision(missile, enemy)
-                                        break  # Break after first collision
+                
+                # First hit wins: the earliest live enemy in list order takes the missile
+                for enemy in self._nearby_enemies(missile):
+                    if enemy in self.game_state.enemies:  # Verify enemy still exists
+                        self._handle_missile_enemy_collision(missile, enemy)
+                        break  # A missile is spent on its first hit
                                     
         except Exception as e:
             logging.error(f"collision_handler: Error in _check_missile_collisions: {e}")
@@ -1,16 +1,30 @@
 # server/game/entity_manager.py
 import logging
-import random
-import time
-import threading
-from shared.config import BOARD_WIDTH, BOARD_HEIGHT
+from shared.config import BOARD_WIDTH, BOARD_HEIGHT, SERVER_TICK_INTERVAL, MISSILE_STEP_INTERVAL
 from shared.entity_pool import EntityPool
 
 class EntityManager:
-    """Manages all game entities, their movement threads, and entity pooling"""
-    def __init__(self, game_state):
+    """Manages all game entities, their spawn and movement phases, and entity pooling"""
+
+    # Movement backends
+    MOVEMENT_SCALAR = "scalar"
+    MOVEMENT_BATCH = "batch"
+
+    def __init__(self, game_state, tick_interval=SERVER_TICK_INTERVAL, movement=MOVEMENT_SCALAR):
         self.game_state = game_state
-        self.entity_pool = EntityPool(max_size=20)
+        self.rng = game_state.rng  # The match's seeded random source
+        self.entity_pool = EntityPool(max_size=20, rng=self.rng)
+
+        # Batch movement runs on the array entity storage backend
+        self.movement = movement
+        self.batch_movement = None
+        if movement == self.MOVEMENT_BATCH:
+            if game_state.entity_store is None:
+                raise ValueError("Batch movement requires the array entity storage backend")
+            from server.game.batch_movement import BatchMovement
+            self.batch_movement = BatchMovement(game_state.entity_store, seed=game_state.seed)
+        elif movement != self.MOVEMENT_SCALAR:
+            raise ValueError(f"Unknown movement backend: {movement}")
 
         # Spawn rates and weights
         self.SPAWN_RATES = {
@@ -30,52 +44,24 @@ class EntityManager:
             'fuel': 3.0  # Time between fuel depot spawn attempts
         }
         self.last_spawn_time = {
-            'B': 0,
-            'J': 0,
-            'H': 0,
-            'fuel': 0
+            'B': float('-inf'),
+            'J': float('-inf'),
+            'H': float('-inf'),
+            'fuel': float('-inf')
         }
         
         # Movement timing
+        self.tick_interval = tick_interval
+        self.spawn_interval = 0.1     # Enemy spawn attempt interval
         self.movement_interval = 0.2  # Base movement update interval
-        self.missile_interval = 0.1   # Missile movement update interval
+        self.missile_interval = MISSILE_STEP_INTERVAL  # Missile movement update interval
         self.fuel_interval = 0.2      # Fuel depot movement interval
-        self.running = True
-        
-        # Create threads
-        self.movement_threads = {
-            'H': threading.Thread(target=self._h_movement_loop),
-            'J': threading.Thread(target=self._j_movement_loop),
-            'B': threading.Thread(target=self._b_movement_loop),
-            'spawner': threading.Thread(target=self._spawner_loop),
-            'missiles': threading.Thread(target=self._missile_loop),
-            'fuel': threading.Thread(target=self._fuel_loop)
-        }
-
-    def start_movement_threads(self):
-        """Start all movement threads"""
-        for name, thread in self.movement_threads.items():
-            if not thread.is_alive():
-                thread.daemon = True
-                thread.start()
-                time.sleep(0.1)  # Small delay to ensure thread starts properly
-                logging.info(f"entity_manager: Started {name} thread")
-
-    def stop_movement_threads(self):
-        """Stop all movement threads"""
-        self.running = False
-        
-        for name, thread in self.movement_threads.items():
-            if thread.is_alive():
-                thread.join(timeout=1.0)
-                if thread.is_alive():
-                    logging.warning(f"entity_manager: {name} thread did not finish cleanly")
-                else:
-                    logging.info(f"entity_manager: Stopped {name} thread successfully")
 
     def release_entity(self, entity):
         """Centralized method to release entities back to the pool"""
         try:
+            # Array-backed state hands out EntityRefs; pool the wrapped object
+            entity = getattr(entity, 'entity', entity)
             self.entity_pool.release(entity)
             logging.debug(f"entity_manager: Released {entity.type if hasattr(entity, 'type') else 'entity'} to pool")
         except Exception as e:
@@ -111,112 +97,130 @@ class EntityManager:
                 
         return moved_entities, removed_entities
 
-    def _spawner_loop(self):
-        """Enhanced spawner loop with pool management"""
-        while self.running:
+    def _ticks_for(self, interval):
+        """Number of ticks between runs of something scheduled every interval seconds"""
+        return max(1, round(interval / self.tick_interval))
+
+    def _is_due(self, tick, interval):
+        """Check if a step scheduled every interval seconds runs on this tick"""
+        return tick % self._ticks_for(interval) == 0
+
+    def spawn_entities(self, tick):
+        """Spawn phase: roll enemy and fuel depot spawns for this tick"""
+        current_time = tick * self.tick_interval
+
+        if self._is_due(tick, self.spawn_interval):
+            self._spawn_enemies(current_time)
+        if self._is_due(tick, self.fuel_interval):
+            self._spawn_fuel_depot(current_time)
+
+    def move_entities(self, tick):
+        """Movement phase: advance every entity type that is due on this tick"""
+        if self.batch_movement is not None:
+            self._move_entities_batch(tick)
+            return
+
+        if self._is_due(tick, self.movement_interval):
+            for enemy_type in ('H', 'J', 'B'):
+                self._move_enemies(enemy_type)
+        if self._is_due(tick, self.missile_interval):
+            self._move_missiles()
+        if self._is_due(tick, self.fuel_interval):
+            self._move_fuel_depots()
+
+    def _move_entities_batch(self, tick):
+        """Movement phase on the array backend: one NumPy pass per entity type"""
+        due_types = []
+        if self._is_due(tick, self.movement_interval):
+            due_types.extend(['H', 'J', 'B'])
+        if self._is_due(tick, self.missile_interval):
+            due_types.append('missile')
+        if self._is_due(tick, self.fuel_interval):
+            due_types.append('fuel')
+
+        store = self.game_state.entity_store
+        for type_name in due_types:
             try:
-                current_time = time.time()
-                
-                # Enemy spawning
-                for enemy_type, rate in self.SPAWN_RATES['enemies'].items():
-                    if (current_time - self.last_spawn_time[enemy_type] >= self.spawn_cooldowns[enemy_type] and 
-                        random.random() < rate):
-                        
-                        x = random.randint(0, int(BOARD_WIDTH) - 1)
-                        enemy = self.acquire_entity(enemy_type, x, 0, self.game_state)
-                        
-                        if enemy:  # Only add if pool acquisition succeeded
-                            with self.game_state.state_lock:
-                                self.game_state.add_enemy(enemy)
-                                self.last_spawn_time[enemy_type] = current_time
-                            
+                for slot in self.batch_movement.move(type_name).tolist():
+                    entity = store.refs[slot]
+                    if type_name == 'missile':
+                        self.game_state.remove_missile(entity)
+                    elif type_name == 'fuel':
+                        self.game_state.remove_fuel_depot(entity)
+                    else:
+                        self.game_state.remove_enemy(entity)
+                    self.release_entity(entity)
+                    
             except Exception as e:
-                logging.warning(f"entity_manager: Warning in spawner loop: {e}")
-            time.sleep(0.1)
+                logging.warning(f"entity_manager: Warning in batch {type_name} movement: {e}")
 
-    def _h_movement_loop(self):
-        """Helicopter movement loop with pool management"""
-        while self.running:
-            try:
-                with self.game_state.state_lock:
-                    h_enemies = [e for e in self.game_state.enemies if e.type == 'H']
-                    _, removed = self._process_entity_movement(h_enemies, 'H')
-                    for enemy in removed:
-                        self.game_state.remove_enemy(enemy)
+    def _spawn_enemies(self, current_time):
+        """Enemy spawning with pool management"""
+        try:
+            for enemy_type, rate in self.SPAWN_RATES['enemies'].items():
+                if (current_time - self.last_spawn_time[enemy_type] >= self.spawn_cooldowns[enemy_type] and 
+                    self.rng.random() < rate):
+                    
+                    x = self.rng.randint(0, int(BOARD_WIDTH) - 1)
+                    enemy = self.acquire_entity(enemy_type, x, 0, self.game_state)
+                    
+                    if enemy:  # Only add if pool acquisition succeeded
+                        self.game_state.add_enemy(enemy)
+                        self.last_spawn_time[enemy_type] = current_time
                         
-            except Exception as e:
-                logging.warning(f"entity_manager: Warning in H movement loop: {e}")
-            time.sleep(self.movement_interval)
+        except Exception as e:
+            logging.warning(f"entity_manager: Warning in enemy spawner: {e}")
 
-    def _j_movement_loop(self):
-        """Jet movement loop with pool management"""
-        while self.running:
-            try:
-                with self.game_state.state_lock:
-                    j_enemies = [e for e in self.game_state.enemies if e.type == 'J']
-                    _, removed = self._process_entity_movement(j_enemies, 'J')
-                    for enemy in removed:
-                        self.game_state.remove_enemy(enemy)
-                        
-            except Exception as e:
-                logging.warning(f"entity_manager: Warning in J movement loop: {e}")
-            time.sleep(self.movement_interval)
+    def _spawn_fuel_depot(self, current_time):
+        """Spawn a new fuel depot if conditions are met"""
+        try:
+            if (current_time - self.last_spawn_time['fuel'] >= self.spawn_cooldowns['fuel'] and
+                self.rng.random() < self.SPAWN_RATES['fuel']):
+                x = self.rng.randint(0, int(BOARD_WIDTH) - 1)
+                depot = self.acquire_entity('fuel', x, 0)
+                if depot:
+                    self.game_state.add_fuel_depot(depot)
+                    self.last_spawn_time['fuel'] = current_time
+                    
+        except Exception as e:
+            logging.warning(f"entity_manager: Warning in fuel spawner: {e}")
 
-    def _b_movement_loop(self):
-        """Boat movement loop with pool management"""
-        while self.running:
-            try:
-                with self.game_state.state_lock:
-                    b_enemies = [e for e in self.game_state.enemies if e.type == 'B']
-                    _, removed = self._process_entity_movement(b_enemies, 'B')
-                    for enemy in removed:
-                        self.game_state.remove_enemy(enemy)
-                        
-            except Exception as e:
-                logging.warning(f"entity_manager: Warning in B movement loop: {e}")
-            time.sleep(self.movement_interval)
+    def _move_enemies(self, enemy_type):
+        """Move all enemies of one type with pool management"""
+        try:
+            enemies = self.game_state.enemies.of_type(enemy_type)
+            _, removed = self._process_entity_movement(enemies, enemy_type)
+            for enemy in removed:
+                self.game_state.remove_enemy(enemy)
+                
+        except Exception as e:
+            logging.warning(f"entity_manager: Warning in {enemy_type} movement: {e}")
 
-    def _missile_loop(self):
-        """Missile movement loop with pool management"""
-        while self.running:
-            try:
-                with self.game_state.state_lock:
-                    missiles = self.game_state.missiles[:]
-                    _, removed = self._process_entity_movement(missiles, 'missile')
-                    for missile in removed:
-                        self.game_state.remove_missile(missile)
-                        self.release_entity(missile)
-                        
-            except Exception as e:
-                logging.warning(f"entity_manager: Warning in missile loop: {e}")
-            time.sleep(self.missile_interval)
+    def _move_missiles(self):
+        """Missile movement with pool management"""
+        try:
+            missiles = self.game_state.missiles
+            _, removed = self._process_entity_movement(missiles, 'missile')
+            for missile in removed:
+                self.game_state.remove_missile(missile)
+                
+        except Exception as e:
+            logging.warning(f"entity_manager: Warning in missile movement: {e}")
 
-    def _fuel_loop(self):
-        """Fuel depot management with pool handling"""
-        while self.running:
-            try:
-                with self.game_state.state_lock:
-                    current_time = time.time()
+    def _move_fuel_depots(self):
+        """Fuel depot movement with pool handling"""
+        try:
+            removed = []
+            for depot in self.game_state.fuel_depots:
+                depot.move()
+                if depot.y >= BOARD_HEIGHT + 3:  # Beyond screen bounds
+                    removed.append(depot)
+            for depot in removed:
+                self.game_state.remove_fuel_depot(depot)
+                self.release_entity(depot)
                     
-                    # Spawn new fuel depot if conditions are met
-                    if (current_time - self.last_spawn_time['fuel'] >= self.spawn_cooldowns['fuel'] and
-                        random.random() < self.SPAWN_RATES['fuel']):
-                        x = random.randint(0, int(BOARD_WIDTH) - 1)
-                        depot = self.acquire_entity('fuel', x, 0)
-                        if depot:
-                            self.game_state.add_fuel_depot(depot)
-                            self.last_spawn_time['fuel'] = current_time
-
-                    # Move existing fuel depots
-                    for depot in self.game_state.fuel_depots[:]:
-                        depot.move()
-                        if depot.y >= BOARD_HEIGHT + 3:  # Beyond screen bounds
-                            self.game_state.remove_fuel_depot(depot)
-                            self.release_entity(depot)
-                            
-            except Exception as e:
-                logging.warning(f"entity_manager: Warning in fuel loop: {e}")
-            time.sleep(self.fuel_interval)
+        except Exception as e:
+            logging.warning(f"entity_manager: Warning in fuel depot movement: {e}")
 
     def adjust_spawn_rates(self, difficulty_factor=1.0):
         """Adjust spawn rates based on difficulty"""
@@ -234,9 +238,8 @@ class EntityManager:
         """Reset entity manager state"""
         try:
             # Reset spawn timers
-            current_time = time.time()
             for entity_type in self.last_spawn_time:
-                self.last_spawn_time[entity_type] = current_time
+                self.last_spawn_time[entity_type] = float('-inf')
                 
             # Clear entity pool
             self.entity_pool.clear()
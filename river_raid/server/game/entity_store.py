@@ -0,0 +1,203 @@
+# server/game/entity_store.py
+import logging
+import numpy as np
+from shared.entities import EnemyB, EnemyJ, EnemyH, FuelDepot, Missile
+
+# Type codes stored in the type_code column
+TYPE_CODES = {
+    'B': 0,
+    'J': 1,
+    'H': 2,
+    'fuel': 3,
+    'missile': 4
+}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+ENEMY_CODES = (TYPE_CODES['B'], TYPE_CODES['J'], TYPE_CODES['H'])
+
+def entity_type_name(entity):
+    """Map an entity object to its pool/type-code name"""
+    if isinstance(entity, (EnemyB, EnemyJ, EnemyH)):
+        return entity.type
+    elif isinstance(entity, FuelDepot):
+        return 'fuel'
+    elif isinstance(entity, Missile):
+        return 'missile'
+    return None
+
+def entity_velocity(entity):
+    """Get (vx, vy, speed_x, speed_y) for an entity's current heading"""
+    if isinstance(entity, (EnemyB, EnemyH)):
+        return (entity.horizontal_direction * entity.horizontal_speed,
+                entity.vertical_direction * entity.vertical_speed,
+                entity.horizontal_speed,
+                entity.vertical_speed)
+    elif isinstance(entity, EnemyJ):
+        return (0.0, entity.direction, 0.0, entity.direction)
+    elif isinstance(entity, FuelDepot):
+        return (0.0, 1.0, 0.0, 1.0)
+    elif isinstance(entity, Missile):
+        return (0.0, -1.0, 0.0, 1.0)
+    return (0.0, 0.0, 0.0, 0.0)
+
+class EntityRef:
+    """Stand-in for an entity whose position and hitbox live in EntityStore columns"""
+    __slots__ = ('store', 'slot', 'entity')
+
+    def __init__(self, store, slot, entity):
+        self.store = store
+        self.slot = slot
+        self.entity = entity  # Wrapped object keeps the cold per-entity fields
+
+    @property
+    def x(self):
+        return float(self.store.x[self.slot])
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.slot] = value
+
+    @property
+    def y(self):
+        return float(self.store.y[self.slot])
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.slot] = value
+
+    @property
+    def width(self):
+        return float(self.store.width[self.slot])
+
+    @property
+    def height(self):
+        return float(self.store.height[self.slot])
+
+    @property
+    def running(self):
+        return bool(self.store.alive[self.slot])
+
+    def __getattr__(self, name):
+        # Only reached for fields without a column (type, missile_type, color, ...)
+        return getattr(self.entity, name)
+
+    def move(self):
+        """Run the wrapped entity's scalar move against the column values"""
+        self.entity.x = self.x
+        self.entity.y = self.y
+        self.entity.move()
+        self.store.write(self.slot, self.entity)
+
+class EntityStore:
+    """Struct-of-arrays entity storage with preallocated columns and a free-slot list"""
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        self.count = 0
+        self._allocate(capacity)
+        self.clear()
+
+    def _allocate(self, capacity):
+        """Create (or grow into) columns of the given capacity"""
+        old_capacity = self.capacity
+        columns = {
+            'x': np.float64,
+            'y': np.float64,
+            'vx': np.float64,
+            'vy': np.float64,
+            'speed_x': np.float64,
+            'speed_y': np.float64,
+            'width': np.float64,
+            'height': np.float64,
+            'type_code': np.int8,
+            'alive': np.bool_
+        }
+        for name, dtype in columns.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if old_capacity:
+                column[:old_capacity] = getattr(self, name)
+            setattr(self, name, column)
+
+        if old_capacity:
+            self.refs.extend([None] * (capacity - old_capacity))
+            # Hand out low slots first so live rows stay dense
+            self.free_slots = list(range(capacity - 1, old_capacity - 1, -1)) + self.free_slots
+        self.capacity = capacity
+
+    def clear(self):
+        """Drop every entity and rebuild the free-slot list"""
+        self.alive[:] = False
+        self.type_code[:] = -1
+        self.refs = [None] * self.capacity
+        self.free_slots = list(range(self.capacity - 1, -1, -1))
+        self.count = 0
+
+    def add(self, entity):
+        """Copy an entity into a free slot and return its EntityRef"""
+        type_name = entity_type_name(entity)
+        if type_name is None:
+            raise TypeError(f"Unsupported entity type: {type(entity).__name__}")
+
+        if not self.free_slots:
+            self._allocate(self.capacity * 2)
+            logging.debug(f"entity_store: Grew capacity to {self.capacity}")
+
+        slot = self.free_slots.pop()
+        self.type_code[slot] = TYPE_CODES[type_name]
+        self.width[slot] = entity.width
+        self.height[slot] = entity.height
+        entity.running = True
+        self.write(slot, entity)
+
+        ref = EntityRef(self, slot, entity)
+        self.refs[slot] = ref
+        self.count += 1
+        return ref
+
+    def remove(self, ref):
+        """Free the slot held by an EntityRef"""
+        slot = ref.slot
+        if self.refs[slot] is not ref:
+            return False
+        self.alive[slot] = False
+        self.type_code[slot] = -1
+        self.refs[slot] = None
+        self.free_slots.append(slot)
+        self.count -= 1
+        return True
+
+    def write(self, slot, entity):
+        """Copy an entity object's hot fields into its slot"""
+        self.x[slot] = entity.x
+        self.y[slot] = entity.y
+        self.vx[slot], self.vy[slot], self.speed_x[slot], self.speed_y[slot] = entity_velocity(entity)
+        self.alive[slot] = getattr(entity, 'running', True)
+
+    def live_slots(self, type_codes=None):
+        """Indices of live slots, optionally limited to some type codes"""
+        mask = self.alive
+        if isinstance(type_codes, int):
+            mask = mask & (self.type_code == type_codes)
+        elif type_codes is not None:
+            mask = mask & np.isin(self.type_code, type_codes)
+        return np.flatnonzero(mask)
+
+    def slots_of(self, refs):
+        """Slot index array for a sequence of EntityRefs, in the same order"""
+        return np.fromiter((ref.slot for ref in refs), dtype=np.intp, count=len(refs))
+
+    def export(self, refs):
+        """Bulk-read (x list, y list, type name list) for serialization"""
+        slots = self.slots_of(refs)
+        return (self.x[slots].tolist(),
+                self.y[slots].tolist(),
+                [TYPE_NAMES[code] for code in self.type_code[slots].tolist()])
+
+    def copy(self):
+        """Column-only copy of the store (EntityRefs are not carried over)"""
+        clone = EntityStore.__new__(EntityStore)
+        clone.capacity = self.capacity
+        clone.count = self.count
+        for name in ('x', 'y', 'vx', 'vy', 'speed_x', 'speed_y', 'width', 'height', 'type_code', 'alive'):
+            setattr(clone, name, getattr(self, name).copy())
+        clone.refs = [None] * self.capacity
+        clone.free_slots = list(self.free_slots)
+        return clone
@@ -0,0 +1,118 @@
+# server/game/event_bus.py
+import queue
+import logging
+import threading
+from collections import namedtuple
+
+Event = namedtuple('Event', ['type', 'data'])
+
+class EventBus:
+    """Buffers typed state-change events during a tick and delivers them in one batch after it
+
+    Publishing only appends to the tick's buffer, so observers never run
+    inside state_lock. Subscribers are called as callback(tick, events)
+    with the events filtered to the types they asked for.
+    """
+
+    # Delivery modes
+    DELIVERY_INLINE = "inline"
+    DELIVERY_WORKER = "worker"
+
+    def __init__(self, delivery=DELIVERY_INLINE):
+        if delivery not in (self.DELIVERY_INLINE, self.DELIVERY_WORKER):
+            raise ValueError(f"Unknown event delivery mode: {delivery}")
+        self.delivery = delivery
+        self.subscribers = []  # (callback, event type set or None for all)
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+
+        # Worker delivery
+        self._batches = queue.Queue()
+        self._worker = None
+        self.running = False
+
+        # Events produced per tick
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'events_last_tick': 0,
+            'events_total': 0,
+            'ticks': 0,
+            'max_events_per_tick': 0
+        }
+
+    def subscribe(self, callback, event_types=None):
+        """Register callback(tick, events); event_types limits which events it sees"""
+        self.subscribers.append((callback, frozenset(event_types) if event_types is not None else None))
+
+    def unsubscribe(self, callback):
+        """Remove every registration of a callback"""
+        self.subscribers = [(cb, types) for cb, types in self.subscribers if cb is not callback]
+
+    def publish(self, event_type, **data):
+        """Append an event to the current tick's buffer"""
+        with self._buffer_lock:
+            self._buffer.append(Event(event_type, data))
+
+    def flush(self, tick):
+        """End of tick: hand the buffered events to subscribers as one batch"""
+        with self._buffer_lock:
+            events, self._buffer = self._buffer, []
+
+        with self.stats_lock:
+            self.stats['events_last_tick'] = len(events)
+            self.stats['events_total'] += len(events)
+            self.stats['ticks'] += 1
+            self.stats['max_events_per_tick'] = max(self.stats['max_events_per_tick'], len(events))
+
+        if not events or not self.subscribers:
+            return
+        if self.delivery == self.DELIVERY_WORKER and self.running:
+            self._batches.put((tick, events))
+        else:
+            self._deliver(tick, events)
+
+    def _deliver(self, tick, events):
+        """Call each subscriber with its share of a batch"""
+        for callback, event_types in list(self.subscribers):
+            batch = events if event_types is None else [e for e in events if e.type in event_types]
+            if not batch:
+                continue
+            try:
+                callback(tick, batch)
+            except Exception as e:
+                logging.error(f"event_bus: Error in subscriber {getattr(callback, '__name__', callback)}: {e}")
+
+    def start(self):
+        """Start the delivery worker when running in worker mode"""
+        if self.delivery != self.DELIVERY_WORKER or self.running:
+            return
+        self.running = True
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+        logging.info("event_bus: Started delivery worker")
+
+    def stop(self):
+        """Stop the delivery worker after it drains the queued batches"""
+        if not self.running:
+            return
+        self.running = False
+        self._batches.put(None)
+        self._worker.join(timeout=1.0)
+        if self._worker.is_alive():
+            logging.warning("event_bus: Delivery worker did not finish cleanly")
+
+    def _worker_loop(self):
+        """Deliver queued batches off the simulation thread"""
+        while True:
+            item = self._batches.get()
+            if item is None:
+                break
+            self._deliver(*item)
+        logging.info("event_bus: Delivery worker has stopped")
+
+    def get_stats(self):
+        """Events-per-tick statistics"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats['average_events_per_tick'] = stats['events_total'] / stats['ticks'] if stats['ticks'] else 0.0
+        return stats
@@ -1,19 +1,21 @@
 import time
 import logging
 import threading
+from shared.config import SERVER_TICK_INTERVAL
 from server.game.collision_handler import CollisionHandler
 
 class GameLoops:
-    """Manages all game loop logic and timing"""
-    def __init__(self, game_state):
+    """Manages the collision and fuel/score phases of each tick"""
+    def __init__(self, game_state, tick_interval=SERVER_TICK_INTERVAL, collision_backend=CollisionHandler.BACKEND_HASH):
         self.game_state = game_state
-        self.collision_handler = CollisionHandler(game_state)
+        self.collision_handler = CollisionHandler(game_state, backend=collision_backend)
         
         # Timing constants
         self.FUEL_RATE = 3
         self.SCORE_RATE = 5
-        self.COLLISION_CHECK_INTERVAL = 0.05
         self.STATE_UPDATE_INTERVAL = 0.15
+        self.tick_interval = tick_interval
+        self.state_update_ticks = max(1, round(self.STATE_UPDATE_INTERVAL / tick_interval))
         
         # Performance monitoring
         self.performance_stats = {
@@ -26,86 +28,36 @@ class GameLoops:
         # Delta time tracking
         self.last_update_time = time.time()
 
-    def collision_loop(self, running):
-        """Main collision detection loop"""
-        last_collision_time = time.time()
-        
-        while running():
-            try:
-                loop_start = time.time()
-                
-                with self.game_state.state_lock:
-                    if not self.game_state.STATE_RUNNING:
-                        time.sleep(self.COLLISION_CHECK_INTERVAL)
-                        continue
-
-                    # Calculate delta time
-                    current_time = time.time()
-                    delta_time = current_time - last_collision_time
-                    last_collision_time = current_time
-                    
-                    # Perform collision detection
-                    self.collision_handler.check_all_collisions()
-                
-                # Track performance
-                with self.stats_lock:
-                    self.performance_stats['collision_time'] = time.time() - loop_start
-                    # logging.info("game_loops: Updated collision_time performance stat")
-                    
-                # Maintain consistent update rate
-                elapsed = time.time() - loop_start
-                if elapsed < self.COLLISION_CHECK_INTERVAL:
-                    time.sleep(self.COLLISION_CHECK_INTERVAL - elapsed)
-                    
-            except Exception as e:
-                logging.error(f"game_loops: Error in collision loop: {e}")
-                time.sleep(self.COLLISION_CHECK_INTERVAL)
+    def update_collisions(self, tick):
+        """Collision phase: resolve collisions after this tick's movement"""
+        phase_start = time.time()
 
-        logging.info("game_loops: Collision loop has stopped")
+        # Perform collision detection
+        self.collision_handler.check_all_collisions()
 
-    def state_loop(self, running):
-        """Main game state update loop"""
-        fuel_counter = 0
-        score_counter = 0
-        frame_start_time = time.time()
-        
-        while running():
-            try:
-                loop_start = time.time()
-                
-                with self.game_state.state_lock:
-                    if not self.game_state.STATE_RUNNING:
-                        time.sleep(self.STATE_UPDATE_INTERVAL)
-                        continue
-
-                    # Calculate delta time for smooth updates
-                    current_time = time.time()
-                    delta_time = current_time - frame_start_time
-                    frame_start_time = current_time
-
-                    # Update game state
-                    self._update_game_state(delta_time, fuel_counter, score_counter)
-                    
-                    # Update counters
-                    fuel_counter = (fuel_counter + 1) % self.FUEL_RATE
-                    score_counter = (score_counter + 1) % self.SCORE_RATE
-
-                # Track performance
-                with self.stats_lock:
-                    self.performance_stats['state_time'] = time.time() - loop_start
-                    self.performance_stats['frame_count'] += 1
-                    # logging.info("game_loops: Updated state_time and frame_count performance stats")
-
-                # Maintain update rate
-                elapsed = time.time() - loop_start
-                if elapsed < self.STATE_UPDATE_INTERVAL:
-                    time.sleep(self.STATE_UPDATE_INTERVAL - elapsed)
-                    
-            except Exception as e:
-                logging.error(f"game_loops: Error in state loop: {e}")
-                time.sleep(self.STATE_UPDATE_INTERVAL)
+        # Track performance
+        with self.stats_lock:
+            self.performance_stats['collision_time'] = time.time() - phase_start
+
+    def update_state(self, tick):
+        """Fuel and score phase: runs every STATE_UPDATE_INTERVAL worth of ticks"""
+        if tick % self.state_update_ticks != 0:
+            return
 
-        logging.info("game_loops: State loop has stopped")
+        phase_start = time.time()
+        state_frame = tick // self.state_update_ticks
+
+        # Update game state with the fixed step length
+        self._update_game_state(
+            self.state_update_ticks * self.tick_interval,
+            state_frame % self.FUEL_RATE,
+            state_frame % self.SCORE_RATE
+        )
+
+        # Track performance
+        with self.stats_lock:
+            self.performance_stats['state_time'] = time.time() - phase_start
+            self.performance_stats['frame_count'] += 1
 
     def _update_game_state(self, delta_time, fuel_counter, score_counter):
         """Update game state with delta time"""
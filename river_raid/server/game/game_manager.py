@@ -4,25 +4,63 @@ import threading
 import queue
 import time
 import logging
-import signal
 from server.game.game_state import GameState
 from server.game.game_loops import GameLoops
+from server.game.collision_handler import CollisionHandler
 from server.game.entity_manager import EntityManager
+from server.game.tick_engine import TickEngine
+from server.game.event_bus import EventBus
+from server.game.replay import InputLog, NullInputLog
+from server.game.input_schedule import InputSchedule
+from server.network.snapshot_cache import SnapshotCache
+from shared.config import SERVER_TICK_RATE
+from shared.network_utils import serialize_message
+from shared.input_commands import mask_actions
+from shared.binary_protocol import PROTOCOL_JSON, PROTOCOL_BINARY, encode_error, encode_input_ack
 
 class GameManager:
     """Manages game state, threads, and overall game flow"""
-    def __init__(self):
+    def __init__(self, seed=None, config=None, scheduler=None, record_inputs=None):
         logging.info("game_manager: Initialized")
+        # A MatchRegistry ticks the match on its shared workers; without one it owns a tick thread
+        self.scheduler = scheduler
+        self.match_id = None
+        # Backends and tick rate come from the environment unless a replay supplies them
+        self.config = config if config is not None else self._config_from_env()
+        if seed is None and os.getenv("SERVER_MATCH_SEED"):
+            seed = int(os.getenv("SERVER_MATCH_SEED"))
+
         # Core game components
-        self.shared_state = GameState()
+        self.shared_state = GameState(
+            storage=self.config['storage'],
+            event_delivery=self.config['event_delivery'],
+            seed=seed
+        )
+        logging.info(f"game_manager: Match seed {self.shared_state.seed}")
+
+        # Every applied input, stamped with its tick, so the match can be replayed.
+        # Only kept when it will be saved (SERVER_INPUT_LOG_DIR) or record_inputs asks for it,
+        # since the log grows for as long as the match runs
+        self.input_log_dir = os.getenv("SERVER_INPUT_LOG_DIR")
+        if record_inputs is None:
+            record_inputs = bool(self.input_log_dir)
+        log_class = InputLog if record_inputs else NullInputLog
+        self.input_log = log_class(self.shared_state.seed, self.config)
         self.running = False
         self.game_running = False
         self.thread_lock = threading.Lock()
-        # Reduced queue size and added rate limiting
-        self.input_queue = queue.Queue(maxsize=20)  # Reduced from 100
-        self.MAX_INPUTS_PER_SECOND = 30  # Rate limit
-        self.last_input_time = time.time()
-        self.input_interval = 1.0 / self.MAX_INPUTS_PER_SECOND
+
+        # Encoded snapshot shared by every response for the same tick
+        self.snapshot_cache = SnapshotCache()
+
+        # Streaming clients: callback(snapshot) -> push every n ticks
+        self.subscribers = {}
+
+        # Discrete actions for the next tick; sequenced input commands wait for their own tick.
+        # Unbounded: the input phase drains it every tick, and the front ends stop reading
+        # a client whose replies go unread, so nothing a client sends is dropped.
+        self.input_queue = queue.Queue()
+        self.input_schedule = InputSchedule()
 
         # Thread monitoring
         self.thread_health = {}
@@ -34,34 +72,55 @@ class GameManager:
         # Initialize managers and threads
         self._setup_managers_and_threads()
 
-        # Register signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
-
-    def _signal_handler(self, sig, frame):
-        """Handle termination signals (e.g., Ctrl+C)"""
-        logging.info(f"game_manager: Caught signal {sig}. Exiting gracefully...")
-        self.quit_game()
+    @staticmethod
+    def _config_from_env():
+        """Simulation settings that a replay has to reproduce"""
+        return {
+            'storage': os.getenv("SERVER_ENTITY_STORAGE", GameState.STORAGE_LIST),
+            'event_delivery': os.getenv("SERVER_EVENT_DELIVERY", EventBus.DELIVERY_INLINE),
+            # A lower tick rate pairs with the swept collision backend
+            'tick_rate': int(os.getenv("SERVER_TICK_RATE", SERVER_TICK_RATE)),
+            'collision_backend': os.getenv("SERVER_COLLISION_BACKEND", CollisionHandler.BACKEND_HASH),
+            'movement_backend': os.getenv("SERVER_MOVEMENT_BACKEND", EntityManager.MOVEMENT_SCALAR)
+        }
 
     def _setup_managers_and_threads(self):
         """Initialize managers and setup all threads"""
+        tick_rate = self.config['tick_rate']
+        tick_interval = 1.0 / tick_rate
+
         # Initialize managers
-        self.game_loops = GameLoops(self.shared_state)
-        self.entity_manager = EntityManager(self.shared_state)
+        self.game_loops = GameLoops(
+            self.shared_state,
+            tick_interval=tick_interval,
+            collision_backend=self.config['collision_backend']
+        )
+        self.entity_manager = EntityManager(
+            self.shared_state,
+            tick_interval=tick_interval,
+            movement=self.config['movement_backend']
+        )
+
+        # One tick runs every phase of the simulation in a fixed order
+        self.tick_engine = TickEngine(self.shared_state, [
+            ('input', self._process_inputs),
+            ('spawn', self.entity_manager.spawn_entities),
+            ('move', self.entity_manager.move_entities),
+            ('collide', self.game_loops.update_collisions),
+            ('state', self.game_loops.update_state),
+            ('snapshot', self.shared_state.publish_snapshot)
+        ], tick_rate=tick_rate, post_phases=[
+            ('push', self._push_snapshot),
+            ('events', self.shared_state.event_bus.flush),
+            ('record', self._record_tick)
+        ])
 
         # Create main threads
         self.threads = {
-            'collision': threading.Thread(
-                target=self.game_loops.collision_loop,
-                args=(self._is_game_running,)
-            ),
-            'state': threading.Thread(
-                target=self.game_loops.state_loop,
+            'tick': threading.Thread(
+                target=self.tick_engine.run,
                 args=(self._is_game_running,)
             ),
-            'input': threading.Thread(
-                target=self._input_loop
-            ),
             'monitor': threading.Thread(
                 target=self._monitor_threads
             )
@@ -84,10 +143,13 @@ class GameManager:
             self.running = True
             self.game_running = True
 
-            # Start monitoring thread first
-            if not self.threads['monitor'].is_alive():
-                self.threads['monitor'].start()
-                logging.info("game_manager: Started monitor thread")
+            # Start event delivery before the first tick produces events
+            self.shared_state.event_bus.start()
+
+            if self.scheduler is not None:
+                self.scheduler.register(self)
+                logging.info(f"game_manager: Match {self.match_id} handed to the scheduler")
+                return
 
             # Start core game threads
             for name, thread in self.threads.items():
@@ -95,8 +157,11 @@ class GameManager:
                     thread.start()
                     logging.info(f"game_manager: Started {name} thread")
 
-            # Start entity management threads
-            self.entity_manager.start_movement_threads()
+            # Start monitoring thread last so it never sees unstarted threads as dead
+            if not self.threads['monitor'].is_alive():
+                self.threads['monitor'].start()
+                logging.info("game_manager: Started monitor thread")
+
             logging.info("game_manager: Game manager started successfully")
 
     def stop(self):
@@ -106,8 +171,8 @@ class GameManager:
         self.running = False
         self.game_running = False
 
-        # Stop entity manager threads
-        self.entity_manager.stop_movement_threads()
+        if self.scheduler is not None:
+            self.scheduler.unregister(self)
 
         # Wait for all threads to finish
         for name, thread in self.threads.items():
@@ -121,8 +186,16 @@ class GameManager:
             else:
                 logging.info(f"game_manager: {name} thread was not running")
 
+        self.shared_state.event_bus.stop()
+        if self.input_log_dir:
+            self.save_input_log(os.path.join(
+                self.input_log_dir, f"match-{self.shared_state.seed}-{int(time.time())}.jsonl"))
         logging.info("game_manager: Game manager stopped successfully")
 
+    def save_input_log(self, path):
+        """Write the match's seed, config and input log for offline replay"""
+        self.input_log.save(path)
+
     def quit_game(self):
         """Gracefully stop the game and exit"""
         self.stop()
@@ -169,20 +242,11 @@ class GameManager:
                 self.threads[thread_name].join(timeout=0.5)
             
             # Create new thread based on type
-            if thread_name == 'collision':
-                new_thread = threading.Thread(
-                    target=self.game_loops.collision_loop,
-                    args=(self._is_game_running,)
-                )
-            elif thread_name == 'state':
+            if thread_name == 'tick':
                 new_thread = threading.Thread(
-                    target=self.game_loops.state_loop,
+                    target=self.tick_engine.run,
                     args=(self._is_game_running,)
                 )
-            elif thread_name == 'input':
-                new_thread = threading.Thread(
-                    target=self._input_loop
-                )
             
             new_thread.daemon = True
             self.threads[thread_name] = new_thread
@@ -195,31 +259,62 @@ class GameManager:
             
             logging.info(f"game_manager: Thread - {thread_name} - restarted (attempt {self.thread_restart_attempts[thread_name]})")
 
-    def _input_loop(self):
-        """Handle input queue processing with rate limiting"""
-        while self.running:
+    def _process_inputs(self, tick):
+        """Input phase: apply every queued input and every command due on this tick"""
+        while True:
             try:
-                # Rate limiting
-                current_time = time.time()
-                if current_time - self.last_input_time < self.input_interval:
-                    time.sleep(self.input_interval - (current_time - self.last_input_time))
-
-                # Process input
-                message = self.input_queue.get(timeout=0.05)
-                with self.shared_state.state_lock:
-                    if message["action"] == "reset_game":
-                        self._handle_reset()
-                    elif self.shared_state.game_state == GameState.STATE_RUNNING:
-                        self._handle_action(message)
-                        self.last_input_time = time.time()
-                        
+                message = self.input_queue.get_nowait()
             except queue.Empty:
-                continue
-            except Exception as e:
-                logging.error(f"Error in input loop: {e}")
-                if not self.thread_health['input']:
-                    break
-        logging.info("game_loops: Input loop has stopped")
+                break
+            self._apply_input(tick, message)
+
+        for sequence, mask in self.input_schedule.pop_due(tick):
+            self._apply_input(tick, {"action": "input", "seq": sequence, "mask": mask})
+
+    def _apply_input(self, tick, message):
+        """Log an input against the tick and apply it"""
+        self.input_log.append(tick, message)
+        try:
+            # Published so the client can drop the predictions this command confirms
+            if "seq" in message:
+                self.shared_state.input_sequence = message["seq"]
+            if message["action"] == "reset_game":
+                self._handle_reset()
+            elif self.shared_state.game_state == GameState.STATE_RUNNING:
+                self._handle_action(message)
+        except Exception as e:
+            logging.error(f"Error in input phase: {e}")
+
+    def _push_snapshot(self, tick):
+        """Post-tick: hand the new snapshot to the subscribers due on this tick"""
+        if not self.subscribers:
+            return
+        snapshot = self.shared_state.latest_snapshot()
+        for callback, every in list(self.subscribers.items()):
+            if tick % every == 0:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logging.error(f"game_manager: Error pushing snapshot: {e}")
+
+    def subscribe(self, callback, rate=None):
+        """Call callback(snapshot) after each tick, thinned to about rate snapshots per second
+
+        The callback runs on the tick thread, so it should only hand the
+        snapshot to the front end. Returns the rate actually granted.
+        """
+        tick_rate = self.config['tick_rate']
+        every = max(1, round(tick_rate / rate)) if rate else 1
+        self.subscribers[callback] = every
+        return tick_rate / every
+
+    def unsubscribe(self, callback):
+        """Stop pushing snapshots to callback"""
+        self.subscribers.pop(callback, None)
+
+    def _record_tick(self, tick):
+        """Post-tick: checkpoint the published state in the input log"""
+        self.input_log.record_checksum(tick, self.shared_state.latest_snapshot().state)
 
     def _handle_reset(self):
         """Handle game reset"""
@@ -238,30 +333,72 @@ class GameManager:
             elif message["action"] == "shoot":
                 missile = self.shared_state.player.shoot()
                 self.shared_state.add_missile(missile)
+            elif message["action"] == "input":
+                for action in mask_actions(message["mask"]):
+                    self._handle_action(action)
         except Exception as e:
             logging.error(f"Error handling action: {e}")
 
-    def process_message(self, message):
-        """Process incoming messages with rate limiting"""
-        try:
-            current_time = time.time()
-            if current_time - self.last_input_time < self.input_interval:
-                # Skip if too soon
-                return {"status": "ok", "game_state": self.shared_state.get_state()}
+    def _accept_input(self, message):
+        """Queue an input for the tick it belongs on"""
+        if message.get("action") == "input":
+            self.input_schedule.add(message.get("inputs", ()), self.tick_engine.tick, message.get("modulus"))
+            return True
+        if message.get("action") == "get_game_state":
+            return True  # A read; the reply carries the state
 
-            if message == {'action': 'reset_game'}:
-                self._handle_reset()
-            else:
-                try:
-                    self.input_queue.put(message, timeout=0.1)  # Short timeout
-                    self.last_input_time = current_time
-                except queue.Full:
-                    logging.warning("Input queue full, dropping message")
-                    
-            return {"status": "ok", "game_state": self.shared_state.get_state()}
+        # Resets go through the queue too, so they land on a tick in the input log
+        self.input_queue.put_nowait(message)
+        return True
+
+    def _accept_actions(self, message):
+        """Queue the inputs of a single or "actions" batch message; returns how many were taken"""
+        # "ack" names the last snapshot the client holds; it is not part of the input
+        if "actions" in message:
+            actions = message["actions"]
+        else:
+            actions = [{key: value for key, value in message.items() if key != "ack"}]
+        return sum(1 for action in actions if self._accept_input(action)), len(actions)
+
+    def encode_snapshot(self, protocol=PROTOCOL_JSON, ack=None, snapshot=None, count=None):
+        """Encoded snapshot for one client, a delta when its acknowledged baseline is still held
+
+        count wraps a JSON reply in an "actions" batch of that many responses.
+        """
+        # Every consumer of this tick's snapshot shares one encode
+        if snapshot is None:
+            snapshot = self.shared_state.latest_snapshot()
+        # A baseline that has left the history gets a full snapshot instead
+        baseline = self.shared_state.snapshot_at(ack) if ack is not None else None
+        if protocol == PROTOCOL_BINARY:
+            # A binary batch is answered with a single state frame
+            return self.snapshot_cache.binary_response_bytes(snapshot, baseline)
+        if count is not None:
+            return self.snapshot_cache.batch_response_bytes(snapshot, count, baseline)
+        return self.snapshot_cache.response_bytes(snapshot, baseline)
+
+    def encode_response(self, message, protocol=PROTOCOL_JSON, streaming=False):
+        """Process a client message (single or "actions" batch) and return the encoded reply
+
+        A streaming client already receives every snapshot by push, so its
+        inputs are answered with just the number accepted, and a batch with
+        no actions (a bare snapshot ack) gets no reply at all.
+        """
+        try:
+            accepted, total = self._accept_actions(message)
+            if streaming:
+                if total == 0:
+                    return b''
+                if protocol == PROTOCOL_BINARY:
+                    return encode_input_ack(accepted)
+                return f'{{"status": "ok", "accepted": {accepted}}}\n'.encode('utf-8')
+            return self.encode_snapshot(protocol, message.get("ack"),
+                                        count=total if "actions" in message else None)
         except Exception as e:
             logging.error(f"Error processing message: {e}")
-            return {"status": "error", "message": str(e)}
+            if protocol == PROTOCOL_BINARY:
+                return encode_error(str(e))
+            return (serialize_message({"status": "error", "message": str(e)}) + '\n').encode('utf-8')
 
     def _is_game_running(self):
         """Check if game is running"""
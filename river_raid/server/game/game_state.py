@@ -1,9 +1,14 @@
 # server/game/game_state.py
 import threading
 import logging
+import random
 import time
+from collections import deque
 from shared.config import BOARD_WIDTH, BOARD_HEIGHT
 from shared.entities import Player
+from server.game.slot_map import SlotMap, Handle, entity_id
+from server.game.snapshot import Snapshot
+from server.game.event_bus import EventBus
 
 class GameState:
     """Manages the complete game state with thread safety and state validation"""
@@ -12,17 +17,49 @@ class GameState:
     STATE_RUNNING = "running"
     STATE_GAME_OVER = "game_over"
     
+    # Entity storage backends
+    STORAGE_LIST = "list"
+    STORAGE_ARRAY = "array"
+    
     # Game limits
     MAX_MISSILES = 30
     MAX_ENEMIES = 20
     MAX_FUEL_DEPOTS = 10
     
-    def __init__(self):
+    # Published snapshots kept as delta baselines (1.6 s at 20 Hz)
+    SNAPSHOT_HISTORY = 32
+    
+    def __init__(self, storage=STORAGE_LIST, event_delivery=EventBus.DELIVERY_INLINE, seed=None):
         # Core state management
         self.state_lock = threading.RLock()
         
-        # State change callbacks
-        self.state_change_callbacks = []
+        # Every random draw of the match comes from this seeded source
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        
+        # Optional struct-of-arrays backend for entity positions and hitboxes
+        self.storage = storage
+        self.entity_store = None
+        if storage == self.STORAGE_ARRAY:
+            from server.game.entity_store import EntityStore
+            self.entity_store = EntityStore(
+                capacity=self.MAX_MISSILES + self.MAX_ENEMIES + self.MAX_FUEL_DEPOTS
+            )
+        elif storage != self.STORAGE_LIST:
+            raise ValueError(f"Unknown entity storage backend: {storage}")
+        
+        # Entity containers addressed by generational handles
+        self.missiles = SlotMap('missile')
+        self.enemies = SlotMap('enemy', type_key=lambda enemy: enemy.type)
+        self.fuel_depots = SlotMap('fuel')
+        self._containers = {
+            'missile': self.missiles,
+            'enemy': self.enemies,
+            'fuel': self.fuel_depots
+        }
+        
+        # State change events are buffered per tick and delivered after it
+        self.event_bus = EventBus(delivery=event_delivery)
         
         # Performance monitoring
         self.last_update_time = time.time()
@@ -33,6 +70,15 @@ class GameState:
             'last_calculation_time': time.time()
         }
         
+        # Latest published snapshot, swapped atomically once per tick
+        self._snapshot = None
+        self._snapshot_sequence = 0
+        self._history = deque(maxlen=self.SNAPSHOT_HISTORY)
+        
+        # Newest client input sequence applied, -1 before the first; kept across resets
+        # because the client's input clock keeps running
+        self.input_sequence = -1
+        
         # Initialize game state
         self.reset()
 
@@ -44,9 +90,11 @@ class GameState:
                 self.player = Player(BOARD_WIDTH // 2, BOARD_HEIGHT - 1.5)
                 
                 # Reset entity lists
-                self.missiles = []
-                self.fuel_depots = []
-                self.enemies = []
+                self.missiles.clear()
+                self.fuel_depots.clear()
+                self.enemies.clear()
+                if self.entity_store is not None:
+                    self.entity_store.clear()
                 
                 # Reset game metrics
                 self.score = 0
@@ -60,97 +108,121 @@ class GameState:
                 
                 logging.info("game_state: Game state reset successfully")
                 self._notify_state_change("reset")
+                self.publish_snapshot()
             except Exception as e:
                 logging.error(f"game_state: Error during game state reset: {e}")
 
-    def register_state_change_callback(self, callback):
-        """Register a callback for state changes"""
-        self.state_change_callbacks.append(callback)
+    def register_state_change_callback(self, callback, event_types=None):
+        """Register callback(change_type), called once per event after each tick"""
+        def deliver(tick, events):
+            for event in events:
+                callback(event.type)
+        deliver.__name__ = getattr(callback, '__name__', 'state_change_callback')
+        self.event_bus.subscribe(deliver, event_types)
 
-    def _notify_state_change(self, change_type):
-        """Notify registered callbacks of state changes"""
-        for callback in self.state_change_callbacks:
-            try:
-                callback(change_type)
-            except Exception as e:
-                logging.error(f"game_state: Error in state change callback: {e}")
+    def _notify_state_change(self, change_type, **data):
+        """Queue a state change event for delivery after the current tick"""
+        self.event_bus.publish(change_type, **data)
+
+    def get_entity(self, handle):
+        """Resolve a handle to its entity, or None if the handle is stale"""
+        container = self._containers.get(handle.kind)
+        return container.get(handle) if container is not None else None
 
     def add_missile(self, missile):
-        """Safely add a missile to the game state"""
+        """Safely add a missile to the game state and return its handle"""
         with self.state_lock:
             try:
                 if self.is_game_over():
                     return
                     
                 if len(self.missiles) < self.MAX_MISSILES:
-                    self.missiles.append(missile)
+                    if self.entity_store is not None:
+                        missile = self.entity_store.add(missile)
+                    handle = self.missiles.insert(missile)
                     logging.debug(f"game_state: Missile added at position ({missile.x}, {missile.y})")
                     self._notify_state_change("missile_added")
+                    return handle
                 else:
                     logging.warning("game_state: Maximum missile limit reached")
             except Exception as e:
                 logging.error(f"game_state: Error adding missile: {e}")
 
     def add_enemy(self, enemy):
-        """Safely add an enemy to the game state"""
+        """Safely add an enemy to the game state and return its handle"""
         with self.state_lock:
             try:
                 if self.is_game_over():
                     return
                     
                 if len(self.enemies) < self.MAX_ENEMIES:
-                    self.enemies.append(enemy)
+                    if self.entity_store is not None:
+                        enemy = self.entity_store.add(enemy)
+                    handle = self.enemies.insert(enemy)
                     logging.debug(f"game_state: Enemy type {enemy.type} added at ({enemy.x}, {enemy.y})")
                     self._notify_state_change("enemy_added")
+                    return handle
                 else:
                     logging.warning("game_state: Maximum enemy limit reached")
             except Exception as e:
                 logging.error(f"game_state: Error adding enemy: {e}")
 
     def add_fuel_depot(self, depot):
-        """Safely add a fuel depot to the game state"""
+        """Safely add a fuel depot to the game state and return its handle"""
         with self.state_lock:
             try:
                 if self.is_game_over():
                     return
                     
                 if len(self.fuel_depots) < self.MAX_FUEL_DEPOTS:
-                    self.fuel_depots.append(depot)
+                    if self.entity_store is not None:
+                        depot = self.entity_store.add(depot)
+                    handle = self.fuel_depots.insert(depot)
                     logging.debug(f"game_state: Fuel depot added at ({depot.x}, {depot.y})")
                     self._notify_state_change("fuel_added")
+                    return handle
                 else:
                     logging.warning("game_state: Maximum fuel depot limit reached")
             except Exception as e:
                 logging.error(f"game_state: Error adding fuel depot: {e}")
 
     def remove_missile(self, missile):
-        """Safely remove a missile from game state"""
+        """Safely remove a missile (object or handle) from game state"""
         with self.state_lock:
             try:
-                if missile in self.missiles:
-                    self.missiles.remove(missile)
+                if isinstance(missile, Handle):
+                    missile = self.missiles.get(missile)
+                if missile is not None and self.missiles.remove(missile):
+                    if self.entity_store is not None:
+                        self.entity_store.remove(missile)
                     logging.debug("game_state: Missile removed")
                     self._notify_state_change("missile_removed")
             except Exception as e:
                 logging.error(f"game_state: Error removing missile: {e}")
 
     def remove_enemy(self, enemy):
-        """Safely remove an enemy from game state"""
+        """Safely remove an enemy (object or handle) from game state"""
         with self.state_lock:
             try:
-                if enemy in self.enemies:
-                    self.enemies.remove(enemy)
+                if isinstance(enemy, Handle):
+                    enemy = self.enemies.get(enemy)
+                if enemy is not None and self.enemies.remove(enemy):
+                    if self.entity_store is not None:
+                        self.entity_store.remove(enemy)
                     logging.debug(f"game_state: Enemy type {enemy.type} removed")
                     self._notify_state_change("enemy_removed")
             except Exception as e:
                 logging.error(f"game_state: Error removing enemy: {e}")
 
     def remove_fuel_depot(self, depot):
-        """Safely remove a fuel depot from game state"""
+        """Safely remove a fuel depot (object or handle) from game state"""
         with self.state_lock:
             try:
-                if depot in self.fuel_depots:
-                    self.fuel_depots.remove(depot)
+                if isinstance(depot, Handle):
+                    depot = self.fuel_depots.get(depot)
+                if depot is not None and self.fuel_depots.remove(depot):
+                    if self.entity_store is not None:
+                        self.entity_store.remove(depot)
                     logging.debug("game_state: Fuel depot removed")
                     self._notify_state_change("fuel_removed")
             except Exception as e:
@@ -165,7 +237,7 @@ class GameState:
                     
                 self.score += points
                 logging.debug(f"game_state: Score updated to {self.score}")
-                self._notify_state_change("score_updated")
+                self._notify_state_change("score_updated", score=self.score)
             except Exception as e:
                 logging.error(f"game_state: Error updating score: {e}")
 
@@ -180,7 +252,7 @@ class GameState:
                 self.fuel = max(0, min(100, self.fuel + amount))
                 
                 if self.fuel != previous_fuel:
-                    self._notify_state_change("fuel_updated")
+                    self._notify_state_change("fuel_updated", fuel=self.fuel)
                 
                 if self.fuel <= 0:
                     self._handle_fuel_depletion()
@@ -196,7 +268,7 @@ class GameState:
             if not self.is_game_over():
                 self.fuel = 100
                 logging.info(f"game_state: Lost life due to fuel depletion, {self.lives} remaining")
-                self._notify_state_change("life_lost")
+                self._notify_state_change("life_lost", lives=self.lives)
                 
         except Exception as e:
             logging.error(f"game_state: Error handling fuel depletion: {e}")
@@ -221,7 +293,7 @@ class GameState:
             self.game_state = self.STATE_GAME_OVER
             self.lives = 0
             logging.info(f"game_state: Game Over - {reason}")
-            self._notify_state_change("game_over")
+            self._notify_state_change("game_over", reason=reason)
             
         except Exception as e:
             logging.error(f"game_state: Error triggering game over: {e}")
@@ -232,34 +304,76 @@ class GameState:
             try:
                 self._update_metrics()
                 
+                if self.entity_store is not None:
+                    return self._get_state_from_store()
+                
                 return {
                     "p": {
                         "x": self.player.x,
                         "y": self.player.y
                     },
                     "e": [{
+                        "i": entity_id(handle),
                         "x": enemy.x,
                         "y": enemy.y,
                         "t": enemy.type
-                    } for enemy in self.enemies],
+                    } for enemy, handle in zip(self.enemies, self.enemies.handles())],
                     "f": [{
+                        "i": entity_id(handle),
                         "x": depot.x,
                         "y": depot.y
-                    } for depot in self.fuel_depots],
+                    } for depot, handle in zip(self.fuel_depots, self.fuel_depots.handles())],
                     "m": [{
+                        "i": entity_id(handle),
                         "x": missile.x,
                         "y": missile.y,
                         "t": missile.missile_type
-                    } for missile in self.missiles],
+                    } for missile, handle in zip(self.missiles, self.missiles.handles())],
                     "s": self.score,
                     "l": self.lives,
                     "u": self.fuel,
-                    "g": self.game_state
+                    "g": self.game_state,
+                    "n": self.input_sequence
                 }
             except Exception as e:
                 logging.error(f"game_state: Error getting game state: {e}")
                 return {}
 
+    def _get_state_from_store(self):
+        """Build the network state by reading entity columns in bulk"""
+        enemy_x, enemy_y, enemy_types = self.entity_store.export(self.enemies)
+        depot_x, depot_y, _ = self.entity_store.export(self.fuel_depots)
+        missile_x, missile_y, _ = self.entity_store.export(self.missiles)
+        
+        return {
+            "p": {
+                "x": self.player.x,
+                "y": self.player.y
+            },
+            "e": [{
+                "i": entity_id(handle),
+                "x": x,
+                "y": y,
+                "t": t
+            } for handle, x, y, t in zip(self.enemies.handles(), enemy_x, enemy_y, enemy_types)],
+            "f": [{
+                "i": entity_id(handle),
+                "x": x,
+                "y": y
+            } for handle, x, y in zip(self.fuel_depots.handles(), depot_x, depot_y)],
+            "m": [{
+                "i": entity_id(handle),
+                "x": x,
+                "y": y,
+                "t": missile.missile_type
+            } for handle, x, y, missile in zip(self.missiles.handles(), missile_x, missile_y, self.missiles)],
+            "s": self.score,
+            "l": self.lives,
+            "u": self.fuel,
+            "g": self.game_state,
+            "n": self.input_sequence
+        }
+
     def _update_metrics(self):
         """Update performance metrics"""
         try:
@@ -279,10 +393,40 @@ class GameState:
         except Exception as e:
             logging.error(f"game_state: Error updating metrics: {e}")
 
-    def get_metrics(self):
-        """Get current performance metrics"""
+    def publish_snapshot(self, tick=None):
+        """Build a new snapshot and swap it in as the one readers see"""
         with self.state_lock:
-            return self.state_metrics.copy()
+            if tick is None:
+                tick = self._snapshot.tick if self._snapshot is not None else 0
+            self._snapshot_sequence += 1
+            state = self.get_state()
+            snapshot = Snapshot(self._snapshot_sequence, tick, state, self.state_metrics.copy())
+            
+            # A single reference assignment is atomic, so readers need no lock
+            self._history.append(snapshot)
+            self._snapshot = snapshot
+            return snapshot
+
+    def latest_snapshot(self):
+        """Most recently published snapshot; never blocks on the simulation"""
+        return self._snapshot
+
+    def snapshot_at(self, sequence):
+        """Published snapshot with this sequence if it is still in the history, else None"""
+        history = self._history
+        try:
+            # Sequences are consecutive, so the position follows from the newest one
+            age = history[-1].sequence - sequence
+            if not 0 <= age < len(history):
+                return None
+            snapshot = history[len(history) - 1 - age]
+        except (IndexError, TypeError):
+            return None
+        return snapshot if snapshot.sequence == sequence else None
+
+    def get_metrics(self):
+        """Get current performance metrics from the latest snapshot"""
+        return self._snapshot.metrics.copy()
 
     def is_game_over(self):
         """Check if game is over"""
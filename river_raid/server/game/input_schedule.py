@@ -0,0 +1,59 @@
+# server/game/input_schedule.py
+import threading
+
+class InputSchedule:
+    """Holds a client's sequenced input commands until the tick each was meant for
+
+    Sequence numbers count client input ticks, which run at the server
+    tick rate, so command n belongs on tick n + offset. The first command
+    to arrive fixes the offset. A command that arrives after its tick is
+    applied on the next one. If the client drifts too far ahead or behind,
+    the offset is re-anchored on the newest command. Every command is
+    applied exactly once and none is dropped.
+    """
+
+    MAX_LEAD = 10  # Ticks a command may wait before the schedule is pulled forward
+    MAX_LAG = 5    # Ticks late a command may arrive before the schedule is pushed back
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.offset = None
+        self.pending = []  # (sequence, mask) in sequence order
+        self.last_sequence = None  # Newest sequence received; anything not newer is a duplicate
+        self.applied_sequence = None  # Newest sequence handed out by pop_due()
+
+    def add(self, commands, tick, modulus=None):
+        """Queue [sequence, mask] commands that arrived before tick ran
+
+        With a modulus, only sequence % modulus was sent. The full value is
+        the one nearest the sequence due now, which follows the tick clock
+        even across long idle gaps.
+        """
+        with self.lock:
+            for sequence, mask in commands:
+                if modulus is not None and self.offset is not None:
+                    expected = tick - self.offset
+                    sequence = expected + (sequence - expected + modulus // 2) % modulus - modulus // 2
+                if self.last_sequence is not None and sequence <= self.last_sequence:
+                    continue
+                self.last_sequence = sequence
+                if self.offset is None:
+                    self.offset = tick - sequence
+                due = sequence + self.offset
+                if due > tick + self.MAX_LEAD or due < tick - self.MAX_LAG:
+                    self.offset = tick - sequence
+                self.pending.append((sequence, mask))
+
+    def pop_due(self, tick):
+        """Commands whose tick has come, oldest first"""
+        with self.lock:
+            count = 0
+            for sequence, _ in self.pending:
+                if sequence + self.offset > tick:
+                    break
+                count += 1
+            if not count:
+                return []
+            due, self.pending = self.pending[:count], self.pending[count:]
+            self.applied_sequence = due[-1][0]
+            return due
@@ -0,0 +1,142 @@
+# server/game/match_registry.py
+import time
+import logging
+import threading
+from server.game.game_manager import GameManager
+
+class MatchRegistry:
+    """Owns every active match and ticks them on a fixed pool of scheduler workers
+
+    Each match is pinned to the least loaded worker when it registers.
+    A worker steps its matches round-robin, each against its own tick
+    deadline, then sleeps until the earliest next deadline. Thread count
+    depends on the worker count, not on how many matches are running.
+    """
+
+    DEFAULT_WORKERS = 2
+    IDLE_WAIT = 0.5  # Seconds a worker without matches waits before rechecking
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.lock = threading.Lock()
+        self.matches = {}  # match_id -> GameManager
+        self.assignments = [[] for _ in range(max(1, workers))]  # Worker index -> its matches
+        self._wake = [threading.Event() for _ in self.assignments]
+        self._next_match_id = 1
+        self.running = False
+        self.threads = []
+
+        # Per-worker counters
+        self.worker_stats = [{'ticks': 0, 'busy_time': 0.0} for _ in self.assignments]
+
+    def start(self):
+        """Start the scheduler workers"""
+        if self.running:
+            return
+        self.running = True
+        for index in range(len(self.assignments)):
+            thread = threading.Thread(target=self._worker_loop, args=(index,), name=f"scheduler-{index}")
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        logging.info(f"match_registry: Started {len(self.threads)} scheduler workers")
+
+    def stop(self):
+        """Stop every match and the scheduler workers"""
+        for manager in list(self.matches.values()):
+            manager.stop()
+        self.running = False
+        for event in self._wake:
+            event.set()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+        logging.info("match_registry: Scheduler workers stopped")
+
+    def create_match(self, seed=None):
+        """Build a match ticked by this registry and start it"""
+        manager = GameManager(seed=seed, scheduler=self)
+        manager.start()
+        return manager
+
+    def register(self, manager):
+        """Attach a started match to the least loaded worker"""
+        with self.lock:
+            match_id = self._next_match_id
+            self._next_match_id += 1
+            index = min(range(len(self.assignments)), key=lambda i: len(self.assignments[i]))
+            manager.match_id = match_id
+            manager.tick_engine.next_deadline = None
+            self.matches[match_id] = manager
+            self.assignments[index].append(manager)
+        self._wake[index].set()
+        logging.info(f"match_registry: Match {match_id} assigned to scheduler worker {index} "
+                     f"({len(self.matches)} active)")
+        return match_id
+
+    def unregister(self, manager):
+        """Detach a match; its worker stops ticking it"""
+        with self.lock:
+            if self.matches.pop(getattr(manager, 'match_id', None), None) is None:
+                return
+            for matches in self.assignments:
+                if manager in matches:
+                    matches.remove(manager)
+        logging.info(f"match_registry: Match {manager.match_id} removed ({len(self.matches)} active)")
+
+    def remove_match(self, manager):
+        """Stop a match and release it from the registry"""
+        manager.stop()
+
+    def _worker_loop(self, index):
+        """Step this worker's matches round-robin against their deadlines"""
+        wake = self._wake[index]
+        stats = self.worker_stats[index]
+
+        while self.running:
+            try:
+                with self.lock:
+                    matches = list(self.assignments[index])
+
+                if not matches:
+                    wake.wait(self.IDLE_WAIT)
+                    wake.clear()
+                    continue
+
+                next_deadline = None
+                busy_start = time.perf_counter()
+                for manager in matches:
+                    if not manager.game_running:
+                        continue
+                    engine = manager.tick_engine
+                    ticks_before = engine.tick
+                    try:
+                        deadline = engine.advance(time.monotonic())
+                    except Exception as e:
+                        logging.error(f"match_registry: Error ticking match {manager.match_id}: {e}")
+                        deadline = time.monotonic() + engine.TICK_INTERVAL
+                    stats['ticks'] += engine.tick - ticks_before
+                    next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+                stats['busy_time'] += time.perf_counter() - busy_start
+
+                # A newly registered match sets wake so it gets its first tick promptly
+                delay = next_deadline - time.monotonic() if next_deadline is not None else self.IDLE_WAIT
+                if delay > 0:
+                    wake.wait(delay)
+                wake.clear()
+            except Exception as e:
+                logging.error(f"match_registry: Error in scheduler worker {index}: {e}")
+                time.sleep(0.1)
+
+        logging.info(f"match_registry: Scheduler worker {index} has stopped")
+
+    def get_stats(self):
+        """Active matches and tick counts per scheduler worker"""
+        with self.lock:
+            return {
+                'matches': len(self.matches),
+                'workers': [{
+                    'matches': len(matches),
+                    'ticks': stats['ticks'],
+                    'busy_time': stats['busy_time']
+                } for matches, stats in zip(self.assignments, self.worker_stats)]
+            }
@@ -0,0 +1,141 @@
+# server/game/replay.py
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from shared.network_utils import serialize_message
+
+def state_digest(state):
+    """Short stable hash of a published state dict"""
+    return hashlib.sha1(serialize_message(state).encode('utf-8')).hexdigest()[:16]
+
+class InputLog:
+    """Append-only record of every input a match applied, keyed by the tick it was applied on
+
+    Together with the match seed and config, the log is enough to
+    re-simulate the match exactly. Periodic state digests let a replay
+    find the first tick where it diverged.
+    """
+
+    CHECKSUM_INTERVAL = 100  # Ticks between recorded state digests
+
+    def __init__(self, seed, config):
+        self.seed = seed
+        self.config = dict(config)
+        self.entries = []     # (tick, action message)
+        self.checksums = {}   # tick -> state digest
+        self.end_tick = 0
+        self.lock = threading.Lock()
+
+    def append(self, tick, message):
+        """Record an input applied on a tick"""
+        with self.lock:
+            self.entries.append((tick, dict(message)))
+
+    def record_checksum(self, tick, state):
+        """Record the state digest for a tick and advance the end of the log"""
+        with self.lock:
+            self.end_tick = tick + 1
+            if tick % self.CHECKSUM_INTERVAL == 0:
+                self.checksums[tick] = state_digest(state)
+
+    def inputs_by_tick(self):
+        """Inputs grouped per tick, in the order they were applied"""
+        with self.lock:
+            grouped = {}
+            for tick, message in self.entries:
+                grouped.setdefault(tick, []).append(message)
+            return grouped
+
+    def save(self, path):
+        """Write the log as JSON lines: a header, then one line per input or checksum"""
+        try:
+            with self.lock:
+                with open(path, 'w') as f:
+                    f.write(json.dumps({'seed': self.seed, 'config': self.config,
+                                        'end_tick': self.end_tick}) + '\n')
+                    for tick, message in self.entries:
+                        f.write(json.dumps({'t': tick, 'a': message}) + '\n')
+                    for tick, digest in sorted(self.checksums.items()):
+                        f.write(json.dumps({'t': tick, 'c': digest}) + '\n')
+            logging.info(f"replay: Saved input log with {len(self.entries)} inputs to {path}")
+        except Exception as e:
+            logging.error(f"replay: Error saving input log to {path}: {e}")
+
+    @classmethod
+    def load(cls, path):
+        """Read a log written by save()"""
+        with open(path) as f:
+            header = json.loads(f.readline())
+            log = cls(header['seed'], header['config'])
+            log.end_tick = header['end_tick']
+            for line in f:
+                record = json.loads(line)
+                if 'a' in record:
+                    log.entries.append((record['t'], record['a']))
+                else:
+                    log.checksums[record['t']] = record['c']
+        return log
+
+class NullInputLog(InputLog):
+    """InputLog stand-in for a match nobody will replay; records nothing, so it never grows"""
+
+    def append(self, tick, message):
+        pass
+
+    def record_checksum(self, tick, state):
+        pass
+
+    def save(self, path):
+        logging.warning(f"replay: Match was not recorded, not writing an input log to {path}")
+
+def replay(log, until_tick=None):
+    """Re-simulate a logged match without sleeping between ticks
+
+    Returns the replayed GameManager, the first tick whose digest did not
+    match the log (or None), and the wall time the replay took.
+    """
+    from server.game.game_manager import GameManager
+
+    manager = GameManager(seed=log.seed, config=log.config)
+    engine = manager.tick_engine
+    inputs = log.inputs_by_tick()
+    end_tick = log.end_tick if until_tick is None else min(until_tick, log.end_tick)
+    divergence = None
+
+    start = time.perf_counter()
+    while engine.tick < end_tick:
+        tick = engine.tick
+        # Queued inputs are drained by the input phase of the very next step
+        for message in inputs.get(tick, ()):
+            manager.input_queue.put(message)
+        engine.step()
+
+        expected = log.checksums.get(tick)
+        if expected is not None and divergence is None:
+            if state_digest(manager.shared_state.latest_snapshot().state) != expected:
+                divergence = tick
+                logging.warning(f"replay: State diverged from the log on tick {tick}")
+    elapsed = time.perf_counter() - start
+
+    return manager, divergence, elapsed
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    if len(sys.argv) != 2:
+        print("usage: python -m server.game.replay <input-log.jsonl>")
+        sys.exit(2)
+
+    log = InputLog.load(sys.argv[1])
+    manager, divergence, elapsed = replay(log)
+    ticks = manager.tick_engine.tick
+    realtime = ticks / manager.tick_engine.TICK_RATE
+    print(f"seed {log.seed}: replayed {ticks} ticks ({len(log.entries)} inputs) in {elapsed:.2f}s, "
+          f"{realtime / elapsed if elapsed else float('inf'):.1f}x real time")
+    if divergence is None:
+        print(f"all {len(log.checksums)} checksums matched")
+    else:
+        print(f"diverged on tick {divergence}")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+# server/game/slot_map.py
+from collections import namedtuple
+
+# Generational handle: a stale handle keeps its old generation and stops resolving
+Handle = namedtuple('Handle', ['kind', 'index', 'generation'])
+
+# Generations wrap at 16 bits so entity ids fit the protocol's 32-bit id field
+GENERATION_MASK = 0xFFFF
+
+def entity_id(handle):
+    """Integer id for the network; unique among live and recent entities of one kind"""
+    return (handle.generation << 16) | handle.index
+
+class SlotMap:
+    """Entity container with generational handles and O(1) insert, remove and membership
+
+    Iteration follows insertion order, like the lists it replaces, and an
+    optional type_key maintains per-type index sets alongside it.
+    """
+    def __init__(self, kind, type_key=None):
+        self.kind = kind
+        self.type_key = type_key
+        self._values = []       # index -> entity or None
+        self._generations = []  # index -> current generation
+        self._free = []
+        self._handles = {}      # entity -> handle, in insertion order
+        self._by_type = {}      # type -> {entity: None}, in insertion order
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __iter__(self):
+        return iter(self._handles)
+
+    def __contains__(self, entity):
+        return entity in self._handles
+
+    def insert(self, entity):
+        """Store an entity and return its handle"""
+        if entity in self._handles:
+            return self._handles[entity]
+
+        if self._free:
+            index = self._free.pop()
+            self._values[index] = entity
+        else:
+            index = len(self._values)
+            self._values.append(entity)
+            self._generations.append(0)
+
+        handle = Handle(self.kind, index, self._generations[index])
+        self._handles[entity] = handle
+        if self.type_key is not None:
+            self._by_type.setdefault(self.type_key(entity), {})[entity] = None
+        return handle
+
+    def remove(self, entity_or_handle):
+        """Remove an entity by object or handle; False if it was not present"""
+        if isinstance(entity_or_handle, Handle):
+            entity = self.get(entity_or_handle)
+            if entity is None:
+                return False
+        else:
+            entity = entity_or_handle
+
+        handle = self._handles.pop(entity, None)
+        if handle is None:
+            return False
+
+        # Bumping the generation invalidates every outstanding handle to this slot
+        self._values[handle.index] = None
+        self._generations[handle.index] = (self._generations[handle.index] + 1) & GENERATION_MASK
+        self._free.append(handle.index)
+        if self.type_key is not None:
+            self._by_type[self.type_key(entity)].pop(entity, None)
+        return True
+
+    def get(self, handle):
+        """Entity for a handle, or None if the handle is stale"""
+        if (handle.kind != self.kind or handle.index >= len(self._values) or
+                self._generations[handle.index] != handle.generation):
+            return None
+        return self._values[handle.index]
+
+    def is_valid(self, handle):
+        """Check a handle without fetching the entity"""
+        return self.get(handle) is not None
+
+    def handles(self):
+        """Live view of the handles, in the same order as iteration"""
+        return self._handles.values()
+
+    def handle_of(self, entity):
+        """Current handle of a stored entity, or None"""
+        return self._handles.get(entity)
+
+    def of_type(self, entity_type):
+        """Live view of the stored entities of one type, in insertion order"""
+        return self._by_type.setdefault(entity_type, {}).keys()
+
+    def clear(self):
+        """Remove everything, invalidating all outstanding handles"""
+        for entity in list(self._handles):
+            self.remove(entity)
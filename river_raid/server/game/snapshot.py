@@ -0,0 +1,24 @@
+# server/game/snapshot.py
+import time
+
+class Snapshot:
+    """Read-only world state published once per tick
+
+    The simulation builds a new Snapshot next to the published one and
+    swaps the reference, so readers never take state_lock. The state
+    dict is shared by every reader and must not be modified.
+    """
+    __slots__ = ('sequence', 'tick', 'created_at', 'state', 'metrics')
+
+    def __init__(self, sequence, tick, state, metrics):
+        object.__setattr__(self, 'sequence', sequence)  # Increases on every publish
+        object.__setattr__(self, 'tick', tick)
+        object.__setattr__(self, 'created_at', time.time())
+        object.__setattr__(self, 'state', state)
+        object.__setattr__(self, 'metrics', metrics)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot is immutable")
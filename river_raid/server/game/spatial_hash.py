@@ -0,0 +1,124 @@
+# server/game/spatial_hash.py
+import math
+
+class SpatialHash:
+    """Uniform spatial hash that indexes AABBs in every cell they cover
+
+    Cells are sized from the largest hitbox inserted so far, so any box
+    covers at most 2x2 cells. Entries are updated in place as entities
+    move; cells are only touched when the covered cell range changes.
+    """
+    def __init__(self, cell_size=1.0):
+        self.cell_size = cell_size
+        self.cells = {}    # (cell_x, cell_y) -> set of keys
+        self.entries = {}  # key -> [x, y, width, height, cell range]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def keys(self):
+        return self.entries.keys()
+
+    def clear(self):
+        """Remove every entry"""
+        self.cells.clear()
+        self.entries.clear()
+
+    def _cell_range(self, x, y, width, height):
+        """Inclusive (x0, y0, x1, y1) range of cells covered by a box"""
+        size = self.cell_size
+        return (math.floor(x / size), math.floor(y / size),
+                math.floor((x + width) / size), math.floor((y + height) / size))
+
+    def _link(self, key, cell_range):
+        x0, y0, x1, y1 = cell_range
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                self.cells.setdefault((cell_x, cell_y), set()).add(key)
+
+    def _unlink(self, key, cell_range):
+        x0, y0, x1, y1 = cell_range
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self.cells[(cell_x, cell_y)]
+
+    def _resize(self, cell_size):
+        """Re-bucket every entry with a larger cell size"""
+        self.cell_size = cell_size
+        self.cells.clear()
+        for key, entry in self.entries.items():
+            entry[4] = self._cell_range(*entry[:4])
+            self._link(key, entry[4])
+
+    def insert(self, key, x, y, width, height):
+        """Add a box, or move it if the key is already indexed"""
+        if key in self.entries:
+            self.update(key, x, y, width, height)
+            return
+
+        if max(width, height) > self.cell_size:
+            self._resize(max(width, height))
+
+        cell_range = self._cell_range(x, y, width, height)
+        self.entries[key] = [x, y, width, height, cell_range]
+        self._link(key, cell_range)
+
+    def update(self, key, x, y, width, height):
+        """Move an indexed box; cells are only relinked when its range changes"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.insert(key, x, y, width, height)
+            return
+
+        if max(width, height) > self.cell_size:
+            self._resize(max(width, height))
+
+        cell_range = self._cell_range(x, y, width, height)
+        if cell_range != entry[4]:
+            self._unlink(key, entry[4])
+            self._link(key, cell_range)
+        entry[:] = [x, y, width, height, cell_range]
+
+    def remove(self, key):
+        """Drop a key from the index"""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._unlink(key, entry[4])
+
+    def _candidates(self, cell_range):
+        x0, y0, x1, y1 = cell_range
+        found = set()
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def query_aabb(self, x, y, width, height):
+        """Keys whose box overlaps the given box (same strict test as the collision AABB)"""
+        hits = []
+        for key in self._candidates(self._cell_range(x, y, width, height)):
+            ex, ey, ewidth, eheight, _ = self.entries[key]
+            if x < ex + ewidth and x + width > ex and y < ey + eheight and y + height > ey:
+                hits.append(key)
+        return hits
+
+    def query_radius(self, x, y, radius):
+        """Keys whose box comes within radius of the point (x, y)"""
+        hits = []
+        cell_range = self._cell_range(x - radius, y - radius, 2 * radius, 2 * radius)
+        for key in self._candidates(cell_range):
+            ex, ey, ewidth, eheight, _ = self.entries[key]
+            dx = max(ex - x, 0, x - (ex + ewidth))
+            dy = max(ey - y, 0, y - (ey + eheight))
+            if dx * dx + dy * dy <= radius * radius:
+                hits.append(key)
+        return hits
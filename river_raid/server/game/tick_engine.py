@@ -0,0 +1,105 @@
+# server/game/tick_engine.py
+import time
+import logging
+import threading
+from shared.config import SERVER_TICK_RATE
+
+class TickEngine:
+    """Runs every simulation phase of a match on one fixed-timestep tick"""
+    def __init__(self, game_state, phases, tick_rate=SERVER_TICK_RATE, post_phases=()):
+        self.game_state = game_state
+        self.phases = list(phases)  # Ordered (name, callable(tick)) pairs
+        self.post_phases = list(post_phases)  # Run after the tick, outside state_lock
+
+        # Timing constants
+        self.TICK_RATE = tick_rate
+        self.TICK_INTERVAL = 1.0 / tick_rate
+        self.MAX_CATCHUP_TICKS = 5  # Ticks run back to back before dropping time
+
+        self.tick = 0
+        self.next_deadline = None  # Monotonic time the next tick is due
+
+        # Performance monitoring
+        self.performance_stats = {
+            'tick_time': 0,
+            'phase_time': {name: 0 for name, _ in self.phases + self.post_phases},
+            'tick_count': 0,
+            'dropped_ticks': 0
+        }
+        self.stats_lock = threading.Lock()
+
+    def step(self):
+        """Run one tick: every phase in order under a single lock acquisition"""
+        tick_start = time.perf_counter()
+        phase_time = {}
+
+        with self.game_state.state_lock:
+            for name, phase in self.phases:
+                phase_start = time.perf_counter()
+                try:
+                    phase(self.tick)
+                except Exception as e:
+                    logging.error(f"tick_engine: Error in {name} phase on tick {self.tick}: {e}")
+                phase_time[name] = time.perf_counter() - phase_start
+            tick = self.tick
+            self.tick += 1
+
+        for name, phase in self.post_phases:
+            phase_start = time.perf_counter()
+            try:
+                phase(tick)
+            except Exception as e:
+                logging.error(f"tick_engine: Error in {name} post-phase on tick {tick}: {e}")
+            phase_time[name] = time.perf_counter() - phase_start
+
+        with self.stats_lock:
+            self.performance_stats['tick_time'] = time.perf_counter() - tick_start
+            self.performance_stats['phase_time'] = phase_time
+            self.performance_stats['tick_count'] += 1
+
+    def advance(self, now):
+        """Run every tick due by now, at most MAX_CATCHUP_TICKS; returns the next deadline"""
+        if self.next_deadline is None:
+            self.next_deadline = now
+        if now < self.next_deadline:
+            return self.next_deadline
+
+        # Deadlines advance by whole intervals so sleep jitter never accumulates
+        due_ticks = int((now - self.next_deadline) / self.TICK_INTERVAL) + 1
+        if due_ticks > self.MAX_CATCHUP_TICKS:
+            dropped = due_ticks - self.MAX_CATCHUP_TICKS
+            self.next_deadline += dropped * self.TICK_INTERVAL
+            due_ticks = self.MAX_CATCHUP_TICKS
+            with self.stats_lock:
+                self.performance_stats['dropped_ticks'] += dropped
+            logging.warning(f"tick_engine: Fell behind, dropped {dropped} ticks")
+
+        for _ in range(due_ticks):
+            self.step()
+            self.next_deadline += self.TICK_INTERVAL
+        return self.next_deadline
+
+    def run(self, running):
+        """Tick at a fixed rate against monotonic deadlines until running() is False"""
+        self.next_deadline = None
+
+        while running():
+            try:
+                delay = self.advance(time.monotonic()) - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            except Exception as e:
+                logging.error(f"tick_engine: Error in tick loop: {e}")
+                time.sleep(self.TICK_INTERVAL)
+
+        logging.info("tick_engine: Tick loop has stopped")
+
+    def get_performance_stats(self):
+        """Get current tick timing statistics"""
+        with self.stats_lock:
+            return {
+                'tick_time': self.performance_stats['tick_time'],
+                'phase_time': dict(self.performance_stats['phase_time']),
+                'tick_count': self.performance_stats['tick_count'],
+                'dropped_ticks': self.performance_stats['dropped_ticks']
+            }
@@ -0,0 +1,106 @@
+# server/headless.py
+import sys
+import time
+import random
+import logging
+import argparse
+from server.game.game_manager import GameManager
+from server.game.replay import InputLog
+
+RANDOM_ACTIONS = [
+    {"action": "move", "direction": "left"},
+    {"action": "move", "direction": "right"},
+    {"action": "shoot"}
+]
+
+class HeadlessRunner:
+    """Steps matches back to back with no sleeps and no network to measure simulation throughput"""
+    def __init__(self, matches=1, seed=0, input_rate=0.3, script=None, reset_on_game_over=True):
+        self.managers = [GameManager(seed=seed + i) for i in range(matches)]
+        self.input_rng = random.Random(seed)
+        self.INPUT_RATE = input_rate  # Chance per tick of a random input
+        self.script = script.inputs_by_tick() if script is not None else None
+        self.reset_on_game_over = reset_on_game_over
+
+        # Accumulated over the run
+        self.ticks = 0
+        self.entity_ticks = 0
+        self.resets = 0
+        self.phase_time = {}
+
+    def _feed_inputs(self, manager):
+        """Queue this tick's scripted or random input for a match"""
+        tick = manager.tick_engine.tick
+        if self.script is not None:
+            messages = self.script.get(tick, ())
+        elif self.input_rng.random() < self.INPUT_RATE:
+            messages = [self.input_rng.choice(RANDOM_ACTIONS)]
+        else:
+            messages = ()
+
+        # Keep the board populated instead of measuring an empty game-over screen
+        if self.reset_on_game_over and manager.shared_state.is_game_over():
+            messages = [{"action": "reset_game"}]
+            self.resets += 1
+
+        for message in messages:
+            manager.input_queue.put_nowait(message)
+
+    def run(self, ticks):
+        """Run every match for the given number of ticks; returns wall time"""
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for manager in self.managers:
+                self._feed_inputs(manager)
+                manager.tick_engine.step()
+
+                state = manager.shared_state
+                self.entity_ticks += len(state.enemies) + len(state.missiles) + len(state.fuel_depots)
+                for name, seconds in manager.tick_engine.get_performance_stats()['phase_time'].items():
+                    self.phase_time[name] = self.phase_time.get(name, 0) + seconds
+                self.ticks += 1
+        return time.perf_counter() - start
+
+    def report(self, elapsed):
+        """Throughput summary for a finished run"""
+        tick_rate = self.managers[0].tick_engine.TICK_RATE
+        ticks_per_second = self.ticks / elapsed if elapsed else float('inf')
+        return {
+            'matches': len(self.managers),
+            'ticks': self.ticks,
+            'elapsed': elapsed,
+            'ticks_per_second': ticks_per_second,
+            'entities_per_second': self.entity_ticks / elapsed if elapsed else float('inf'),
+            'average_entities': self.entity_ticks / self.ticks if self.ticks else 0,
+            'resets': self.resets,
+            # Matches one core could tick at the configured rate
+            'matches_per_core': ticks_per_second / tick_rate,
+            'phase_time': {name: seconds / self.ticks for name, seconds in self.phase_time.items()}
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the server simulation headless as fast as possible")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks per match")
+    parser.add_argument("--matches", type=int, default=1, help="matches stepped round-robin on this core")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match and of random inputs")
+    parser.add_argument("--input-rate", type=float, default=0.3, help="chance per tick of a random input")
+    parser.add_argument("--script", help="input log to play instead of random inputs")
+    parser.add_argument("--no-reset", action="store_true", help="leave matches in game over")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    script = InputLog.load(args.script) if args.script else None
+    runner = HeadlessRunner(args.matches, args.seed, args.input_rate, script, not args.no_reset)
+    report = runner.report(runner.run(args.ticks))
+
+    print(f"{report['matches']} match(es), {report['ticks']} ticks in {report['elapsed']:.2f}s")
+    print(f"{report['ticks_per_second']:>12.0f} ticks/s")
+    print(f"{report['entities_per_second']:>12.0f} entities/s ({report['average_entities']:.1f} per tick)")
+    print(f"{report['matches_per_core']:>12.1f} matches per core at {runner.managers[0].tick_engine.TICK_RATE} Hz")
+    print(f"{report['resets']:>12} resets after game over")
+    print("per-phase time (us/tick):")
+    for name, seconds in report['phase_time'].items():
+        print(f"  {name:>10} {seconds * 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,26 @@
-from server.network.network import ServerNetwork
+import os
+import signal
+import logging
+from server.network.network import create_server
+from server.supervisor import Supervisor
 
 if __name__ == "__main__":
-    server = ServerNetwork()
-    server.start_service()
\ No newline at end of file
+    # More than one worker forks a process per shard, all sharing the port
+    workers = int(os.getenv("SERVER_WORKERS", 1))
+    server = Supervisor(workers) if workers > 1 else create_server()
+
+    def shutdown(sig, frame):
+        """Handle termination signals (e.g., Ctrl+C) once for the whole process"""
+        logging.info(f"main: Caught signal {sig}. Exiting gracefully...")
+        if workers > 1:
+            server.stop()
+        else:
+            server.close_service()
+        os._exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    if workers > 1:
+        server.run()
+    else:
+        server.start_service()
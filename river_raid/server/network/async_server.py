@@ -0,0 +1,195 @@
+# server/network/async_server.py
+import os
+import socket
+import struct
+import asyncio
+import logging
+from shared import binary_protocol
+from shared.binary_protocol import (PROTOCOL_JSON, PROTOCOL_BINARY, FRAME_HEADER, MAX_FRAME_SIZE,
+                                    negotiate)
+from shared.network_utils import serialize_message, deserialize_message
+from shared.transport import create_transport, TCPTransport, UnixTransport, TRANSPORT_SSH
+from server.game.match_registry import MatchRegistry
+
+class AsyncServerNetwork:
+    """Serves every client from one asyncio event loop over plain TCP or a Unix socket
+
+    Speaks the same newline-delimited JSON protocol as the poller front end.
+    Each connection is one task that owns its match; the simulation still
+    runs on the MatchRegistry's scheduler workers. A streaming client gets a
+    second task that writes each pushed snapshot.
+    """
+
+    MAX_LINE = 64 * 1024       # Longest accepted request line in bytes
+    IDLE_TIMEOUT = 60.0        # Seconds without a request before a client is dropped
+    WRITE_TIMEOUT = 5.0        # Seconds a client may leave a response unread
+
+    def __init__(self, reuse_port=False):
+        self.reuse_port = reuse_port
+        self.transport = create_transport("SERVER")
+        if self.transport.name == TRANSPORT_SSH:
+            logging.warning("async_server: SSH is not supported on the asyncio front end, serving plain TCP")
+            self.transport = TCPTransport(self.transport.host, self.transport.port)
+        self.registry = MatchRegistry(
+            workers=int(os.getenv("SERVER_SCHEDULER_WORKERS", MatchRegistry.DEFAULT_WORKERS))
+        )
+        self.loop = None
+        self.server = None
+        self.connections = set()  # Live per-connection tasks
+
+    def start_service(self):
+        """Run the event loop until close_service()"""
+        try:
+            logging.info("async_server: Starting asyncio server...")
+            self.registry.start()
+            asyncio.run(self._serve())
+        except Exception as e:
+            logging.error(f"async_server: Failed to start service: {e}")
+            raise
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        sock = self.transport.listen(backlog=1024, reuse_port=self.reuse_port)
+        sock.setblocking(False)
+        if isinstance(self.transport, UnixTransport):
+            self.server = await asyncio.start_unix_server(self._handle_connection, sock=sock, limit=self.MAX_LINE)
+        else:
+            self.server = await asyncio.start_server(self._handle_connection, sock=sock, limit=self.MAX_LINE)
+        logging.info(f"async_server: Server listening on {sock.getsockname()}")
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in list(self.connections):
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            logging.info("async_server: Event loop has stopped")
+
+    async def _handle_connection(self, reader, writer):
+        """Per-connection task: read requests, answer them, release the match on exit"""
+        task = asyncio.current_task()
+        self.connections.add(task)
+        addr = writer.get_extra_info('peername')
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        game_manager = self.registry.create_match()
+        logging.info(f"async_server: Connection from {addr}, match {game_manager.match_id} "
+                     f"({len(self.connections)} clients)")
+        client = {'protocol': PROTOCOL_JSON, 'ack': None}  # Protocol until the client negotiates otherwise
+        pusher = None
+        try:
+            while True:
+                try:
+                    # A streaming client is watched by its pusher's write timeout instead
+                    timeout = self.IDLE_TIMEOUT if pusher is None else None
+                    message = await asyncio.wait_for(self._read_message(reader, client['protocol']), timeout)
+                except asyncio.TimeoutError:
+                    logging.info(f"async_server: Client {addr} idle, disconnecting")
+                    break
+                except (asyncio.LimitOverrunError, ValueError):
+                    logging.warning(f"async_server: Client {addr} sent an oversized request, disconnecting")
+                    break
+
+                if message is None:
+                    logging.info(f"async_server: No more data from {addr}. Closing connection.")
+                    break
+                if message is False:
+                    continue
+
+                if message.get("action") == "hello":
+                    client['protocol'], reply = negotiate(message)
+                    if message.get("stream") and pusher is None:
+                        ready = asyncio.Event()
+                        callback = lambda snapshot: self.loop.call_soon_threadsafe(ready.set)
+                        reply["stream"] = game_manager.subscribe(callback, message["stream"])
+                        pusher = asyncio.create_task(self._push_snapshots(writer, game_manager, client, ready))
+                        pusher.add_done_callback(lambda _: game_manager.unsubscribe(callback))
+                    writer.write((serialize_message(reply) + '\n').encode('utf-8'))
+                else:
+                    client['ack'] = message.get("ack")
+                    writer.write(game_manager.encode_response(message, client['protocol'], pusher is not None))
+                if pusher is not None:
+                    # The pusher drains; a client that stops reading fails its write timeout
+                    if pusher.done():
+                        break
+                    continue
+                # A client that stops reading only blocks its own task
+                try:
+                    await asyncio.wait_for(writer.drain(), self.WRITE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logging.warning(f"async_server: Client {addr} stopped reading, disconnecting")
+                    break
+        except asyncio.CancelledError:
+            pass
+        except (ConnectionError, OSError) as e:
+            logging.info(f"async_server: Connection to {addr} lost: {e}")
+        except Exception as e:
+            logging.error(f"async_server: Error handling client {addr}: {e}")
+        finally:
+            if pusher is not None:
+                pusher.cancel()
+            self.connections.discard(task)
+            game_manager.snapshot_cache.log_stats()
+            self.registry.remove_match(game_manager)
+            writer.close()
+
+    async def _push_snapshots(self, writer, game_manager, client, ready):
+        """Write the latest snapshot each time the tick thread sets ready"""
+        addr = writer.get_extra_info('peername')
+        pushed_sequence = None
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                snapshot = game_manager.shared_state.latest_snapshot()
+                if snapshot.sequence == pushed_sequence:
+                    continue
+                pushed_sequence = snapshot.sequence
+                writer.write(game_manager.encode_snapshot(client['protocol'], client['ack'], snapshot))
+                await asyncio.wait_for(writer.drain(), self.WRITE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.warning(f"async_server: Client {addr} stopped reading, disconnecting")
+            writer.close()
+        except (ConnectionError, OSError) as e:
+            logging.info(f"async_server: Push to {addr} failed: {e}")
+            writer.close()
+
+    async def _read_message(self, reader, protocol):
+        """Next request as a dict; None at end of stream, False for a line or frame to skip"""
+        if protocol == PROTOCOL_BINARY:
+            try:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_SIZE:
+                    raise ValueError(f"Frame of {length} bytes exceeds the limit")
+                payload = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                return None
+            try:
+                return binary_protocol.decode(payload)
+            except (ValueError, IndexError, struct.error) as e:
+                logging.error(f"async_server: Malformed binary frame: {e}")
+                return False
+
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.strip():
+            return False
+        message = deserialize_message(line.decode('utf-8'))
+        if message is None:
+            logging.error("async_server: Failed to deserialize message")
+            return False
+        return message
+
+    def close_service(self):
+        """Stop accepting, cancel every connection task and stop the matches"""
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+        self.registry.stop()
+        self.transport.close()
+        logging.info("async_server: Server service closed")
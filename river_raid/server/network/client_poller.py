@@ -0,0 +1,181 @@
+# server/network/client_poller.py
+import queue
+import socket
+import logging
+import selectors
+import threading
+
+class ClientPoller:
+    """Serves every open client channel from a single thread
+
+    Paramiko channels expose a fileno() that becomes readable when data
+    arrives, so one selector can wait on all of them. Each registered
+    session's on_readable() is called when its channel has data and must
+    return False once the client is gone. Sessions streaming snapshots call
+    notify() from the tick thread and get push() called here, so every
+    write to a channel happens on this one thread.
+
+    Channels are non-blocking and sessions queue what the channel does not
+    take at once. Such a session is watched for writability instead of
+    readability until its queue drains, so a client that stops reading
+    holds up nobody but itself. paramiko channels cannot be watched for
+    writability; their queues are retried every RETRY_INTERVAL.
+    """
+
+    RETRY_INTERVAL = 0.01  # Seconds between write retries on channels select() cannot watch
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.pending = queue.Queue()  # (channel, session) waiting to be registered
+        self.ready = queue.Queue()  # Sessions with a snapshot due
+        self.interest = {}  # Open session -> selector events its channel is registered for (0: none)
+        self.stalled = set()  # Sessions with queued output on a channel select() cannot watch
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self.selector.register(self._wake_reader, selectors.EVENT_READ, None)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Start the polling thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._poll_loop, name="client-poller")
+        self.thread.daemon = True
+        self.thread.start()
+        logging.info("client_poller: Started")
+
+    def stop(self):
+        """Stop polling and close every session still open"""
+        self.running = False
+        self._wake()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        for session in list(self.interest):
+            self._close(session.connection, session)
+        logging.info("client_poller: Stopped")
+
+    def add(self, channel, session):
+        """Hand an opened channel to the polling thread"""
+        self.pending.put((channel, session))
+        self._wake()
+
+    def notify(self, session):
+        """Ask the polling thread to push a snapshot to a session; safe from any thread"""
+        self.ready.put(session)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_writer.send(b'\0')
+        except OSError:
+            pass
+
+    def _poll_loop(self):
+        """Dispatch readable and writable channels to their sessions"""
+        while self.running:
+            try:
+                timeout = self.RETRY_INTERVAL if self.stalled else 1.0
+                for key, events in self.selector.select(timeout=timeout):
+                    if key.data is None:
+                        self._register_pending()
+                        self._push_ready()
+                        continue
+
+                    session = key.data
+                    if session not in self.interest:
+                        continue  # Closed earlier in this round
+                    keep_open = True
+                    try:
+                        if events & selectors.EVENT_WRITE:
+                            session.on_writable()
+                        if events & selectors.EVENT_READ and session.wants_read():
+                            keep_open = session.on_readable()
+                    except Exception as e:
+                        logging.error(f"client_poller: Error serving client: {e}")
+                        keep_open = False
+                    if keep_open:
+                        self._watch(session)
+                    else:
+                        self._close(session.connection, session)
+
+                for session in list(self.stalled):
+                    try:
+                        session.on_writable()
+                        self._watch(session)
+                    except Exception as e:
+                        logging.error(f"client_poller: Error writing to client: {e}")
+                        self._close(session.connection, session)
+            except Exception as e:
+                logging.error(f"client_poller: Error in poll loop: {e}")
+
+        logging.info("client_poller: Poll loop has stopped")
+
+    def _register_pending(self):
+        """Drain the wake-up socket and start watching newly added channels"""
+        try:
+            while self._wake_reader.recv(512):
+                pass
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                channel, session = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            channel.setblocking(False)
+            self.interest[session] = 0
+            self._watch(session)
+            logging.info(f"client_poller: Serving {len(self.interest)} clients")
+
+    def _watch(self, session):
+        """Register a session's channel for the events it can act on now"""
+        if session not in self.interest:
+            return
+        events = selectors.EVENT_READ if session.wants_read() else 0
+        if session.outbound and session.write_pollable:
+            events |= selectors.EVENT_WRITE
+        if session.outbound and not session.write_pollable:
+            self.stalled.add(session)
+        else:
+            self.stalled.discard(session)
+
+        current = self.interest[session]
+        if events == current:
+            return
+        channel = session.connection
+        if not events:
+            self.selector.unregister(channel)
+        elif not current:
+            self.selector.register(channel, events, session)
+        else:
+            self.selector.modify(channel, events, session)
+        self.interest[session] = events
+
+    def _push_ready(self):
+        """Send the snapshots that became due since the last wake-up"""
+        while True:
+            try:
+                session = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            if session not in self.interest:
+                continue  # Closed since the snapshot came due
+            try:
+                session.push()
+                self._watch(session)
+            except Exception as e:
+                logging.error(f"client_poller: Error pushing to client: {e}")
+                self._close(session.connection, session)
+
+    def _close(self, channel, session):
+        """Stop watching a channel and let its session clean up"""
+        if self.interest.pop(session, 0):
+            try:
+                self.selector.unregister(channel)
+            except (KeyError, ValueError):
+                pass
+        self.stalled.discard(session)
+        session.close()
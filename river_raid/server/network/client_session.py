@@ -0,0 +1,163 @@
+# server/network/client_session.py
+import socket
+import struct
+import logging
+from shared import binary_protocol
+from shared.binary_protocol import PROTOCOL_JSON, PROTOCOL_BINARY, negotiate
+from shared.framing import FrameBuffer
+from shared.network_utils import serialize_message, deserialize_message
+
+class ClientSession:
+    """One connected client and its match, independent of the transport carrying it
+
+    Replies and snapshots are queued in an outbound buffer and written with
+    send(), never sendall(). On a non-blocking connection a client that
+    stops reading therefore only fills its own buffer. The front end stops
+    reading its requests until the buffer drains, and a client that lets
+    it grow past MAX_OUTBOUND is disconnected.
+    """
+
+    MAX_OUTBOUND = 4 * 1024 * 1024  # Bytes a client may leave unread before it is dropped
+
+    def __init__(self, connection, registry, notify=None):
+        self.connection = connection  # Socket or paramiko Channel
+        self.registry = registry
+        self.game_manager = None
+        self.running = True
+        self.reader = FrameBuffer()  # Requests are decoded straight out of its buffer
+        self.protocol = PROTOCOL_JSON  # Until the client negotiates otherwise
+        self.outbound = bytearray()  # Encoded replies the connection has not taken yet
+        # paramiko Channels only signal readability, so their writes are retried on a timer
+        self.write_pollable = not hasattr(connection, 'send_ready')
+
+        # Snapshot streaming: notify(session) asks the front end to call push() on its own thread
+        self.notify = notify
+        self.streaming = False
+        self.ack = None  # Snapshot the client last acknowledged; pushes are diffed against it
+        self.pushed_sequence = None
+        self.push_due = False  # A snapshot came due while output was queued
+
+    def open(self):
+        """Start a new match ticked by the registry for this client"""
+        self.game_manager = self.registry.create_match()
+        logging.info(f"client_session: Match {self.game_manager.match_id} started.")
+
+    def on_readable(self):
+        """Serve whatever the client sent; returns False once the client has gone"""
+        if not self.reader.receive(self.connection):
+            logging.info("client_session: No more data from client. Closing connection.")
+            return False
+
+        # A "hello" can switch the protocol partway through what was received
+        while True:
+            if self.protocol == PROTOCOL_BINARY:
+                for payload in self.reader.next_frames():
+                    try:
+                        message = binary_protocol.decode(payload)
+                    except (ValueError, IndexError, struct.error) as e:
+                        logging.error(f"client_session: Malformed binary frame: {e}")
+                        continue
+                    self._handle(message)
+                break
+
+            line = self.reader.next_line()
+            if line is None:
+                break
+            message_text = str(line, 'utf-8')
+            if message_text.strip():
+                # Deserialize the message from the client
+                message = deserialize_message(message_text)
+                if message is None:
+                    logging.error("client_session: Failed to deserialize message")
+                    continue
+                self._handle(message)
+        return True
+
+    def _handle(self, message):
+        """Answer one decoded request; "hello" switches the session's protocol"""
+        try:
+            if message.get("action") == "hello":
+                self.protocol, reply = negotiate(message)
+                if message.get("stream") and self.notify is not None:
+                    reply["stream"] = self.game_manager.subscribe(self._on_snapshot, message["stream"])
+                    self.streaming = True
+                self._send((serialize_message(reply) + '\n').encode('utf-8'))
+                logging.info(f"client_session: Using the {self.protocol} protocol"
+                             + (f", streaming at {reply['stream']:g} Hz" if self.streaming else ""))
+                return
+
+            self.ack = message.get("ack")
+
+            # Process the message; the encoded snapshot is shared across clients
+            response_bytes = self.game_manager.encode_response(message, self.protocol, self.streaming)
+
+            # Send the response back to the client
+            if response_bytes:
+                self._send(response_bytes)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            logging.error(f"client_session: Error processing message: {e}")
+
+    def _on_snapshot(self, snapshot):
+        """Tick thread: a snapshot is due, let the front end send it"""
+        self.notify(self)
+
+    def push(self):
+        """Send the latest snapshot to a streaming client unless it already has it
+
+        While earlier output is still queued, the push is only remembered.
+        Once the queue drains, the snapshot that is newest then goes out, so
+        a slow client skips snapshots instead of queueing every one.
+        """
+        if not self.running:
+            return
+        if self.outbound:
+            self.push_due = True
+            return
+        self.push_due = False
+        snapshot = self.game_manager.shared_state.latest_snapshot()
+        if snapshot.sequence == self.pushed_sequence:
+            return
+        self.pushed_sequence = snapshot.sequence
+        self._send(self.game_manager.encode_snapshot(self.protocol, self.ack, snapshot))
+
+    def _send(self, data):
+        """Queue bytes for the client and write what the connection takes now"""
+        if len(self.outbound) + len(data) > self.MAX_OUTBOUND:
+            raise ConnectionError(f"Client left over {self.MAX_OUTBOUND} bytes unread")
+        self.outbound += data
+        self.flush()
+
+    def flush(self):
+        """Write queued output without blocking; returns True once all of it is sent"""
+        while self.outbound:
+            try:
+                sent = self.connection.send(self.outbound)
+            except (BlockingIOError, socket.timeout):
+                return False
+            if not sent:
+                return False
+            del self.outbound[:sent]
+        return True
+
+    def on_writable(self):
+        """Continue sending queued output, then any snapshot that came due meanwhile"""
+        if self.flush() and self.push_due:
+            self.push()
+
+    def wants_read(self):
+        """Whether to read more requests now; not while replies to earlier ones are unsent"""
+        return self.running and not self.outbound
+
+    def close(self):
+        """Stop the client's match and close its connection"""
+        if not self.running:
+            return
+        self.running = False
+        logging.info("client_session: Stopping match and closing connection.")
+        if self.game_manager is not None:
+            self.game_manager.unsubscribe(self._on_snapshot)
+            self.game_manager.snapshot_cache.log_stats()
+            self.registry.remove_match(self.game_manager)
+        self.connection.close()
@@ -1,9 +1,12 @@
 # server/network/network.py
-import paramiko
 import os
-import socket
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from shared.transport import create_transport
 from server.network.ssh_server import SSHServer
+from server.network.client_session import ClientSession
+from server.network.client_poller import ClientPoller
+from server.game.match_registry import MatchRegistry
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,43 +16,68 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class ServerNetwork:
-    def __init__(self):
-        self.host = os.getenv("SERVER_HOST", "127.0.0.1")
-        self.port = int(os.getenv("SERVER_PORT", 2200))
-        self.key_filename = os.getenv("SERVER_KEY_FILENAME")
-        self.server_key = None
+    def __init__(self, reuse_port=False):
+        # With SO_REUSEPORT several worker processes share the port and the kernel spreads connections
+        self.reuse_port = reuse_port
+        self.transport = create_transport("SERVER", server_interface=SSHServer)
         self.sock = None
 
+        # Fixed thread pools: scheduler workers tick matches, one poller serves connections
+        self.registry = MatchRegistry(
+            workers=int(os.getenv("SERVER_SCHEDULER_WORKERS", MatchRegistry.DEFAULT_WORKERS))
+        )
+        self.poller = ClientPoller()
+        self.HANDSHAKE_WORKERS = int(os.getenv("SERVER_HANDSHAKE_WORKERS", 4))
+        self.handshakes = ThreadPoolExecutor(max_workers=self.HANDSHAKE_WORKERS,
+                                             thread_name_prefix="handshake")
+
     def start_service(self):
         try:
-            logging.info("network: Starting SSH server...")
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.sock.bind((self.host, self.port))
-            self.sock.listen(100)
-            logging.info(f"network: Server listening on {self.host}:{self.port}")
-            
-            self.server_key = paramiko.RSAKey(filename=self.key_filename)
+            logging.info(f"network: Starting {self.transport.name} server...")
+            self.sock = self.transport.listen(backlog=100, reuse_port=self.reuse_port)
+            logging.info(f"network: Server listening on {self.sock.getsockname()}")
+
+            self.registry.start()
+            self.poller.start()
             while True:
                 client, addr = self.sock.accept()
                 logging.info(f"network: Connection from {addr}")
-                transport = paramiko.Transport(client)
-                transport.add_server_key(self.server_key)
-                ssh_server = SSHServer()
-                transport.start_server(server=ssh_server)
-                channel = transport.accept(20)
-                
-                if channel is None:
-                    logging.warning("network: No channel opened by client")
-                    continue
-
-                logging.info("network: Channel opened, starting communication")
-                ssh_server.handle_client(channel)
+                # An SSH handshake blocks, so it runs on the pool and never stalls accept()
+                self.handshakes.submit(self._open_connection, client, addr)
         except Exception as e:
             logging.error(f"network: Failed to start service: {e}")
             raise
 
+    def _open_connection(self, client, addr):
+        """Set up the transport for a new client and hand its session to the poller"""
+        try:
+            connection = self.transport.open(client, addr)
+            if connection is None:
+                return
+
+            logging.info(f"network: Connection open for {addr}, starting communication")
+            session = ClientSession(connection, self.registry, notify=self.poller.notify)
+            session.open()
+            self.poller.add(connection, session)
+        except Exception as e:
+            logging.error(f"network: Handshake with {addr} failed: {e}")
+            client.close()
+
     def close_service(self):
         if self.sock:
             self.sock.close()
-            logging.info("network: Server service closed")
+        self.handshakes.shutdown(wait=False)
+        self.poller.stop()
+        self.registry.stop()
+        self.transport.close()
+        logging.info("network: Server service closed")
+
+def create_server(reuse_port=False):
+    """Build the front end named by SERVER_FRONTEND ("poller" or "asyncio")"""
+    frontend = os.getenv("SERVER_FRONTEND", "poller")
+    if frontend == "asyncio":
+        from server.network.async_server import AsyncServerNetwork
+        return AsyncServerNetwork(reuse_port=reuse_port)
+    if frontend != "poller":
+        raise ValueError(f"Unknown server front end: {frontend}")
+    return ServerNetwork(reuse_port=reuse_port)
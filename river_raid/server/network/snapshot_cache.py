@@ -0,0 +1,119 @@
+# server/network/snapshot_cache.py
+import threading
+import logging
+from shared.network_utils import serialize_message
+from shared.binary_protocol import encode_state, encode_delta
+from shared.delta import diff_states
+
+class SnapshotCache:
+    """Encodes each published snapshot once and hands the same bytes to every consumer
+
+    Deltas are cached per baseline sequence, so clients that acknowledged
+    the same snapshot share one diff and one encode as well.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._key = None
+        self._response = None  # Encoded {"status": "ok", "seq": ..., "game_state": ...} without newline
+        self._batches = {}     # (batch size, baseline sequence) -> encoded {"status": "ok", "responses": [...]}
+        self._binary = None    # Binary protocol state frame
+        self._deltas = {}      # Baseline sequence -> diff_states() result
+        self._delta_encodings = {}  # (baseline sequence, "json" | "binary") -> encoded delta
+
+        # Encodes saved vs. performed
+        self.hits = 0
+        self.misses = 0
+
+    def _select(self, snapshot):
+        """Drop the encodings of an older snapshot"""
+        # Resets republish under the same tick, so the publish sequence is part of the key
+        key = (snapshot.tick, snapshot.sequence)
+        if self._key != key:
+            self._key = key
+            self._response = None
+            self._batches = {}
+            self._binary = None
+            self._deltas = {}
+            self._delta_encodings = {}
+
+    def _encoded_response(self, snapshot, baseline=None):
+        """JSON for a single ok response, full or against a baseline, encoding on first use"""
+        self._select(snapshot)
+        if baseline is not None:
+            return self._encoded_delta(snapshot, baseline, 'json')
+        if self._response is not None:
+            self.hits += 1
+            return self._response
+
+        self.misses += 1
+        state_json = serialize_message(snapshot.state)
+        if state_json is None:
+            raise ValueError(f"Snapshot for tick {snapshot.tick} could not be serialized")
+        self._response = f'{{"status": "ok", "seq": {snapshot.sequence}, "game_state": ' + state_json + '}'
+        return self._response
+
+    def _encoded_delta(self, snapshot, baseline, encoding):
+        """Delta of snapshot against baseline as JSON text or a binary frame"""
+        key = (baseline.sequence, encoding)
+        encoded = self._delta_encodings.get(key)
+        if encoded is not None:
+            self.hits += 1
+            return encoded
+
+        self.misses += 1
+        delta = self._deltas.get(baseline.sequence)
+        if delta is None:
+            delta = diff_states(baseline.state, snapshot.state)
+            self._deltas[baseline.sequence] = delta
+        if encoding == 'binary':
+            encoded = encode_delta(snapshot.sequence, baseline.sequence, delta)
+        else:
+            encoded = serialize_message({"status": "ok", "seq": snapshot.sequence,
+                                         "base": baseline.sequence, "delta": delta})
+        self._delta_encodings[key] = encoded
+        return encoded
+
+    def response_bytes(self, snapshot, baseline=None):
+        """Newline-terminated bytes for a direct response carrying the snapshot"""
+        with self.lock:
+            return (self._encoded_response(snapshot, baseline) + '\n').encode('utf-8')
+
+    def batch_response_bytes(self, snapshot, count, baseline=None):
+        """Newline-terminated bytes for an "actions" batch of count responses"""
+        with self.lock:
+            response = self._encoded_response(snapshot, baseline)
+            key = (count, baseline.sequence if baseline is not None else None)
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = ('{"status": "ok", "responses": [' + ', '.join([response] * count) + ']}\n').encode('utf-8')
+                self._batches[key] = batch
+            return batch
+
+    def binary_response_bytes(self, snapshot, baseline=None):
+        """Binary protocol frame for the snapshot, full or against a baseline"""
+        with self.lock:
+            self._select(snapshot)
+            if baseline is not None:
+                return self._encoded_delta(snapshot, baseline, 'binary')
+            if self._binary is not None:
+                self.hits += 1
+                return self._binary
+            self.misses += 1
+            self._binary = encode_state(snapshot.state, snapshot.sequence)
+            return self._binary
+
+    def get_stats(self):
+        """Hit/miss counters; hits are encodes saved"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+    def log_stats(self):
+        """Log the current hit/miss counters"""
+        stats = self.get_stats()
+        logging.info(f"snapshot_cache: {stats['hits']} encodes saved, {stats['misses']} performed "
+                     f"({stats['hit_rate']:.0%} hit rate)")
@@ -0,0 +1,178 @@
+# server/supervisor.py
+import os
+import time
+import queue
+import signal
+import logging
+import threading
+import multiprocessing
+
+class Supervisor:
+    """Forks worker processes that each host a shard of matches on a shared SO_REUSEPORT port
+
+    Every worker runs its own server front end and MatchRegistry, so each
+    shard simulates on its own core. Workers report load over a queue;
+    the supervisor aggregates it and restarts any worker that dies.
+    """
+
+    REPORT_INTERVAL = 2.0    # Seconds between load reports from a worker
+    SUMMARY_INTERVAL = 10.0  # Seconds between aggregated log lines
+    RESTART_BACKOFF = 1.0    # Seconds before restarting a crashed worker
+    MAX_RESTARTS = 5         # Per shard, within RESTART_WINDOW
+    RESTART_WINDOW = 60.0
+
+    def __init__(self, workers):
+        self.context = multiprocessing.get_context("fork")
+        self.workers = max(1, workers)
+        self.processes = {}   # shard -> Process
+        self.restarts = {shard: [] for shard in range(self.workers)}  # shard -> restart times
+        self.restart_at = {}  # shard -> monotonic time its crashed worker is due to be restarted
+        self.shard_stats = {}  # shard -> latest report
+        self.metrics_queue = self.context.Queue()
+        self.running = False
+        self.stats_lock = threading.Lock()
+
+    def run(self):
+        """Start every shard and supervise them until stop()"""
+        self.running = True
+        for shard in range(self.workers):
+            self._start_worker(shard)
+        logging.info(f"supervisor: Started {self.workers} worker processes")
+
+        last_summary = time.monotonic()
+        while self.running:
+            try:
+                self._drain_metrics(timeout=0.5)
+                self._check_workers()
+
+                if time.monotonic() - last_summary >= self.SUMMARY_INTERVAL:
+                    self.log_stats()
+                    last_summary = time.monotonic()
+            except Exception as e:
+                logging.error(f"supervisor: Error in supervision loop: {e}")
+                time.sleep(0.5)
+
+    def stop(self):
+        """Terminate every worker process"""
+        self.running = False
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for shard, process in self.processes.items():
+            process.join(timeout=5.0)
+            if process.is_alive():
+                logging.warning(f"supervisor: Worker {shard} did not exit, killing it")
+                process.kill()
+        logging.info("supervisor: All worker processes stopped")
+
+    def _start_worker(self, shard):
+        process = self.context.Process(
+            target=_worker_main,
+            args=(shard, self.metrics_queue, self.REPORT_INTERVAL),
+            name=f"shard-{shard}",
+            daemon=True
+        )
+        process.start()
+        self.processes[shard] = process
+        logging.info(f"supervisor: Worker {shard} running as pid {process.pid}")
+
+    def _check_workers(self):
+        """Restart workers that exited once their backoff has passed, unless a shard keeps crashing"""
+        now = time.monotonic()
+        for shard, process in list(self.processes.items()):
+            if process.is_alive() or not self.running:
+                continue
+
+            if shard in self.restart_at:
+                if now >= self.restart_at[shard]:
+                    del self.restart_at[shard]
+                    self.restarts[shard].append(now)
+                    self._start_worker(shard)
+                continue
+
+            recent = [t for t in self.restarts[shard] if now - t < self.RESTART_WINDOW]
+            self.restarts[shard] = recent
+            if len(recent) >= self.MAX_RESTARTS:
+                logging.error(f"supervisor: Worker {shard} crashed {len(recent)} times "
+                              f"in {self.RESTART_WINDOW:.0f}s, leaving it down")
+                del self.processes[shard]
+                continue
+
+            logging.warning(f"supervisor: Worker {shard} (pid {process.pid}) exited "
+                            f"with code {process.exitcode}, restarting in {self.RESTART_BACKOFF:.0f}s")
+            with self.stats_lock:
+                self.shard_stats.pop(shard, None)
+            # Respawn on a later pass so the other shards stay supervised meanwhile
+            self.restart_at[shard] = now + self.RESTART_BACKOFF
+
+    def _drain_metrics(self, timeout):
+        """Keep the latest load report of every shard"""
+        try:
+            report = self.metrics_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while report is not None:
+            with self.stats_lock:
+                self.shard_stats[report['shard']] = report
+            try:
+                report = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                report = None
+
+    def get_stats(self):
+        """Per-shard load and totals across shards"""
+        with self.stats_lock:
+            shards = {shard: dict(report) for shard, report in sorted(self.shard_stats.items())}
+        return {
+            'shards': shards,
+            'workers_alive': sum(process.is_alive() for process in self.processes.values()),
+            'matches': sum(report['matches'] for report in shards.values()),
+            'ticks_per_second': sum(report['ticks_per_second'] for report in shards.values()),
+            'restarts': {shard: len(times) for shard, times in self.restarts.items()}
+        }
+
+    def log_stats(self):
+        """Log the aggregated load of every shard"""
+        stats = self.get_stats()
+        per_shard = ", ".join(f"{shard}: {report['matches']} matches {report['load']:.0%} load"
+                              for shard, report in stats['shards'].items())
+        logging.info(f"supervisor: {stats['workers_alive']}/{self.workers} workers, "
+                     f"{stats['matches']} matches, {stats['ticks_per_second']:.0f} ticks/s [{per_shard}]")
+
+def _worker_main(shard, metrics_queue, report_interval):
+    """Entry point of a forked worker: serve one shard of matches on the shared port"""
+    from server.network.network import create_server
+
+    # Ctrl+C goes to the whole process group; the supervisor decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    server = create_server(reuse_port=True)
+
+    def shutdown(sig, frame):
+        server.close_service()
+        os._exit(0)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    def report():
+        last_ticks, last_busy, last_time = 0, 0.0, time.monotonic()
+        while True:
+            time.sleep(report_interval)
+            try:
+                stats = server.registry.get_stats()
+                ticks = sum(worker['ticks'] for worker in stats['workers'])
+                busy = sum(worker['busy_time'] for worker in stats['workers'])
+                now = time.monotonic()
+                elapsed = now - last_time
+                metrics_queue.put({
+                    'shard': shard,
+                    'pid': os.getpid(),
+                    'matches': stats['matches'],
+                    'ticks_per_second': (ticks - last_ticks) / elapsed,
+                    # Share of one core spent ticking matches
+                    'load': (busy - last_busy) / elapsed
+                })
+                last_ticks, last_busy, last_time = ticks, busy, now
+            except Exception as e:
+                logging.error(f"supervisor: Worker {shard} failed to report load: {e}")
+
+    threading.Thread(target=report, daemon=True).start()
+    server.start_service()
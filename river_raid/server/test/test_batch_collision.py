@@ -0,0 +1,28 @@
+# server/test/test_batch_collision.py
+from server.game import batch_collision
+from server.game.batch_collision import cross_check
+from server.game.collision_handler import CollisionHandler
+from server.game.game_state import GameState
+
+def test_vector_backend_matches_hash_backend_on_both_stores():
+    """Seeded crowded scenes end the same for every backend on the list and array stores"""
+    for seed in range(3):
+        assert cross_check(trials=100, seed=seed) == [], f"seed {seed}"
+
+def test_cross_check_covers_the_array_store(monkeypatch):
+    """Boxes read from the array store are what the array runs use, so a bad read is reported"""
+    entity_boxes = batch_collision.entity_boxes
+
+    def shifted_store_boxes(entities, store=None):
+        x, y, width, height = entity_boxes(entities, store)
+        if store is not None:
+            x = x + 2.0
+        return x, y, width, height
+
+    monkeypatch.setattr(batch_collision, 'entity_boxes', shifted_store_boxes)
+    mismatches = cross_check(trials=50, seed=1)
+    assert mismatches
+    for mismatch in mismatches:
+        reference = mismatch['outcomes'][(CollisionHandler.BACKEND_HASH, GameState.STORAGE_LIST)]
+        differing = {run for run, outcome in mismatch['outcomes'].items() if outcome != reference}
+        assert differing == {(CollisionHandler.BACKEND_VECTOR, GameState.STORAGE_ARRAY)}
@@ -0,0 +1,33 @@
+# server/test/test_batch_movement.py
+import random
+import numpy as np
+from server.game.batch_movement import BatchMovement, cross_check, _fill_store
+from server.game.entity_store import TYPE_CODES
+
+TYPES = ('B', 'J', 'H', 'missile', 'fuel')
+
+def test_batch_movement_matches_scalar_moves():
+    """Every tick of a seeded scene moves each entity exactly as its scalar move() would"""
+    for seed in range(5):
+        store, _ = _fill_store(300, random.Random(seed))
+        mover = BatchMovement(store, np.random.default_rng(seed))
+        # Enough ticks for bounces, helicopter turns and despawns
+        for tick in range(30):
+            assert cross_check(store, seed=seed * 1000 + tick) == [], f"seed {seed}, tick {tick}"
+            for type_name in TYPES:
+                mover.move(type_name)
+
+def test_cross_check_reports_a_wrong_move(monkeypatch):
+    """A batch path that moves jets too far is caught"""
+    store, _ = _fill_store(50, random.Random(7))
+    move = BatchMovement.move
+
+    def drifting_move(self, type_name, helicopter_draws=None):
+        gone = move(self, type_name, helicopter_draws)
+        if type_name == 'J':
+            self.store.y[self.store.live_slots(TYPE_CODES['J'])] += 0.5
+        return gone
+
+    monkeypatch.setattr(BatchMovement, 'move', drifting_move)
+    mismatches = cross_check(store, seed=7)
+    assert mismatches and all(mismatch['type'] == 'J' for mismatch in mismatches)
@@ -0,0 +1,130 @@
+# server/test/test_binary_protocol.py
+import struct
+import pytest
+from shared.binary_protocol import encode_state, encode_delta, decode, FRAME_HEADER, QUANTIZATION, PROTOCOL_BINARY
+from shared.delta import diff_states, apply_delta
+from server.game.slot_map import SlotMap, entity_id
+from server.game.game_manager import GameManager
+
+INT16_MAX = 32767
+INT16_MIN = -32768
+
+def _state(enemies=(), depots=(), missiles=(), score=0, sequence=0):
+    """A network state with the given entity lists"""
+    return {"p": {"x": 15.0, "y": 28.0}, "e": list(enemies), "f": list(depots), "m": list(missiles),
+            "s": score, "l": 3, "u": 100, "g": "running", "n": sequence}
+
+def _decode(data):
+    """Decode one framed message"""
+    return decode(memoryview(data)[FRAME_HEADER.size:])
+
+def test_entity_ids_fit_the_protocol_after_the_generation_wraps():
+    """A slot reused past 2**16 times still yields a 32-bit id that encodes and round-trips"""
+    slots = SlotMap('enemy')
+    ids = []
+    for _ in range(70000):
+        entity = object()
+        ids.append(entity_id(slots.insert(entity)))
+        slots.remove(entity)
+    assert max(ids) < 2 ** 32
+    assert ids[65536] == ids[0]  # The generation wrapped back to 0
+
+    before = _state(enemies=[{"i": ids[65535], "x": 1.0, "y": 2.0, "t": "J"}])
+    after = _state(enemies=[{"i": ids[65536], "x": 1.5, "y": 2.0, "t": "J"}], score=10)
+    assert _decode(encode_state(after, 7))["game_state"] == after
+
+    delta = diff_states(before, after)
+    message = _decode(encode_delta(8, 7, delta))
+    assert apply_delta(before, message["delta"]) == after
+
+def test_coordinates_quantize_to_hundredths_up_to_the_int16_limits():
+    """Positions round to 1/QUANTIZATION and survive at the int16 extremes; beyond them encoding fails"""
+    top, bottom = INT16_MAX / QUANTIZATION, INT16_MIN / QUANTIZATION
+    state = _state(enemies=[{"i": 1, "x": top, "y": bottom, "t": "B"},
+                            {"i": 2, "x": 1.234, "y": 1.236, "t": "H"}],
+                   depots=[{"i": 3, "x": bottom, "y": top}],
+                   missiles=[{"i": 4, "x": -0.004, "y": 0.005, "t": "guided"}])
+    decoded = _decode(encode_state(state))["game_state"]
+    extreme, rounded = decoded["e"]
+    assert (extreme["x"], extreme["y"]) == (pytest.approx(top), pytest.approx(bottom))
+    assert (rounded["x"], rounded["y"]) == (pytest.approx(1.23), pytest.approx(1.24))
+    assert (decoded["f"][0]["x"], decoded["f"][0]["y"]) == (pytest.approx(bottom), pytest.approx(top))
+    assert decoded["m"][0]["x"] == pytest.approx(0.0) and decoded["m"][0]["t"] == "guided"
+
+    for x in (top + 1 / QUANTIZATION, bottom - 1 / QUANTIZATION):
+        with pytest.raises(struct.error):
+            encode_state(_state(enemies=[{"i": 1, "x": x, "y": 0.0, "t": "B"}]))
+
+    # A changed field in a delta is quantized the same way
+    moved = _state(enemies=[{"i": 1, "x": top, "y": 0.0, "t": "B"}])
+    delta = _decode(encode_delta(2, 1, diff_states(_state(enemies=[{"i": 1, "x": 0.0, "y": 0.0, "t": "B"}]), moved)))
+    assert delta["delta"]["e"]["c"] == [[1, 0b001, pytest.approx(top)]]
+
+def test_delta_round_trip_adds_removes_and_changes_entities():
+    """Every kind of entity change and scalar change rebuilds the newer state after a binary round trip"""
+    base = _state(
+        enemies=[{"i": 1, "x": 1.0, "y": 1.0, "t": "B"}, {"i": 2, "x": 2.0, "y": 2.0, "t": "J"},
+                 {"i": 3, "x": 3.0, "y": 3.0, "t": "H"}],
+        depots=[{"i": 10, "x": 5.0, "y": 5.0}],
+        missiles=[{"i": 20, "x": 7.0, "y": 9.0, "t": "straight"}],
+        score=40, sequence=11)
+    newer = _state(
+        enemies=[{"i": 1, "x": 1.0, "y": 1.5, "t": "B"},     # Moved along y only
+                 {"i": 3, "x": 3.25, "y": 3.0, "t": "J"},    # Moved along x and changed type
+                 {"i": 4, "x": 4.0, "y": 0.0, "t": "H"}],    # New; 2 was removed
+        depots=[],                                            # Depot 10 collected
+        missiles=[{"i": 20, "x": 7.0, "y": 8.0, "t": "straight"}, {"i": 21, "x": 12.5, "y": 29.0, "t": "guided"}],
+        score=50, sequence=12)
+
+    delta = diff_states(base, newer)
+    assert delta["e"]["a"] == [newer["e"][2]] and delta["e"]["r"] == [2]
+    assert delta["e"]["c"] == [[1, 0b010, 1.5], [3, 0b101, 3.25, "J"]]
+    assert delta["f"] == {"a": [], "r": [10], "c": []}
+    assert set(delta) == {"e", "f", "m", "s", "n"}
+
+    # The client holds the decoded baseline and must arrive at the decoded newer state
+    held = _decode(encode_state(base, 5))["game_state"]
+    message = _decode(encode_delta(6, 5, delta))
+    assert (message["seq"], message["base"]) == (6, 5)
+    assert apply_delta(held, message["delta"]) == _decode(encode_state(newer, 6))["game_state"]
+
+    # No change at all is an empty delta that leaves the state as it was
+    assert diff_states(newer, newer) == {}
+    assert apply_delta(held, _decode(encode_delta(6, 5, {}))["delta"]) == held
+
+def _advanced_manager(ticks=40):
+    """A match stepped far enough to have a full snapshot history and some entities"""
+    manager = GameManager(seed=4)
+    manager.input_queue.put({"action": "reset_game"})
+    for tick in range(ticks):
+        if tick % 3 == 0:
+            manager.input_queue.put({"action": "shoot"})
+        manager.tick_engine.step()
+    return manager
+
+def test_replies_are_deltas_against_a_held_ack():
+    """An acknowledged snapshot still in the history gets a delta that rebuilds the latest state"""
+    manager = _advanced_manager()
+    latest = manager.shared_state.latest_snapshot()
+    ack = latest.sequence - 5
+    reply = _decode(manager.encode_snapshot(PROTOCOL_BINARY, ack))
+    assert "delta" in reply and reply["base"] == ack and reply["seq"] == latest.sequence
+
+    held = _decode(encode_state(manager.shared_state.snapshot_at(ack).state, ack))["game_state"]
+    assert apply_delta(held, reply["delta"]) == _decode(encode_state(latest.state, latest.sequence))["game_state"]
+
+@pytest.mark.parametrize("age", [None, 'stale', 'unknown'])
+def test_stale_or_unknown_ack_falls_back_to_a_full_snapshot(age):
+    """No ack, an ack older than the history, or one never published gets the full state"""
+    manager = _advanced_manager()
+    latest = manager.shared_state.latest_snapshot()
+    ack = {None: None,
+           'stale': latest.sequence - manager.shared_state.SNAPSHOT_HISTORY,
+           'unknown': latest.sequence + 10}[age]
+    assert ack is None or manager.shared_state.snapshot_at(ack) is None
+    full = _decode(encode_state(latest.state, latest.sequence))
+
+    reply = _decode(manager.encode_snapshot(PROTOCOL_BINARY, ack))
+    assert "delta" not in reply and reply == full
+    json_reply = manager.encode_snapshot(ack=ack).decode('utf-8')
+    assert '"game_state"' in json_reply and '"delta"' not in json_reply
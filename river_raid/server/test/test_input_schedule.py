@@ -0,0 +1,80 @@
+# server/test/test_input_schedule.py
+from server.game.input_schedule import InputSchedule
+from shared.binary_protocol import SEQUENCE_MODULUS
+
+def _sequences(commands):
+    return [sequence for sequence, _ in commands]
+
+def test_wrapped_sequences_unwrap_across_the_modulus():
+    """Sequences sent modulo 256 keep counting up past the wrap, one per tick"""
+    schedule = InputSchedule()
+    applied = []
+    for tick in range(100, 120):
+        schedule.add([[(tick + 150) % 256, tick]], tick, 256)
+        applied.extend(schedule.pop_due(tick))
+    assert _sequences(applied) == list(range(250, 270))
+    assert [mask for _, mask in applied] == list(range(100, 120))
+    assert schedule.offset == -150 and not schedule.pending
+
+def test_wrapped_sequences_follow_the_tick_clock_after_a_long_idle_gap():
+    """After several full turns of the modulus without input, the sequence due now is recovered"""
+    schedule = InputSchedule()
+    schedule.add([[5, 1]], 10, SEQUENCE_MODULUS)
+    assert _sequences(schedule.pop_due(10)) == [5]
+
+    tick = 10 + 3 * SEQUENCE_MODULUS + 7
+    schedule.add([[(tick - 5) % SEQUENCE_MODULUS, 2], [(tick - 4) % SEQUENCE_MODULUS, 3]], tick, SEQUENCE_MODULUS)
+    assert schedule.offset == 5  # Still on schedule, so nothing was re-anchored
+    assert _sequences(schedule.pop_due(tick)) == [tick - 5]
+    assert _sequences(schedule.pop_due(tick + 1)) == [tick - 4]
+
+def test_late_commands_apply_on_the_next_tick_and_duplicates_are_dropped():
+    schedule = InputSchedule()
+    schedule.add([[0, 1]], 10, 256)
+    assert schedule.pop_due(10) == [(0, 1)]
+
+    # Command 1 was due on tick 11 but arrives before tick 13, within MAX_LAG
+    schedule.add([[1, 2], [2, 4]], 13, 256)
+    assert schedule.offset == 10
+    assert schedule.pop_due(13) == [(1, 2), (2, 4)]
+
+    # Resent or reordered commands that were already received are ignored
+    schedule.add([[0, 8], [1, 8], [2, 8], [3, 16]], 14, 256)
+    assert schedule.pop_due(14) == [(3, 16)]
+    assert schedule.applied_sequence == 3 and schedule.last_sequence == 3
+
+def test_early_commands_wait_for_their_tick():
+    schedule = InputSchedule()
+    schedule.add([[0, 1]], 10)
+    schedule.add([[1, 2], [2, 4], [3, 8]], 10)
+    assert schedule.pop_due(10) == [(0, 1)]
+    assert schedule.pop_due(11) == [(1, 2)]
+    assert schedule.pop_due(13) == [(2, 4), (3, 8)]
+    assert schedule.pop_due(14) == []
+
+def test_schedule_re_anchors_after_a_gap_without_dropping_commands():
+    """A client that falls too far behind or runs too far ahead is re-anchored on the command that broke the limit"""
+    schedule = InputSchedule()
+    schedule.add([[0, 1]], 10)
+    schedule.pop_due(10)
+
+    # Command 1 was due on tick 11; arriving on tick 11 + MAX_LAG + 1 is too late
+    late_tick = 11 + InputSchedule.MAX_LAG + 1
+    schedule.add([[1, 2], [2, 4]], late_tick)
+    assert schedule.offset == late_tick - 1
+    # The late command runs now and the rest keep their spacing behind it
+    assert schedule.pop_due(late_tick) == [(1, 2)]
+    schedule.add([[3, 8]], late_tick + 1)
+    assert schedule.pop_due(late_tick + 1) == [(2, 4)]
+    assert schedule.pop_due(late_tick + 2) == [(3, 8)]
+
+    # A burst that would wait more than MAX_LEAD ticks pulls the schedule forward
+    tick = late_tick + 3
+    burst = list(range(4, 4 + InputSchedule.MAX_LEAD + 4))
+    schedule.add([[sequence, sequence] for sequence in burst], tick)
+    first_too_early = 4 + InputSchedule.MAX_LEAD + 1
+    assert schedule.offset == tick - first_too_early
+    # Everything up to that command is due now, the rest follow one per tick
+    assert _sequences(schedule.pop_due(tick)) == list(range(4, first_too_early + 1))
+    assert _sequences(schedule.pop_due(tick + 1)) == [first_too_early + 1]
+    assert _sequences(schedule.pop_due(tick + 2)) == burst[-1:]
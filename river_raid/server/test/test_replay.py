@@ -0,0 +1,30 @@
+# server/test/test_replay.py
+from server.game.game_manager import GameManager
+from server.game.replay import replay, NullInputLog
+
+def _play(manager, ticks=250):
+    """Step a match with a few inputs on every tick"""
+    engine = manager.tick_engine
+    for tick in range(ticks):
+        manager.input_queue.put({"action": "move", "direction": "left" if tick % 40 < 20 else "right"})
+        if tick % 5 == 0:
+            manager.input_queue.put({"action": "shoot"})
+        engine.step()
+
+def test_unrecorded_match_keeps_no_inputs(monkeypatch):
+    """Without SERVER_INPUT_LOG_DIR the log is a no-op and does not grow with the match"""
+    monkeypatch.delenv("SERVER_INPUT_LOG_DIR", raising=False)
+    manager = GameManager(seed=3)
+    _play(manager)
+    assert isinstance(manager.input_log, NullInputLog)
+    assert manager.input_log.entries == [] and manager.input_log.checksums == {}
+
+def test_recorded_match_replays_exactly(monkeypatch):
+    """A recorded match re-simulates to the same checksums"""
+    monkeypatch.delenv("SERVER_INPUT_LOG_DIR", raising=False)
+    manager = GameManager(seed=3, record_inputs=True)
+    _play(manager)
+    log = manager.input_log
+    assert len(log.entries) == 300 and len(log.checksums) == 3
+    _, divergence, _ = replay(log)
+    assert divergence is None
@@ -0,0 +1,77 @@
+# server/test/test_slot_map.py
+from server.game.slot_map import SlotMap, Handle, entity_id
+
+class Thing:
+    def __init__(self, name, kind='a'):
+        self.name = name
+        self.kind = kind
+
+    def __repr__(self):
+        return self.name
+
+def test_stale_handles_stop_resolving_after_remove():
+    """Removing by entity or by handle invalidates every handle to that slot"""
+    slots = SlotMap('enemy')
+    first, second = Thing('first'), Thing('second')
+    first_handle = slots.insert(first)
+    second_handle = slots.insert(second)
+
+    assert slots.remove(first)
+    assert slots.get(first_handle) is None and not slots.is_valid(first_handle)
+    assert not slots.remove(first_handle)  # Already gone
+    assert slots.remove(second_handle)
+    assert slots.get(second_handle) is None and second not in slots
+
+def test_stale_handles_stop_resolving_after_clear():
+    """clear() invalidates every outstanding handle, including after slots are refilled"""
+    slots = SlotMap('enemy')
+    handles = [slots.insert(Thing(str(i))) for i in range(5)]
+    slots.clear()
+    assert len(slots) == 0 and list(slots) == []
+    assert all(slots.get(handle) is None for handle in handles)
+
+    refills = [slots.insert(Thing(f"new {i}")) for i in range(5)]
+    assert all(slots.get(handle) is None for handle in handles)
+    assert all(slots.get(handle) is not None for handle in refills)
+
+def test_handles_of_other_kinds_or_unknown_slots_do_not_resolve():
+    slots = SlotMap('enemy')
+    handle = slots.insert(Thing('thing'))
+    assert slots.get(Handle('missile', handle.index, handle.generation)) is None
+    assert slots.get(Handle('enemy', 7, 0)) is None
+
+def test_freed_slots_are_reused_with_a_bumped_generation():
+    """A new entity takes a freed index under the next generation, and gets a new network id"""
+    slots = SlotMap('enemy')
+    old = Thing('old')
+    old_handle = slots.insert(old)
+    slots.insert(Thing('other'))
+    slots.remove(old)
+
+    new_handle = slots.insert(Thing('new'))
+    assert new_handle.index == old_handle.index
+    assert new_handle.generation == old_handle.generation + 1
+    assert entity_id(new_handle) != entity_id(old_handle)
+    assert slots.get(old_handle) is None and slots.get(new_handle).name == 'new'
+
+def test_removal_keeps_iteration_dense_and_ordered():
+    """Iteration, handles() and of_type() skip freed slots and keep insertion order"""
+    slots = SlotMap('enemy', type_key=lambda thing: thing.kind)
+    things = [Thing(str(i), kind='a' if i % 2 else 'b') for i in range(8)]
+    for thing in things:
+        slots.insert(thing)
+    for index in (0, 3, 4, 7):
+        slots.remove(things[index])
+    survivors = [things[index] for index in (1, 2, 5, 6)]
+
+    assert list(slots) == survivors and len(slots) == 4
+    assert [slots.get(handle) for handle in slots.handles()] == survivors
+    assert list(slots.of_type('a')) == [things[1], things[5]]
+    assert list(slots.of_type('b')) == [things[2], things[6]]
+
+    # Reused slots go to the end of the iteration order, like appends to a list
+    late = Thing('late', kind='a')
+    slots.insert(late)
+    assert list(slots) == survivors + [late]
+    assert list(slots.of_type('a')) == [things[1], things[5], late]
+    assert len(slots._values) == 8  # Filled a free slot instead of growing
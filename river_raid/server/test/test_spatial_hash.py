@@ -0,0 +1,85 @@
+# server/test/test_spatial_hash.py
+import random
+from server.game.spatial_hash import SpatialHash
+
+def _overlaps(box, other):
+    x, y, width, height = box
+    ox, oy, owidth, oheight = other
+    return x < ox + owidth and x + width > ox and y < oy + oheight and y + height > oy
+
+def _distance_squared(x, y, box):
+    bx, by, width, height = box
+    dx = max(bx - x, 0, x - (bx + width))
+    dy = max(by - y, 0, y - (by + height))
+    return dx * dx + dy * dy
+
+def test_query_aabb_finds_boxes_straddling_cell_boundaries():
+    """A box over a cell corner is found from each of the four cells it covers"""
+    index = SpatialHash(cell_size=1.0)
+    index.insert('corner', 0.9, 0.9, 0.2, 0.2)
+    for x, y in ((0.85, 0.85), (1.05, 0.85), (0.85, 1.05), (1.05, 1.05)):
+        assert index.query_aabb(x, y, 0.1, 0.1) == ['corner'], (x, y)
+    assert index.query_aabb(1.15, 1.15, 0.5, 0.5) == []
+
+def test_query_aabb_uses_strict_overlap():
+    """Boxes that only share an edge do not overlap, as in the collision AABB test"""
+    index = SpatialHash()
+    index.insert('a', 0, 0, 1, 1)
+    assert index.query_aabb(1, 0, 1, 1) == []
+    assert index.query_aabb(0, 1, 1, 1) == []
+    assert index.query_aabb(0.999, 0.999, 1, 1) == ['a']
+
+def test_queries_at_negative_coordinates():
+    """Cells below zero round down, so boxes left of or above the board are found"""
+    index = SpatialHash(cell_size=1.0)
+    index.insert('left', -1.5, -0.5, 1.0, 1.0)  # Covers cells -2..-1 by -1..0
+    index.insert('right', 0.2, 0.2, 0.5, 0.5)
+    assert index.query_aabb(-1.2, -0.2, 0.1, 0.1) == ['left']
+    assert index.query_aabb(-0.6, 0.4, 0.05, 0.05) == ['left']
+    assert index.query_aabb(-0.45, -0.45, 0.1, 0.1) == []
+    assert sorted(index.query_radius(-0.3, 0.3, 0.5)) == ['left', 'right']
+    assert index.query_radius(-2.0, -1.0, 0.5) == []
+
+def test_query_radius_includes_boxes_exactly_at_the_radius():
+    """Distance is measured to the nearest point of the box, and radius is inclusive"""
+    index = SpatialHash(cell_size=1.0)
+    index.insert('side', 2.0, 0.0, 1.0, 1.0)    # 2 to the right of (0, 0.5)
+    index.insert('corner', 3.0, 4.0, 1.0, 1.0)  # Nearest corner 5 from (0, 0)
+    assert index.query_radius(0.0, 0.5, 2.0) == ['side']
+    assert index.query_radius(0.0, 0.5, 1.999) == []
+    assert 'corner' in index.query_radius(0.0, 0.0, 5.0)
+    assert 'corner' not in index.query_radius(0.0, 0.0, 4.999)
+    assert sorted(index.query_radius(2.5, 0.5, 0.0)) == ['side']  # A point inside the box
+
+def test_queries_follow_updates_across_cells():
+    """A moved box is found at its new cells and no longer at its old ones"""
+    index = SpatialHash(cell_size=1.0)
+    index.insert('mover', 0.2, 0.2, 0.5, 0.5)
+    index.update('mover', 5.2, -3.8, 0.5, 0.5)
+    assert index.query_aabb(0, 0, 1, 1) == []
+    assert index.query_aabb(5, -4, 1, 1) == ['mover']
+    assert index.query_radius(5.4, -3.6, 0.1) == ['mover']
+    index.remove('mover')
+    assert index.query_radius(5.4, -3.6, 0.1) == [] and not index.cells
+
+def test_queries_match_brute_force():
+    """Random boxes, some larger than a cell and some below zero, give the brute-force results"""
+    rng = random.Random(5)
+    for trial in range(50):
+        index = SpatialHash(cell_size=rng.choice((0.5, 1.0, 2.0)))
+        boxes = {}
+        for key in range(60):
+            box = (rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(0.05, 3), rng.uniform(0.05, 3))
+            boxes[key] = box
+            index.insert(key, *box)
+        for key in rng.sample(sorted(boxes), 20):  # Move some after their cells were fixed
+            boxes[key] = (rng.uniform(-10, 10), rng.uniform(-10, 10)) + boxes[key][2:]
+            index.update(key, *boxes[key])
+        for _ in range(20):
+            query = (rng.uniform(-12, 12), rng.uniform(-12, 12), rng.uniform(0, 4), rng.uniform(0, 4))
+            expected = sorted(key for key, box in boxes.items() if _overlaps(query, box))
+            assert sorted(index.query_aabb(*query)) == expected, f"trial {trial}"
+
+            x, y, radius = rng.uniform(-12, 12), rng.uniform(-12, 12), rng.uniform(0, 5)
+            expected = sorted(key for key, box in boxes.items() if _distance_squared(x, y, box) <= radius * radius)
+            assert sorted(index.query_radius(x, y, radius)) == expected, f"trial {trial}"
@@ -0,0 +1,117 @@
+# server/test/test_swept_collision.py
+import random
+import pytest
+from server.game.game_state import GameState
+from server.game.collision_handler import CollisionHandler
+from shared.config import BOARD_WIDTH, BOARD_HEIGHT
+from shared.entities import EnemyB, EnemyJ, EnemyH, Missile
+
+ENEMY_TYPES = (EnemyB, EnemyJ, EnemyH)
+BACKENDS = (CollisionHandler.BACKEND_HASH, CollisionHandler.BACKEND_VECTOR, CollisionHandler.BACKEND_SWEPT)
+
+def _scene(enemies, missiles, player_x=0):
+    """A game state holding EnemyB enemies and straight missiles at the given positions"""
+    game_state = GameState()
+    game_state.player.x = player_x
+    for x, y in enemies:
+        game_state.add_enemy(EnemyB(x, y, game_state))
+    for x, y in missiles:
+        game_state.add_missile(Missile(x, y, "straight"))
+    return game_state
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fast_missile_hits_an_oncoming_enemy_only_when_swept(backend):
+    """A missile that crosses an enemy within one tick is caught by the swept backend alone"""
+    game_state = _scene(enemies=[(19, 10)], missiles=[(20.3, 20)])
+    enemy, = game_state.enemies
+    missile, = game_state.missiles
+    handler = CollisionHandler(game_state, backend=backend)
+    handler.check_all_collisions()  # Apart: nothing happens, the segments start here
+
+    # Head-on in one tick: the missile ends up well past the enemy
+    missile.y = 0
+    enemy.y = 11
+    handler.check_all_collisions()
+
+    swept = backend == CollisionHandler.BACKEND_SWEPT
+    assert (enemy in game_state.enemies) is not swept
+    assert (missile in game_state.missiles) is not swept
+    assert game_state.score == (10 if swept else 0)
+
+def test_time_of_impact_is_the_fraction_of_the_tick_at_first_contact():
+    """A missile rising 20 units meets a 1 unit high enemy 10 units up once its top crosses 11"""
+    game_state = _scene(enemies=[(19, 10)], missiles=[(20.3, 20)])
+    enemy, = game_state.enemies
+    missile, = game_state.missiles
+    handler = CollisionHandler(game_state, backend=CollisionHandler.BACKEND_SWEPT)
+    handler.check_all_collisions()
+
+    missile.y = 0
+    assert handler._time_of_impact(missile, enemy) == pytest.approx(0.45)
+    missile.y = 15  # Stops short of the enemy
+    assert handler._time_of_impact(missile, enemy) is None
+
+def test_missile_hits_the_enemy_it_reaches_first():
+    """The earliest impact wins over enemy list order"""
+    # The far enemy comes first in the list, the near one is on the missile's path first
+    game_state = _scene(enemies=[(19, 5), (19, 15)], missiles=[(20.3, 20)])
+    far, near = game_state.enemies
+    missile, = game_state.missiles
+    handler = CollisionHandler(game_state, backend=CollisionHandler.BACKEND_SWEPT)
+    handler.check_all_collisions()
+
+    missile.y = 0
+    handler.check_all_collisions()
+    assert list(game_state.enemies) == [far]
+    assert missile not in game_state.missiles
+    assert game_state.score == 10
+
+def _outcome(scene, backend, step):
+    """Survivors, score and lives after one check of a scene whose entities moved step along their velocities"""
+    game_state = GameState()
+    game_state.player.x = scene['player_x']
+    for type_index, x, y, _, _ in scene['enemies']:
+        game_state.add_enemy(ENEMY_TYPES[type_index](x, y, game_state))
+    for x, y, _, _ in scene['missiles']:
+        game_state.add_missile(Missile(x, y, "straight"))
+    enemies = list(game_state.enemies)
+    missiles = list(game_state.missiles)
+
+    handler = CollisionHandler(game_state, backend=backend)
+    # Where each entity was at the previous check
+    velocities = [entry[-2:] for entry in scene['enemies']] + [entry[-2:] for entry in scene['missiles']]
+    handler._previous_positions = {entity: (entity.x - dx * step, entity.y - dy * step)
+                                   for entity, (dx, dy) in zip(enemies + missiles, velocities)}
+    handler.check_all_collisions()
+    return ([enemies.index(enemy) for enemy in game_state.enemies],
+            [missiles.index(missile) for missile in game_state.missiles],
+            game_state.score, game_state.lives)
+
+def _moved_back(scene, step):
+    """The same scene at its positions of the previous check"""
+    return dict(scene,
+                enemies=[(t, x - dx * step, y - dy * step, dx, dy) for t, x, y, dx, dy in scene['enemies']],
+                missiles=[(x - dx * step, y - dy * step, dx, dy) for x, y, dx, dy in scene['missiles']])
+
+@pytest.mark.parametrize("step", [0.01, 0.05])
+def test_swept_matches_vector_on_slow_scenes(step):
+    """Where no contact starts or ends during the tick, sweeping changes nothing"""
+    compared = 0
+    for seed in range(200):
+        rng = random.Random(seed)
+        scene = {
+            'enemies': [(rng.randrange(3), rng.uniform(0, BOARD_WIDTH - 3), rng.uniform(BOARD_HEIGHT - 12, BOARD_HEIGHT),
+                         rng.uniform(-1, 1), rng.uniform(-1, 1))
+                        for _ in range(rng.randint(0, GameState.MAX_ENEMIES))],
+            'missiles': [(rng.uniform(0, BOARD_WIDTH), rng.uniform(BOARD_HEIGHT - 12, BOARD_HEIGHT),
+                          rng.uniform(-1, 1), rng.uniform(-1, 1))
+                         for _ in range(rng.randint(0, GameState.MAX_MISSILES))],
+            'player_x': rng.randint(0, int(BOARD_WIDTH) - 1)
+        }
+        expected = _outcome(scene, CollisionHandler.BACKEND_VECTOR, 0)
+        # Contacts that begin or end within the tick are what the swept backend is for
+        if _outcome(_moved_back(scene, step), CollisionHandler.BACKEND_VECTOR, 0) != expected:
+            continue
+        compared += 1
+        assert _outcome(scene, CollisionHandler.BACKEND_SWEPT, step) == expected, f"seed {seed}"
+    assert compared > 150
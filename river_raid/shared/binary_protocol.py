@@ -0,0 +1,336 @@
+# shared/binary_protocol.py
+import struct
+import logging
+from shared.delta import SCALAR_KEYS, ENTITY_FIELDS
+
+# Protocol names negotiated with the "hello" message
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+BINARY_VERSION = 5  # 2: entity ids, snapshot sequences, acks and deltas; 3: input acks; 4: input streams;
+                    # 5: applied input sequence in states
+
+# Every frame is a 4-byte big-endian payload length followed by the payload
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 1 << 20
+
+# Payload kinds
+KIND_STATE = 1
+KIND_INPUT = 2
+KIND_INPUT_BATCH = 3
+KIND_ERROR = 4
+KIND_DELTA = 5
+KIND_INPUT_ACK = 6
+KIND_INPUT_STREAM = 7
+
+# Coordinates travel as int16 in 1/QUANTIZATION board units
+QUANTIZATION = 100
+
+# Field codes
+ENEMY_TYPES = ['B', 'J', 'H']
+MISSILE_TYPES = ['straight', 'guided']
+GAME_STATES = ['running', 'game_over']
+ACTIONS = ['move', 'shoot', 'reset_game', 'get_game_state', 'quit_game']
+DIRECTIONS = ['left', 'right', 'accelerate', 'decelerate']
+
+# Fixed layouts: version, kind
+PAYLOAD_HEADER = struct.Struct('>BB')
+# sequence, score, lives, fuel, game state, player x, player y, applied input sequence,
+# enemy/fuel/missile counts
+STATE_HEADER = struct.Struct('>IiBBBhhiHHH')
+# id, x, y[, type]
+ENEMY_RECORD = struct.Struct('>IhhB')
+FUEL_RECORD = struct.Struct('>Ihh')
+MISSILE_RECORD = struct.Struct('>IhhB')
+# acknowledged snapshot sequence (NO_ACK when none)
+ACK = struct.Struct('>I')
+# action, direction (0xFF when none)
+INPUT_RECORD = struct.Struct('>BB')
+BATCH_COUNT = struct.Struct('>H')
+# inputs accepted from the request being acknowledged
+INPUT_ACK = struct.Struct('>H')
+# input stream: low 16 bits of the first sequence, command count, first bitmask,
+# then per further command: sequence step from the previous one, bitmask
+INPUT_STREAM_HEADER = struct.Struct('>HBB')
+INPUT_STEP = struct.Struct('>BB')
+SEQUENCE_MODULUS = 1 << 16
+# sequence, baseline sequence, mask of the scalar fields that follow
+DELTA_HEADER = struct.Struct('>IIB')
+# added, removed and changed counts of one entity list
+LIST_COUNTS = struct.Struct('>HHH')
+CHANGE_HEADER = struct.Struct('>IB')
+ENTITY_ID = struct.Struct('>I')
+
+NO_DIRECTION = 0xFF
+NO_ACK = 0xFFFFFFFF
+
+# Scalar layouts in SCALAR_KEYS order; p is the player position, n the applied input sequence
+SCALAR_FORMATS = {'p': struct.Struct('>hh'), 's': struct.Struct('>i'), 'l': struct.Struct('>B'),
+                  'u': struct.Struct('>B'), 'g': struct.Struct('>B'), 'n': struct.Struct('>i')}
+# Per-field layouts of a changed entity; t is the type code
+FIELD_FORMATS = {'x': struct.Struct('>h'), 'y': struct.Struct('>h'), 't': struct.Struct('>B')}
+RECORDS = {'e': ENEMY_RECORD, 'f': FUEL_RECORD, 'm': MISSILE_RECORD}
+TYPE_CODES = {'e': ENEMY_TYPES, 'm': MISSILE_TYPES}
+
+_record_structs = {}
+
+def _records_struct(record, count):
+    """One Struct for count consecutive records, so a whole list packs in one call"""
+    key = (record.format, count)
+    packer = _record_structs.get(key)
+    if packer is None:
+        packer = struct.Struct('>' + record.format.lstrip('>') * count)
+        _record_structs[key] = packer
+    return packer
+
+def _q(value):
+    return int(round(value * QUANTIZATION))
+
+def frame(payload):
+    """Length-prefix a payload"""
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def _pack_entities(key, entities):
+    """All records of one entity list in a single pack call"""
+    if not entities:
+        return b''
+    if key == 'f':
+        values = [value for depot in entities for value in (depot["i"], _q(depot["x"]), _q(depot["y"]))]
+    else:
+        codes = TYPE_CODES[key]
+        values = [value for entity in entities
+                  for value in (entity["i"], _q(entity["x"]), _q(entity["y"]), codes.index(entity["t"]))]
+    return _records_struct(RECORDS[key], len(entities)).pack(*values)
+
+def _unpack_entities(key, payload, offset, count):
+    """Decode count records of one entity list; returns the dicts and the new offset"""
+    record = RECORDS[key]
+    end = offset + record.size * count
+    scale = 1.0 / QUANTIZATION
+    if key == 'f':
+        entities = [{"i": i, "x": x * scale, "y": y * scale}
+                    for i, x, y in record.iter_unpack(payload[offset:end])]
+    else:
+        codes = TYPE_CODES[key]
+        entities = [{"i": i, "x": x * scale, "y": y * scale, "t": codes[t]}
+                    for i, x, y, t in record.iter_unpack(payload[offset:end])]
+    return entities, end
+
+def encode_state(state, sequence=0):
+    """Frame a network state dict (keys p, e, f, m, s, l, u, g, n) published as sequence"""
+    enemies, depots, missiles = state["e"], state["f"], state["m"]
+    return frame(b''.join([
+        PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_STATE),
+        STATE_HEADER.pack(
+            sequence, state["s"], state["l"], int(state["u"]), GAME_STATES.index(state["g"]),
+            _q(state["p"]["x"]), _q(state["p"]["y"]), state["n"],
+            len(enemies), len(depots), len(missiles)
+        ),
+        _pack_entities('e', enemies),
+        _pack_entities('f', depots),
+        _pack_entities('m', missiles)
+    ]))
+
+def _scalar_values(key, value):
+    if key == 'p':
+        return (_q(value["x"]), _q(value["y"]))
+    if key == 'g':
+        return (GAME_STATES.index(value),)
+    return (int(value),)
+
+def _field_value(key, field, value):
+    if field == 't':
+        return TYPE_CODES[key].index(value)
+    return _q(value)
+
+def encode_delta(sequence, base_sequence, delta):
+    """Frame a shared.delta delta of snapshot sequence against base_sequence"""
+    mask = 0
+    parts = [PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_DELTA), None]
+    for bit, key in enumerate(SCALAR_KEYS):
+        if key in delta:
+            mask |= 1 << bit
+            parts.append(SCALAR_FORMATS[key].pack(*_scalar_values(key, delta[key])))
+    parts[1] = DELTA_HEADER.pack(sequence, base_sequence, mask)
+
+    for key, fields in ENTITY_FIELDS.items():
+        change = delta.get(key, {"a": (), "r": (), "c": ()})
+        parts.append(LIST_COUNTS.pack(len(change["a"]), len(change["r"]), len(change["c"])))
+        parts.append(_pack_entities(key, change["a"]))
+        if change["r"]:
+            parts.append(_records_struct(ENTITY_ID, len(change["r"])).pack(*change["r"]))
+        for entry in change["c"]:
+            parts.append(CHANGE_HEADER.pack(entry[0], entry[1]))
+            values = iter(entry[2:])
+            for bit, field in enumerate(fields):
+                if entry[1] & (1 << bit):
+                    parts.append(FIELD_FORMATS[field].pack(_field_value(key, field, next(values))))
+    return frame(b''.join(parts))
+
+def _decode_delta(payload, offset):
+    sequence, base_sequence, mask = DELTA_HEADER.unpack_from(payload, offset)
+    offset += DELTA_HEADER.size
+    scale = 1.0 / QUANTIZATION
+    delta = {}
+
+    for bit, key in enumerate(SCALAR_KEYS):
+        if mask & (1 << bit):
+            values = SCALAR_FORMATS[key].unpack_from(payload, offset)
+            offset += SCALAR_FORMATS[key].size
+            if key == 'p':
+                delta[key] = {"x": values[0] * scale, "y": values[1] * scale}
+            elif key == 'g':
+                delta[key] = GAME_STATES[values[0]]
+            else:
+                delta[key] = values[0]
+
+    for key, fields in ENTITY_FIELDS.items():
+        n_added, n_removed, n_changed = LIST_COUNTS.unpack_from(payload, offset)
+        offset += LIST_COUNTS.size
+        if not (n_added or n_removed or n_changed):
+            continue
+        added, offset = _unpack_entities(key, payload, offset, n_added)
+        removed = list(_records_struct(ENTITY_ID, n_removed).unpack_from(payload, offset)) if n_removed else []
+        offset += ENTITY_ID.size * n_removed
+        changed = []
+        for _ in range(n_changed):
+            entity_id, entry_mask = CHANGE_HEADER.unpack_from(payload, offset)
+            offset += CHANGE_HEADER.size
+            entry = [entity_id, entry_mask]
+            for bit, field in enumerate(fields):
+                if entry_mask & (1 << bit):
+                    (value,) = FIELD_FORMATS[field].unpack_from(payload, offset)
+                    offset += FIELD_FORMATS[field].size
+                    entry.append(TYPE_CODES[key][value] if field == 't' else value * scale)
+            changed.append(entry)
+        delta[key] = {"a": added, "r": removed, "c": changed}
+
+    return {"status": "ok", "seq": sequence, "base": base_sequence, "delta": delta}
+
+def encode_error(message):
+    """Frame an error reply"""
+    return frame(PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_ERROR) + message.encode('utf-8'))
+
+def encode_input_ack(accepted):
+    """Frame the stateless reply a streaming client gets for its inputs"""
+    return frame(PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_INPUT_ACK) + INPUT_ACK.pack(accepted))
+
+def _encode_input_record(message):
+    direction = message.get("direction")
+    return INPUT_RECORD.pack(
+        ACTIONS.index(message["action"]),
+        DIRECTIONS.index(direction) if direction is not None else NO_DIRECTION
+    )
+
+def _encode_input_stream(ack, commands):
+    """Sequenced [sequence, mask] commands; a step too long for a byte starts another frame"""
+    frames = []
+    start = 0
+    for end in range(1, len(commands) + 1):
+        if end < len(commands) and commands[end][0] - commands[end - 1][0] <= 0xFF and end - start < 0xFF:
+            continue
+        chunk = commands[start:end]
+        steps = [value for (previous, _), (sequence, mask) in zip(chunk, chunk[1:])
+                 for value in (sequence - previous, mask)]
+        frames.append(frame(
+            PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_INPUT_STREAM) + ack +
+            INPUT_STREAM_HEADER.pack(chunk[0][0] % SEQUENCE_MODULUS, len(chunk), chunk[0][1]) +
+            (_records_struct(INPUT_STEP, len(chunk) - 1).pack(*steps) if steps else b'')
+        ))
+        start = end
+    return b''.join(frames)
+
+def encode_input(message):
+    """Frame a client input; an {"actions": [...]} batch becomes one frame
+
+    An {"action": "input", "inputs": [...]} command stream gets its own
+    frame kind and cannot be part of an "actions" batch. Only the low 16
+    bits of its sequences travel; the receiver restores the rest.
+    """
+    ack = ACK.pack(message.get("ack", NO_ACK))
+    if message.get("action") == "input":
+        return _encode_input_stream(ack, message["inputs"])
+    if "actions" in message:
+        actions = message["actions"]
+        return frame(PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_INPUT_BATCH) + ack + BATCH_COUNT.pack(len(actions)) +
+                     b''.join(_encode_input_record(action) for action in actions))
+    return frame(PAYLOAD_HEADER.pack(BINARY_VERSION, KIND_INPUT) + ack + _encode_input_record(message))
+
+def _decode_input_record(action_code, direction_code):
+    message = {"action": ACTIONS[action_code]}
+    if direction_code != NO_DIRECTION:
+        message["direction"] = DIRECTIONS[direction_code]
+    return message
+
+def decode(payload):
+    """Decode one frame payload (bytes or memoryview) back to the message dict the JSON protocol would carry"""
+    version, kind = PAYLOAD_HEADER.unpack_from(payload)
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary protocol version {version}")
+    offset = PAYLOAD_HEADER.size
+
+    if kind == KIND_STATE:
+        return _decode_state(payload, offset)
+    if kind == KIND_DELTA:
+        return _decode_delta(payload, offset)
+    if kind in (KIND_INPUT, KIND_INPUT_BATCH, KIND_INPUT_STREAM):
+        (ack,) = ACK.unpack_from(payload, offset)
+        offset += ACK.size
+        if kind == KIND_INPUT_STREAM:
+            sequence, count, mask = INPUT_STREAM_HEADER.unpack_from(payload, offset)
+            offset += INPUT_STREAM_HEADER.size
+            inputs = [[sequence, mask]]
+            records = _records_struct(INPUT_STEP, count - 1).unpack_from(payload, offset) if count > 1 else ()
+            for i in range(0, len(records), 2):
+                sequence += records[i]
+                inputs.append([sequence, records[i + 1]])
+            message = {"action": "input", "inputs": inputs, "modulus": SEQUENCE_MODULUS}
+        elif kind == KIND_INPUT:
+            message = _decode_input_record(*INPUT_RECORD.unpack_from(payload, offset))
+        else:
+            (count,) = BATCH_COUNT.unpack_from(payload, offset)
+            offset += BATCH_COUNT.size
+            records = _records_struct(INPUT_RECORD, count).unpack_from(payload, offset) if count else ()
+            message = {"actions": [_decode_input_record(records[i], records[i + 1])
+                                   for i in range(0, len(records), 2)]}
+        if ack != NO_ACK:
+            message["ack"] = ack
+        return message
+    if kind == KIND_INPUT_ACK:
+        (accepted,) = INPUT_ACK.unpack_from(payload, offset)
+        return {"status": "ok", "accepted": accepted}
+    if kind == KIND_ERROR:
+        return {"status": "error", "message": str(payload[offset:], 'utf-8')}
+    raise ValueError(f"Unknown binary message kind {kind}")
+
+def _decode_state(payload, offset):
+    sequence, score, lives, fuel, game_state, player_x, player_y, input_sequence, n_enemies, n_depots, n_missiles = \
+        STATE_HEADER.unpack_from(payload, offset)
+    offset += STATE_HEADER.size
+
+    scale = 1.0 / QUANTIZATION
+    enemies, offset = _unpack_entities('e', payload, offset, n_enemies)
+    depots, offset = _unpack_entities('f', payload, offset, n_depots)
+    missiles, offset = _unpack_entities('m', payload, offset, n_missiles)
+
+    return {"status": "ok", "seq": sequence, "game_state": {
+        "p": {"x": player_x * scale, "y": player_y * scale},
+        "e": enemies,
+        "f": depots,
+        "m": missiles,
+        "s": score,
+        "l": lives,
+        "u": fuel,
+        "g": GAME_STATES[game_state],
+        "n": input_sequence
+    }}
+
+def negotiate(message):
+    """Server side of the "hello" handshake: the protocol to use and the JSON reply announcing it"""
+    requested = message.get("protocol", PROTOCOL_JSON)
+    if requested == PROTOCOL_BINARY and message.get("version") == BINARY_VERSION:
+        protocol = PROTOCOL_BINARY
+    else:
+        if requested != PROTOCOL_JSON:
+            logging.info(f"binary_protocol: Client asked for {requested} v{message.get('version')}, using JSON")
+        protocol = PROTOCOL_JSON
+    return protocol, {"status": "ok", "protocol": protocol, "version": BINARY_VERSION}
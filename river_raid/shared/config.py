@@ -6,3 +6,9 @@ CANVAS_WIDTH = 1000
 CANVAS_HEIGHT = 950
 BOARD_WIDTH = CANVAS_WIDTH / SCALE
 BOARD_HEIGHT = CANVAS_HEIGHT / SCALE
+
+SERVER_TICK_RATE = 20
+SERVER_TICK_INTERVAL = 1 / SERVER_TICK_RATE
+
+# Seconds between missile steps; the server moves missiles on it and the client predicts with it
+MISSILE_STEP_INTERVAL = 0.1
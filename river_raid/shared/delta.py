@@ -0,0 +1,74 @@
+# shared/delta.py
+
+# Top-level state fields compared as a whole
+SCALAR_KEYS = ('p', 's', 'l', 'u', 'g', 'n')
+
+# Entity lists and the fields covered by their change masks; bit n is fields[n]
+ENTITY_FIELDS = {
+    'e': ('x', 'y', 't'),
+    'f': ('x', 'y'),
+    'm': ('x', 'y', 't')
+}
+
+def diff_states(base, state):
+    """What changed between two network states, keyed like the states themselves
+
+    Scalars appear only when they differ. Each entity list that changed
+    becomes {"a": added entities, "r": removed ids, "c": changes}, where a
+    change is [id, mask, value for every set mask bit in field order].
+    """
+    delta = {}
+    for key in SCALAR_KEYS:
+        if state[key] != base[key]:
+            delta[key] = state[key]
+
+    for key, fields in ENTITY_FIELDS.items():
+        previous = {entity["i"]: entity for entity in base[key]}
+        added, changed = [], []
+        for entity in state[key]:
+            old = previous.pop(entity["i"], None)
+            if old is None:
+                added.append(entity)
+                continue
+            mask = 0
+            values = []
+            for bit, field in enumerate(fields):
+                if entity[field] != old[field]:
+                    mask |= 1 << bit
+                    values.append(entity[field])
+            if mask:
+                changed.append([entity["i"], mask] + values)
+
+        if added or changed or previous:
+            delta[key] = {"a": added, "r": list(previous), "c": changed}
+    return delta
+
+def apply_delta(base, delta):
+    """Rebuild the newer state from its baseline and a diff_states() delta"""
+    state = {key: delta.get(key, base[key]) for key in SCALAR_KEYS}
+
+    for key, fields in ENTITY_FIELDS.items():
+        change = delta.get(key)
+        if change is None:
+            state[key] = base[key]
+            continue
+
+        removed = set(change["r"])
+        changed = {entry[0]: entry for entry in change["c"]}
+        entities = []
+        for entity in base[key]:
+            if entity["i"] in removed:
+                continue
+            entry = changed.get(entity["i"])
+            if entry is not None:
+                entity = dict(entity)
+                values = iter(entry[2:])
+                for bit, field in enumerate(fields):
+                    if entry[1] & (1 << bit):
+                        entity[field] = next(values)
+            entities.append(entity)
+
+        # Survivors keep their order and new entities were inserted after all of them
+        entities.extend(change["a"])
+        state[key] = entities
+    return state
@@ -42,11 +42,12 @@ class Player:
 
 class Enemy:
     """Base enemy class"""
-    def __init__(self, x, y, enemy_type, game_logic):
+    def __init__(self, x, y, enemy_type, game_logic, rng=random):
         self.x = x
         self.y = y
         self.type = enemy_type
         self.game_logic = game_logic
+        self.rng = rng  # Random source; a seeded random.Random makes a match reproducible
         self.running = True
         self.width = SCALE
         self.height = SCALE
@@ -58,15 +59,15 @@ class Enemy:
 
 class EnemyB(Enemy):
     """Boat type enemy - moves horizontally and downward"""
-    def __init__(self, x, y, game_logic):
-        super().__init__(x, y, "B", game_logic)
+    def __init__(self, x, y, game_logic, rng=random):
+        super().__init__(x, y, "B", game_logic, rng)
         self.width = SCALE * 3
         self.height = SCALE
         self.color = "purple"
         self.vertical_direction = 1
-        self.horizontal_direction = random.choice([-1, 0, 1])
+        self.horizontal_direction = self.rng.choice([-1, 0, 1])
         self.vertical_speed = 0.5
-        self.horizontal_speed = random.uniform(0.3, 0.7)
+        self.horizontal_speed = self.rng.uniform(0.3, 0.7)
 
     def move(self):
         """Move boat type enemy"""
@@ -85,12 +86,12 @@ class EnemyB(Enemy):
 
 class EnemyJ(Enemy):
     """Jet type enemy - moves straight down quickly"""
-    def __init__(self, x, y, game_logic):
-        super().__init__(x, y, "J", game_logic)
+    def __init__(self, x, y, game_logic, rng=random):
+        super().__init__(x, y, "J", game_logic, rng)
         self.width = SCALE * 1.5
         self.height = SCALE * 2
         self.color = "orange"
-        self.direction = random.uniform(1, 2)
+        self.direction = self.rng.uniform(1, 2)
 
     def move(self):
         """Move jet type enemy"""
@@ -100,24 +101,24 @@ class EnemyJ(Enemy):
 
 class EnemyH(Enemy):
     """Helicopter type enemy - moves erratically"""
-    def __init__(self, x, y, game_logic):
-        super().__init__(x, y, "H", game_logic)
+    def __init__(self, x, y, game_logic, rng=random):
+        super().__init__(x, y, "H", game_logic, rng)
         self.width = SCALE * 2
         self.height = SCALE * 0.75
         self.color = "white"
-        self.vertical_direction = random.choice([-1, 0, 1])
-        self.horizontal_direction = random.choice([-1, 0, 1])
-        self.vertical_speed = random.uniform(0.2, 0.8)
-        self.horizontal_speed = random.uniform(0.2, 0.8)
+        self.vertical_direction = self.rng.choice([-1, 0, 1])
+        self.horizontal_direction = self.rng.choice([-1, 0, 1])
+        self.vertical_speed = self.rng.uniform(0.2, 0.8)
+        self.horizontal_speed = self.rng.uniform(0.2, 0.8)
 
     def move(self):
         """Move helicopter type enemy"""
         # Random direction changes
-        if random.randrange(0, 10) > 7:
-            self.vertical_direction = random.choice([-1, 0, 1])
-            self.horizontal_direction = random.choice([-1, 0, 1])
-            self.vertical_speed = random.uniform(0.2, 0.8)
-            self.horizontal_speed = random.uniform(0.2, 0.8)
+        if self.rng.randrange(0, 10) > 7:
+            self.vertical_direction = self.rng.choice([-1, 0, 1])
+            self.horizontal_direction = self.rng.choice([-1, 0, 1])
+            self.vertical_speed = self.rng.uniform(0.2, 0.8)
+            self.horizontal_speed = self.rng.uniform(0.2, 0.8)
         
         # Move
         self.y += self.vertical_direction * self.vertical_speed
@@ -144,7 +145,7 @@ class FuelDepot:
     def move(self):
         try:
             self.y += 1
-            if self.y < BOARD_HEIGHT + 3: 
+            if self.y >= BOARD_HEIGHT + 3: 
                 self.running = False
         except Exception as e:
             logging.warning(f"Warning in FuelDepot.move: {e}")
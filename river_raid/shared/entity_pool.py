@@ -1,13 +1,15 @@
 # shared/entity_pool.py
 import threading
 import queue
+import random
 import logging
 from shared.entities import EnemyB, EnemyJ, EnemyH, FuelDepot, Missile
 
 class EntityPool:
     """Thread-safe object pool with optimized synchronization"""
-    def __init__(self, max_size=20):
+    def __init__(self, max_size=20, rng=random):
         self.max_size = max_size
+        self.rng = rng  # Passed to new enemies so a seeded match stays reproducible
         self.pools = {
             'B': queue.Queue(max_size),
             'J': queue.Queue(max_size),
@@ -20,11 +22,11 @@ class EntityPool:
     def _create_entity(self, entity_type, x, y, game_logic=None):
         """Create a new entity based on type"""
         if entity_type == 'B':
-            return EnemyB(x, y, game_logic)
+            return EnemyB(x, y, game_logic, self.rng)
         elif entity_type == 'J':
-            return EnemyJ(x, y, game_logic)
+            return EnemyJ(x, y, game_logic, self.rng)
         elif entity_type == 'H':
-            return EnemyH(x, y, game_logic)
+            return EnemyH(x, y, game_logic, self.rng)
         elif entity_type == 'fuel':
             return FuelDepot(x, y)
         elif entity_type == 'missile':
@@ -0,0 +1,231 @@
+# shared/framing.py
+import time
+import socket
+import threading
+from shared.binary_protocol import FRAME_HEADER, MAX_FRAME_SIZE, frame
+
+class FrameBuffer:
+    """Receive buffer that hands out complete messages without copying them
+
+    Bytes are read straight into one reusable bytearray, with recv_into
+    where the connection has it. next_frame() and next_line() return
+    memoryviews into that bytearray. A view is only valid until the next
+    call on the buffer, because read space is reclaimed by moving the
+    unread tail to the front, so decode it first. A fully read buffer
+    simply rewinds. next_frames() hands out every complete frame at once,
+    which saves a method call per frame on bursts of small frames.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+    MIN_READ = 4096  # Free space guaranteed before each read
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE, initial_size=INITIAL_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray(initial_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0    # First unread byte
+        self.end = 0      # One past the last received byte
+        self.scanned = 0  # Bytes before this position hold no newline
+        self._last = None  # Last message handed out; released before the bytearray grows
+        self._batch = []  # Frames last handed out by next_frames(); released likewise
+
+    def __len__(self):
+        return self.end - self.start
+
+    def _reserve(self, size):
+        """Make at least size bytes free after end, compacting before growing"""
+        if self.start == self.end:
+            self.start = self.end = self.scanned = 0
+        if len(self.buffer) - self.end >= size:
+            return
+
+        unread = self.end - self.start
+        if self.start:
+            self.view[:unread] = self.view[self.start:self.end]
+            self.scanned = max(self.scanned - self.start, 0)
+            self.start, self.end = 0, unread
+        if len(self.buffer) - self.end < size:
+            # A bytearray cannot be resized while views of it are alive
+            if self._last is not None:
+                self._last.release()
+                self._last = None
+            for payload in self._batch:
+                payload.release()
+            self._batch = []
+            self.view.release()
+            self.buffer.extend(bytes(max(len(self.buffer), unread + size - len(self.buffer))))
+            self.view = memoryview(self.buffer)
+
+    def receive(self, connection):
+        """Read once from connection into the buffer; returns the byte count, 0 at end of stream"""
+        self._reserve(self.MIN_READ)
+        free = len(self.buffer) - self.end
+        recv_into = getattr(connection, 'recv_into', None)
+        if recv_into is not None:
+            count = recv_into(self.view[self.end:], free)
+        else:
+            # paramiko Channels only offer recv
+            data = connection.recv(free)
+            count = len(data)
+            self.view[self.end:self.end + count] = data
+        self.end += count
+        return count
+
+    def feed(self, data):
+        """Append bytes that arrived some other way"""
+        self._reserve(len(data))
+        self.view[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def next_frame(self):
+        """Payload of the next complete length-prefixed frame, or None until more has arrived"""
+        start = self.start
+        if self.end - start < FRAME_HEADER.size:
+            return None
+        (length,) = FRAME_HEADER.unpack_from(self.buffer, start)
+        if length > self.max_frame_size:
+            raise ValueError(f"Frame of {length} bytes exceeds the {self.max_frame_size} byte limit")
+        begin = start + FRAME_HEADER.size
+        if self.end - begin < length:
+            return None
+        self.start = begin + length
+        self._last = self.view[begin:self.start]
+        return self._last
+
+    def next_frames(self):
+        """Payloads of every complete frame received so far, oldest first; empty until one has arrived
+
+        A frame over the size limit ends the batch. It raises ValueError
+        once it is the next frame, like next_frame().
+        """
+        buffer, view, unpack_from = self.buffer, self.view, FRAME_HEADER.unpack_from
+        header_size, limit = FRAME_HEADER.size, self.max_frame_size
+        start, end = self.start, self.end
+        frames = []
+        while end - start >= header_size:
+            (length,) = unpack_from(buffer, start)
+            if length > limit:
+                if frames:
+                    break
+                raise ValueError(f"Frame of {length} bytes exceeds the {limit} byte limit")
+            begin = start + header_size
+            if end - begin < length:
+                break
+            start = begin + length
+            frames.append(view[begin:start])
+        self.start = start
+        self._batch = frames
+        return frames
+
+    def next_line(self):
+        """Next newline-terminated line without the newline, or None until more has arrived
+
+        Only bytes not searched before are scanned, so a line arriving in
+        many pieces costs linear time.
+        """
+        newline = self.buffer.find(b'\n', max(self.scanned, self.start), self.end)
+        if newline < 0:
+            self.scanned = self.end
+            if self.end - self.start > self.max_frame_size:
+                raise ValueError(f"Line of over {self.max_frame_size} bytes without a newline")
+            return None
+        begin = self.start
+        self.start = self.scanned = newline + 1
+        self._last = self.view[begin:newline]
+        return self._last
+
+def _split_lines(source, chunk_size=2048):
+    """The concatenate-and-split loop the receive paths used before FrameBuffer"""
+    buffer = b""
+    count = 0
+    while True:
+        data = source.recv(chunk_size)
+        if not data:
+            return count
+        buffer += data
+        while b'\n' in buffer:
+            line, buffer = buffer.split(b'\n', 1)
+            count += 1
+
+def _split_frames(source, chunk_size=4096):
+    """The concatenate-and-slice frame loop the receive paths used before FrameBuffer"""
+    buffer = b""
+    count = 0
+    while True:
+        data = source.recv(chunk_size)
+        if not data:
+            return count
+        buffer += data
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            (length,) = FRAME_HEADER.unpack_from(buffer, offset)
+            end = offset + FRAME_HEADER.size + length
+            if end > len(buffer):
+                break
+            payload = buffer[offset + FRAME_HEADER.size:end]
+            count += 1
+            offset = end
+        buffer = buffer[offset:]
+
+def _framed(source, next_message):
+    framer = FrameBuffer()
+    count = 0
+    while framer.receive(source):
+        while next_message(framer) is not None:
+            count += 1
+    return count
+
+def _framed_batch(source):
+    framer = FrameBuffer()
+    count = 0
+    while framer.receive(source):
+        count += len(framer.next_frames())
+    return count
+
+def _time_read(data, read):
+    """Seconds for read() to consume data sent through a local socket pair"""
+    receiver, sender = socket.socketpair()
+    writer = threading.Thread(target=lambda: (sender.sendall(data), sender.shutdown(socket.SHUT_WR)))
+    try:
+        start = time.perf_counter()
+        writer.start()
+        count = read(receiver)
+        elapsed = time.perf_counter() - start
+    finally:
+        writer.join()
+        receiver.close()
+        sender.close()
+    return count, elapsed
+
+def benchmark(bursts=(1, 16, 256, 4096), repeats=20):
+    """Time to receive and split one burst of messages, old loops against FrameBuffer
+
+    Bursts hold about 1 KB JSON snapshot lines and about 150 byte binary
+    state frames, the two kinds of message the client receives. Binary
+    frames are taken with next_frames(), as the receive paths do.
+    """
+    line = b'{"status": "ok", "seq": 1, "game_state": ' + b'x' * 980 + b'}\n'
+    state_frame = frame(bytes(150))
+    cases = [
+        ('json', line, _split_lines, lambda source: _framed(source, FrameBuffer.next_line)),
+        ('binary', state_frame, _split_frames, _framed_batch)
+    ]
+    results = []
+    for name, message, old, new in cases:
+        for burst in bursts:
+            data = message * burst
+            timings = []
+            for read in (old, new):
+                total = 0.0
+                for _ in range(repeats):
+                    count, elapsed = _time_read(data, read)
+                    assert count == burst
+                    total += elapsed
+                timings.append(total / repeats)
+            results.append((name, burst, timings[0], timings[1]))
+    return results
+
+if __name__ == "__main__":
+    print(f"{'protocol':>8} {'burst':>6} {'split ms':>10} {'framer ms':>10} {'speedup':>8}")
+    for name, burst, old_time, new_time in benchmark():
+        print(f"{name:>8} {burst:>6} {old_time * 1000:>10.3f} {new_time * 1000:>10.3f} {old_time / new_time:>7.1f}x")
@@ -0,0 +1,21 @@
+# shared/input_commands.py
+
+# Bits of one client input tick; a set bit means the action happens on that tick
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_FIRE = 4
+INPUT_ACCELERATE = 8
+INPUT_DECELERATE = 16
+
+# Application order within a tick; moves come first so a missile leaves from the new position
+MASK_ACTIONS = [
+    (INPUT_LEFT, {"action": "move", "direction": "left"}),
+    (INPUT_RIGHT, {"action": "move", "direction": "right"}),
+    (INPUT_ACCELERATE, {"action": "move", "direction": "accelerate"}),
+    (INPUT_DECELERATE, {"action": "move", "direction": "decelerate"}),
+    (INPUT_FIRE, {"action": "shoot"})
+]
+
+def mask_actions(mask):
+    """The discrete actions an input bitmask stands for, in application order"""
+    return [action for bit, action in MASK_ACTIONS if mask & bit]
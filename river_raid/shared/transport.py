@@ -0,0 +1,156 @@
+# shared/transport.py
+import os
+import socket
+import logging
+import paramiko
+
+# Transport names accepted in CLIENT_TRANSPORT / SERVER_TRANSPORT
+TRANSPORT_SSH = "ssh"
+TRANSPORT_TCP = "tcp"
+TRANSPORT_UNIX = "unix"
+
+DEFAULT_UNIX_PATH = "/tmp/river_raid.sock"
+
+class Transport:
+    """How a byte stream between client and server is set up
+
+    connect() (client) and open() (server) return a connection with
+    send/sendall/recv/fileno/close; a socket and a paramiko Channel both
+    qualify, so the code above never needs to know which one it has.
+    """
+    name = None
+
+    def connect(self):
+        """Client side: open a connection to the server"""
+        raise NotImplementedError
+
+    def listen(self, backlog=100, reuse_port=False):
+        """Server side: return a listening socket"""
+        raise NotImplementedError
+
+    def open(self, client_sock, addr):
+        """Server side: turn an accepted socket into a connection, or None if it failed"""
+        return client_sock
+
+    def close(self):
+        """Release anything the transport holds beyond its connections"""
+
+class TCPTransport(Transport):
+    """Plain TCP with Nagle disabled; for loopback and trusted networks"""
+    name = TRANSPORT_TCP
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def listen(self, backlog=100, reuse_port=False):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(backlog)
+        return sock
+
+    def open(self, client_sock, addr):
+        client_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return client_sock
+
+class UnixTransport(Transport):
+    """Unix domain socket for processes on the same host"""
+    name = TRANSPORT_UNIX
+
+    def __init__(self, path=DEFAULT_UNIX_PATH):
+        self.path = path
+        self.listening = False
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock
+
+    def listen(self, backlog=100, reuse_port=False):
+        if reuse_port:
+            raise ValueError("Unix socket transport cannot be shared between worker processes")
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left behind by a previous run
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        sock.listen(backlog)
+        self.listening = True
+        return sock
+
+    def close(self):
+        if self.listening and os.path.exists(self.path):
+            os.unlink(self.path)
+            self.listening = False
+
+class SSHTransport(TCPTransport):
+    """Paramiko SSH session channel over TCP; the original transport"""
+    name = TRANSPORT_SSH
+
+    ACCEPT_TIMEOUT = 20  # Seconds the server waits for the client to open a channel
+
+    def __init__(self, host, port, username=None, key_filename=None, passphrase=None,
+                 server_key_filename=None, server_interface=None):
+        super().__init__(host, port)
+        self.username = username
+        self.key_filename = key_filename
+        self.passphrase = passphrase
+        self.server_interface = server_interface  # Factory for the paramiko.ServerInterface
+        self.server_key = paramiko.RSAKey(filename=server_key_filename) if server_key_filename else None
+        self.ssh_client = None
+
+    def connect(self):
+        self.ssh_client = paramiko.SSHClient()
+        self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.ssh_client.connect(
+            self.host,
+            port=self.port,
+            username=self.username,
+            key_filename=self.key_filename,
+            passphrase=self.passphrase
+        )
+        return self.ssh_client.get_transport().open_session()
+
+    def open(self, client_sock, addr):
+        transport = paramiko.Transport(client_sock)
+        transport.add_server_key(self.server_key)
+        transport.start_server(server=self.server_interface())
+        channel = transport.accept(self.ACCEPT_TIMEOUT)
+        if channel is None:
+            logging.warning(f"transport: No channel opened by client {addr}")
+            transport.close()
+        return channel
+
+    def close(self):
+        if self.ssh_client is not None:
+            self.ssh_client.close()
+            self.ssh_client = None
+
+def create_transport(role, server_interface=None):
+    """Build the transport configured for "CLIENT" or "SERVER" from the environment"""
+    name = os.getenv(f"{role}_TRANSPORT", TRANSPORT_SSH)
+    host = os.getenv(f"{role}_HOST", "127.0.0.1")
+    port = int(os.getenv(f"{role}_PORT", 2200))
+
+    if name == TRANSPORT_TCP:
+        return TCPTransport(host, port)
+    if name == TRANSPORT_UNIX:
+        return UnixTransport(os.getenv(f"{role}_UNIX_PATH", DEFAULT_UNIX_PATH))
+    if name != TRANSPORT_SSH:
+        raise ValueError(f"Unknown transport: {name}")
+
+    if role == "SERVER":
+        return SSHTransport(host, port,
+                            server_key_filename=os.getenv("SERVER_KEY_FILENAME"),
+                            server_interface=server_interface)
+    return SSHTransport(host, port,
+                        username=os.getenv("CLIENT_USERNAME"),
+                        key_filename=os.getenv("CLIENT_KEY_FILENAME"),
+                        passphrase=os.getenv("CLIENT_KEY_PASSPHRASE"))